@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 import vispy
 vispy.use(app='pyqt6')  # Configure Vispy to use PyQt6 backend before other imports
@@ -13,4 +14,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == '__main__':
+    # The history importer parses in spawned worker processes, also in the frozen build
+    multiprocessing.freeze_support()
     main()
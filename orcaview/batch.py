@@ -0,0 +1,357 @@
+"""
+Headless batch runner: generate ORCA inputs for many structures and run them.
+
+    python -m orcaview.batch SOURCE --orca /path/to/orca --template method.json
+
+SOURCE is a directory of .xyz files or a manifest. A manifest is either a CSV
+file with a 'name' column, a 'smiles' or 'xyz' column and optional 'charge'
+and 'multiplicity' columns, or a text file with one XYZ path or SMILES
+(optionally followed by a name) per line. The template is a JSON object
+with the same choices as the GUI, for example:
+
+    {"job_type": "Geometry Optimization", "method": "DFT",
+     "dft_functional": "B3LYP", "basis_set": "def2-SVP",
+     "other_keywords": "D3BJ", "nprocs": 4, "maxcore": 2000,
+     "blocks": {"scf": "maxiter 300"}}
+
+Jobs run through JobQueueManager with the given core/memory budget, and a
+CSV summary of the results is written at the end; with --record-history it
+includes the thermochemistry and dipole moment recorded in the results store. With --executor slurm the
+jobs are submitted to a Slurm cluster that shares the output directory.
+Nothing here imports PyQt6, vispy or WebEngine; RDKit is only needed for
+SMILES entries.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+
+from .executors import LOCAL, SLURM, SlurmExecutor
+from .input_generator import OrcaInputGenerator, compose_keywords, parse_coordinates
+from .job_queue import JobQueueManager, JobStatus, OrcaJob
+from .job_store import JobStore
+from .logger import logger
+from .output_parser import OrcaOutputParser
+from .result_cache import ResultCache
+from .results_store import ResultsStore
+from .system_memory import DEFAULT_RESERVE_MB
+
+# Summary columns read from the final geometry of a job in the results store
+STORED_RESULT_FIELDS = ['zpe', 'enthalpy', 'free_energy', 'dipole_magnitude']
+SUMMARY_FIELDS = (['name', 'status', 'outcome', 'final_energy'] + STORED_RESULT_FIELDS +
+                  ['duration_seconds', 'input', 'output', 'error'])
+
+_KEYWORD_FIELDS = ('job_type', 'method', 'dft_functional', 'basis_set', 'se_method', 'xtb_method',
+                   'solvation_model', 'solvent', 'other_keywords')
+
+
+class BatchEntry:
+    """One structure to compute: coordinates come from an XYZ file or a SMILES string."""
+
+    def __init__(self, name, xyz_path=None, smiles=None, charge=None, multiplicity=None):
+        self.name = name
+        self.xyz_path = xyz_path
+        self.smiles = smiles
+        self.charge = charge
+        self.multiplicity = multiplicity
+
+    def coordinates(self):
+        if self.xyz_path:
+            with open(self.xyz_path, 'r', encoding='utf-8', errors='ignore') as f:
+                return parse_coordinates(f.read())
+        # Imported lazily so XYZ-only batches do not need RDKit
+        from .structures import molecule_from_smiles, coordinates_from_molecule
+        return coordinates_from_molecule(molecule_from_smiles(self.smiles))
+
+
+def _safe_name(text):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', text).strip('_') or 'mol'
+
+
+def _optional_int(value):
+    return int(value) if value not in (None, '') else None
+
+
+def read_entries(source):
+    """Return the BatchEntry list described by a directory or manifest."""
+    if os.path.isdir(source):
+        names = sorted(name for name in os.listdir(source) if name.lower().endswith('.xyz'))
+        return [BatchEntry(os.path.splitext(name)[0], xyz_path=os.path.join(source, name)) for name in names]
+    base_dir = os.path.dirname(os.path.abspath(source))
+    entries = []
+    with open(source, 'r', encoding='utf-8', newline='') as f:
+        if source.lower().endswith('.csv'):
+            for index, row in enumerate(csv.DictReader(f)):
+                xyz = row.get('xyz') or None
+                name = row.get('name') or (os.path.splitext(os.path.basename(xyz))[0] if xyz else f"mol{index + 1}")
+                entries.append(BatchEntry(
+                    name,
+                    xyz_path=os.path.join(base_dir, xyz) if xyz else None,
+                    smiles=row.get('smiles') or None,
+                    charge=_optional_int(row.get('charge')),
+                    multiplicity=_optional_int(row.get('multiplicity')),
+                ))
+        else:
+            for index, line in enumerate(f):
+                tokens = line.split('#', 1)[0].split()
+                if not tokens:
+                    continue
+                if tokens[0].lower().endswith('.xyz'):
+                    name = tokens[1] if len(tokens) > 1 else os.path.splitext(os.path.basename(tokens[0]))[0]
+                    entries.append(BatchEntry(name, xyz_path=os.path.join(base_dir, tokens[0])))
+                else:
+                    name = tokens[1] if len(tokens) > 1 else f"mol{index + 1}"
+                    entries.append(BatchEntry(name, smiles=tokens[0]))
+    for entry in entries:
+        if not entry.xyz_path and not entry.smiles:
+            raise ValueError(f"Manifest entry '{entry.name}' has neither an XYZ file nor a SMILES string")
+    return entries
+
+
+def generate_input(entry, template):
+    """Return the ORCA input text for one entry using the method template."""
+    generator = OrcaInputGenerator()
+    if template.get('keywords'):
+        generator.set_keywords(template['keywords'].lstrip('!').split())
+    else:
+        choices = {field: template[field] for field in _KEYWORD_FIELDS if field in template}
+        generator.set_keywords(compose_keywords(**choices))
+    charge = entry.charge if entry.charge is not None else template.get('charge', 0)
+    multiplicity = entry.multiplicity if entry.multiplicity is not None else template.get('multiplicity', 1)
+    generator.set_charge_and_multiplicity(charge, multiplicity)
+    coordinates = entry.coordinates()
+    if not coordinates:
+        raise ValueError(f"No coordinates found for '{entry.name}'")
+    generator.set_coordinates(coordinates)
+    for block_name, block_content in template.get('blocks', {}).items():
+        generator.add_block(block_name, block_content)
+    generator.add_block("pal", f"nprocs {template.get('nprocs', 1)}")
+    if template.get('maxcore'):
+        generator.add_block("maxcore", str(template['maxcore']))
+    return generator.generate_input()
+
+
+def _duration_seconds(job):
+    try:
+        start = time.mktime(time.strptime(job.started_time, '%Y-%m-%d %H:%M:%S'))
+        end = time.mktime(time.strptime(job.finished_time, '%Y-%m-%d %H:%M:%S'))
+    except (TypeError, ValueError):
+        return None
+    return end - start
+
+
+def summarize(job, name):
+    """Return the summary row of a finished job."""
+    parser = OrcaOutputParser(job.output_path)
+    while parser.parse_new() or parser.has_more():
+        pass
+    duration = _duration_seconds(job)
+    return {
+        'name': name,
+        'status': job.status.value,
+        'outcome': job.outcome.code if job.outcome else '',
+        'final_energy': parser.final_energy if parser.final_energy is not None else '',
+        'duration_seconds': duration if duration is not None else '',
+        'input': job.input_path,
+        'output': job.output_path,
+        'error': job.error_msg or '',
+    }
+
+
+def add_stored_results(rows, jobs, results_store):
+    """Fill the STORED_RESULT_FIELDS of the summary rows of jobs from their final geometry in results_store."""
+    table = results_store.table().final_geometries()
+    positions = {job_id: position for position, job_id in enumerate(table['job_id'])}
+    for row, job in zip(rows, jobs):
+        position = positions.get(job.id)
+        if position is None:
+            continue
+        for field in STORED_RESULT_FIELDS:
+            value = float(table[field][position])
+            row[field] = value if not math.isnan(value) else ''
+
+
+def write_summary(rows, path):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def run_batch(entries, template, orca_path, output_dir, max_cores=None, max_memory_mb=None,
+              scratch_root=None, store=None, poll_interval=5.0, result_cache=None, force_recompute=False,
+              memory_reserve_mb=DEFAULT_RESERVE_MB, executors=None, default_executor=LOCAL, results_store=None):
+    """
+    Generate inputs for entries, run them to completion and return the summary rows.
+
+    Entries whose input cannot be generated are reported with status
+    'Skipped' instead of stopping the batch. With a result_cache, inputs
+    computed before are completed from it unless force_recompute is set.
+    A store is only recorded to; the jobs already in it are not run. With a
+    results_store, the property files of the finished jobs are added to it
+    and the summary rows get the STORED_RESULT_FIELDS recorded there.
+    Jobs run on default_executor, e.g. a SlurmExecutor passed in executors.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    updated = threading.Event()
+    manager = JobQueueManager(on_update_callback=updated.set, max_cores=max_cores, max_memory_mb=max_memory_mb,
+                              store=store, scratch_root=scratch_root, result_cache=result_cache,
+                              memory_reserve_mb=memory_reserve_mb, executors=executors,
+                              default_executor=default_executor, restore=False, results_store=results_store)
+    jobs, rows = [], []
+    used_names = set()
+    for entry in entries:
+        name = _safe_name(entry.name)
+        while name in used_names:
+            name += '_'
+        used_names.add(name)
+        input_path = os.path.join(output_dir, name + '.inp')
+        try:
+            text = generate_input(entry, template)
+            with open(input_path, 'w') as f:
+                f.write(text)
+        except Exception as e:
+            logger.error(f"Skipping {entry.name}: {e}")
+            rows.append({'name': entry.name, 'status': 'Skipped', 'input': input_path, 'error': str(e)})
+            continue
+        job = OrcaJob(input_path, os.path.join(output_dir, name + '.out'), orca_path)
+        job.force_recompute = force_recompute
+        manager.add_job(job)
+        jobs.append((entry.name, job))
+    active = (JobStatus.QUEUED, JobStatus.RUNNING)
+    reported = None
+    try:
+        while True:
+            remaining = sum(1 for _, job in jobs if job.status in active)
+            if not remaining:
+                break
+            if remaining != reported:
+                print(f"{len(jobs) - remaining}/{len(jobs)} jobs finished", flush=True)
+                reported = remaining
+            # Woken by every job state change; the timeout only paces progress output
+            updated.wait(poll_interval)
+            updated.clear()
+    except KeyboardInterrupt:
+        print("Interrupted, cancelling remaining jobs...", flush=True)
+        for _, job in jobs:
+            manager.cancel_job(job)
+        while any(job.status in active for _, job in jobs):
+            time.sleep(0.2)
+    finally:
+        manager.stop()
+    summaries = [summarize(job, name) for name, job in jobs]
+    if results_store is not None:
+        add_stored_results(summaries, [job for _, job in jobs], results_store)
+    rows.extend(summaries)
+    return rows
+
+
+def _load_template(args):
+    template = {}
+    if args.template:
+        with open(args.template, 'r', encoding='utf-8') as f:
+            template = json.load(f)
+    overrides = {
+        'job_type': args.job_type, 'method': args.method, 'dft_functional': args.functional,
+        'basis_set': args.basis, 'other_keywords': args.other_keywords, 'keywords': args.keywords,
+        'nprocs': args.nprocs, 'maxcore': args.maxcore, 'charge': args.charge,
+        'multiplicity': args.multiplicity,
+    }
+    template.update({key: value for key, value in overrides.items() if value is not None})
+    if not template.get('keywords'):
+        template.setdefault('job_type', 'Single Point')
+        template.setdefault('method', 'DFT')
+        template.setdefault('dft_functional', 'B3LYP')
+    return template
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m orcaview.batch',
+        description='Generate ORCA inputs for a set of structures and run them without the GUI.'
+    )
+    parser.add_argument('source', help='Directory of .xyz files, or a CSV/text manifest of XYZ files and SMILES')
+    parser.add_argument('--orca', required=True, help='Path to the ORCA executable')
+    parser.add_argument('--template', help='JSON method template (see module documentation)')
+    parser.add_argument('--output-dir', default='orcaview_batch', help='Directory for inputs and outputs')
+    parser.add_argument('--summary', help='CSV summary file (default: <output-dir>/summary.csv)')
+    parser.add_argument('--max-cores', type=int, help='Core budget shared by concurrent jobs (default: all)')
+    parser.add_argument('--max-memory-mb', type=int, help='Memory budget shared by concurrent jobs')
+    parser.add_argument('--memory-reserve-mb', type=int, default=DEFAULT_RESERVE_MB,
+                        help=f'RAM kept free when admitting jobs by %%maxcore x nprocs (default: {DEFAULT_RESERVE_MB})')
+    parser.add_argument('--scratch', help='Run jobs in per-job directories below this path')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not use the result cache in ~/.orcaview/result_cache')
+    parser.add_argument('--force-recompute', action='store_true',
+                        help='Run every job even if the cache has its result (the cache is refreshed)')
+    parser.add_argument('--record-history', action='store_true',
+                        help='Record the jobs and their results in the job history shown by the GUI')
+    parser.add_argument('--executor', choices=[LOCAL, SLURM], default=LOCAL,
+                        help='Run jobs on this machine or submit them to Slurm (default: local)')
+    slurm_group = parser.add_argument_group('Slurm (with --executor slurm; the output directory must be shared)')
+    slurm_group.add_argument('--slurm-partition', help='Partition to submit to')
+    slurm_group.add_argument('--slurm-time', help='Time limit per job, e.g. 1-00:00:00')
+    slurm_group.add_argument('--slurm-account', help='Account to charge')
+    slurm_group.add_argument('--slurm-orca', help='ORCA executable on the cluster (default: --orca)')
+    slurm_group.add_argument('--slurm-setup', action='append', default=[],
+                             help='Shell line run before ORCA in the batch script, e.g. "module load orca"; repeatable')
+    slurm_group.add_argument('--slurm-commands-dir', help='Directory of sbatch/squeue/scancel/sacct (default: PATH)')
+    slurm_group.add_argument('--slurm-poll-interval', type=float, default=30.0,
+                             help='Seconds between squeue polls (default: 30)')
+    template_group = parser.add_argument_group('template overrides')
+    template_group.add_argument('--job-type', help='e.g. "Single Point", "Geometry Optimization"')
+    template_group.add_argument('--method', help='DFT, HF, Semiempirical or xTB')
+    template_group.add_argument('--functional', help='DFT functional')
+    template_group.add_argument('--basis', help='Basis set')
+    template_group.add_argument('--other-keywords', help='Extra simple-input keywords')
+    template_group.add_argument('--keywords', help='Complete simple-input line, bypassing the method choices')
+    template_group.add_argument('--nprocs', type=int, help='Processes per job')
+    template_group.add_argument('--maxcore', type=int, help='Memory per process in MB')
+    template_group.add_argument('--charge', type=int)
+    template_group.add_argument('--multiplicity', type=int)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # With Slurm, ORCA only has to exist on the cluster
+    if args.executor == LOCAL and not os.path.isfile(args.orca):
+        print(f"ORCA executable not found: {args.orca}", file=sys.stderr)
+        return 2
+    try:
+        template = _load_template(args)
+        entries = read_entries(args.source)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if not entries:
+        print(f"No structures found in {args.source}", file=sys.stderr)
+        return 2
+    store = JobStore() if args.record_history else None
+    results_store = ResultsStore() if args.record_history else None
+    result_cache = None if args.no_cache else ResultCache()
+    executors = []
+    if args.executor == SLURM:
+        executors.append(SlurmExecutor(
+            orca_path=args.slurm_orca, partition=args.slurm_partition, time_limit=args.slurm_time,
+            account=args.slurm_account, setup_commands=args.slurm_setup, commands_dir=args.slurm_commands_dir,
+            poll_interval=args.slurm_poll_interval,
+        ))
+    rows = run_batch(entries, template, args.orca, args.output_dir, args.max_cores, args.max_memory_mb,
+                     args.scratch, store, result_cache=result_cache, force_recompute=args.force_recompute,
+                     memory_reserve_mb=args.memory_reserve_mb, executors=executors,
+                     default_executor=args.executor, results_store=results_store)
+    summary_path = args.summary or os.path.join(args.output_dir, 'summary.csv')
+    write_summary(rows, summary_path)
+    failed = [row for row in rows if row.get('status') != JobStatus.DONE.value]
+    print(f"{len(rows) - len(failed)}/{len(rows)} jobs succeeded; summary written to {summary_path}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Live convergence plots for the output monitor.
+
+ConvergencePanel shows two log-scale plots fed by the ConvergenceHistory
+of a job's shared output parser (see output_parser.py): the SCF energy
+change per iteration and the geometry convergence criteria per
+optimization cycle, each criterion with its tolerance as a dashed line.
+The history's series are decimated, so drawing costs the same however
+long the run gets; the plots are redrawn only when the history changed.
+"""
+import math
+
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QSizePolicy
+
+from .output_parser import CONVERGENCE_CRITERIA
+
+CRITERIA_COLORS = {
+    'Energy change': QColor(31, 119, 180),
+    'RMS gradient': QColor(255, 127, 14),
+    'MAX gradient': QColor(214, 39, 40),
+    'RMS step': QColor(44, 160, 44),
+    'MAX step': QColor(148, 103, 189),
+}
+SCF_COLOR = QColor(31, 119, 180)
+
+
+class ConvergencePlot(QWidget):
+    """Line plot of a few series on a logarithmic y axis."""
+
+    MARGIN_LEFT = 48
+    MARGIN_RIGHT = 10
+    MARGIN_TOP = 22
+    MARGIN_BOTTOM = 22
+
+    def __init__(self, title, x_label, parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.x_label = x_label
+        # [(label, QColor, [(x, y), ...], tolerance or None)]
+        self.series = []
+        self.setMinimumSize(260, 160)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+
+    def set_series(self, series):
+        self.series = series
+        self.update()
+
+    def _ranges(self):
+        xs, logs = [], []
+        for _, _, points, tolerance in self.series:
+            for x, y in points:
+                xs.append(x)
+                if y > 0:
+                    logs.append(math.log10(y))
+            if tolerance:
+                logs.append(math.log10(tolerance))
+        if not xs or not logs:
+            return None
+        low, high = math.floor(min(logs)), math.ceil(max(logs))
+        if high == low:
+            high += 1
+        return min(xs), max(max(xs), min(xs) + 1), low, high
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(self.rect(), self.palette().base())
+        plot = QRectF(self.MARGIN_LEFT, self.MARGIN_TOP,
+                      max(self.width() - self.MARGIN_LEFT - self.MARGIN_RIGHT, 1),
+                      max(self.height() - self.MARGIN_TOP - self.MARGIN_BOTTOM, 1))
+        text_color = self.palette().text().color()
+        painter.setPen(text_color)
+        painter.drawText(QRectF(0, 2, self.width(), self.MARGIN_TOP - 4), Qt.AlignmentFlag.AlignCenter, self.title)
+        ranges = self._ranges()
+        if ranges is None:
+            painter.drawText(plot, Qt.AlignmentFlag.AlignCenter, "No data yet")
+            return
+        x_min, x_max, log_min, log_max = ranges
+
+        def to_point(x, log_y):
+            return QPointF(plot.left() + (x - x_min) / (x_max - x_min) * plot.width(),
+                           plot.bottom() - (log_y - log_min) / (log_max - log_min) * plot.height())
+
+        # Decade grid lines and labels
+        grid_pen = QPen(QColor(text_color.red(), text_color.green(), text_color.blue(), 40))
+        step = max(1, (log_max - log_min) // 6)
+        for decade in range(log_max, log_min - 1, -step):
+            y = to_point(x_min, decade).y()
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+            painter.setPen(text_color)
+            painter.drawText(QRectF(0, y - 8, self.MARGIN_LEFT - 4, 16),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, f"1e{decade}")
+        painter.setPen(text_color)
+        painter.drawRect(plot)
+        painter.drawText(QRectF(plot.left(), plot.bottom() + 2, plot.width(), self.MARGIN_BOTTOM - 2),
+                         Qt.AlignmentFlag.AlignLeft, f"{x_min:g}")
+        painter.drawText(QRectF(plot.left(), plot.bottom() + 2, plot.width(), self.MARGIN_BOTTOM - 2),
+                         Qt.AlignmentFlag.AlignCenter, self.x_label)
+        painter.drawText(QRectF(plot.left(), plot.bottom() + 2, plot.width(), self.MARGIN_BOTTOM - 2),
+                         Qt.AlignmentFlag.AlignRight, f"{x_max:g}")
+
+        painter.setClipRect(plot)
+        legend_y = plot.top() + 4
+        for label, color, points, tolerance in self.series:
+            polygon = QPolygonF([to_point(x, math.log10(y)) for x, y in points if y > 0])
+            painter.setPen(QPen(color, 1.5))
+            painter.drawPolyline(polygon)
+            if len(polygon) == 1:
+                painter.drawEllipse(polygon[0], 2, 2)
+            if tolerance:
+                dashed = QPen(color, 1, Qt.PenStyle.DashLine)
+                painter.setPen(dashed)
+                y = to_point(x_min, math.log10(tolerance)).y()
+                painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+            if len(self.series) > 1:
+                painter.setPen(QPen(color, 2))
+                painter.drawLine(QPointF(plot.right() - 110, legend_y + 6), QPointF(plot.right() - 96, legend_y + 6))
+                painter.setPen(text_color)
+                painter.drawText(QRectF(plot.right() - 92, legend_y, 90, 14), Qt.AlignmentFlag.AlignLeft, label)
+                legend_y += 14
+
+
+class ConvergencePanel(QWidget):
+    """SCF and geometry convergence plots of one job, updated from its output parser."""
+
+    def __init__(self, parser, parent=None):
+        super().__init__(parent)
+        self.parser = parser
+        self._version = None
+        self._history = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.scf_plot = ConvergencePlot("SCF |ΔE| (Eh)", "SCF iteration")
+        self.geometry_plot = ConvergencePlot("Geometry convergence", "Optimization cycle")
+        layout.addWidget(self.scf_plot)
+        layout.addWidget(self.geometry_plot)
+        self.refresh()
+
+    def refresh(self):
+        """Redraw if the parser has seen new SCF iterations or optimization cycles."""
+        history = self.parser.convergence
+        if history is self._history and history.version == self._version:
+            return
+        # The parser starts a new history when the output is rewritten
+        self._history, self._version = history, history.version
+        self.scf_plot.set_series([("|ΔE|", SCF_COLOR, history.scf.points(), None)])
+        self.geometry_plot.set_series([
+            (name, CRITERIA_COLORS[name], history.criteria[name].points(), history.tolerances.get(name))
+            for name in CONVERGENCE_CRITERIA if history.criteria[name].count
+        ])
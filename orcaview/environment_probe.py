@@ -0,0 +1,223 @@
+"""
+Detection and caching of the execution environment of an ORCA install.
+
+Probing for MPI and the ORCA version spawns processes and can take seconds,
+so the result is computed once per ORCA executable and cached in
+~/.orcaview/environment_cache.json. A cached entry is reused until the
+executable's modification time or the PATH it was probed with changes.
+"""
+import glob
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from .logger import logger
+
+CACHE_FILE = Path.home() / '.orcaview' / 'environment_cache.json'
+
+# Well-known MPI locations checked when mpiexec is not on PATH
+MPI_SEARCH_PATHS = [
+    'mpiexec.exe',
+    r'C:\Program Files\Microsoft MPI\Bin\mpiexec.exe',
+    r'C:\Program Files (x86)\Microsoft MPI\Bin\mpiexec.exe',
+    r'C:\Program Files\Intel\MPI\*\bin\mpiexec.exe'
+]
+
+# Variables that make ORCA and OpenMPI behave when no MPI runtime is present
+SERIAL_ENV = {
+    'ORCA_NPROCS': '1',
+    'ORCA_MPI_PROCS': '1',
+    'OMPI_MCA_btl_base_warn_component_unused': '0',
+    'OMPI_MCA_mpi_warn_on_fork': '0',
+}
+
+_VERSION_RE = re.compile(r'Program Version\s+(\d+\.\d+\.\d+)|ORCA\s+(\d+\.\d+\.\d+)')
+
+
+class ExecutionEnvironment:
+    """The result of probing one ORCA executable."""
+
+    def __init__(self, orca_path, orca_version=None, mpi_available=False, mpi_dir=None,
+                 orca_mtime=None, path_env='', probed_at=None):
+        self.orca_path = orca_path
+        self.orca_version = orca_version
+        self.mpi_available = mpi_available
+        self.mpi_dir = mpi_dir
+        self.orca_mtime = orca_mtime
+        self.path_env = path_env
+        self.probed_at = probed_at or time.strftime('%Y-%m-%d %H:%M:%S')
+
+    @property
+    def serial_only(self):
+        return not self.mpi_available
+
+    def build_env(self):
+        """Return a fresh environment dict for launching ORCA."""
+        env = os.environ.copy()
+        orca_dir = os.path.dirname(self.orca_path)
+        path_prefix = [orca_dir]
+        if self.mpi_dir:
+            path_prefix.insert(0, self.mpi_dir)
+        # Add ORCA (and MPI) directories to PATH for MPI and other dependencies
+        env['PATH'] = os.pathsep.join(path_prefix + [env.get('PATH', '')])
+        env['RSH_COMMAND'] = 'ssh'  # For remote shell if needed
+        env['ORCA_EXE_DIR'] = orca_dir  # ORCA executable directory
+        if self.serial_only:
+            env.update(SERIAL_ENV)
+        return env
+
+    def summary(self):
+        """Short human-readable description for the UI."""
+        version = self.orca_version or "unknown version"
+        if self.mpi_available:
+            mpi = f"MPI available{f' ({self.mpi_dir})' if self.mpi_dir else ''}"
+        else:
+            mpi = "no MPI (serial only)"
+        return f"ORCA {version} - {mpi} - probed {self.probed_at}"
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class EnvironmentProbe:
+    """Probe ORCA installs once and serve the cached result afterwards."""
+
+    def __init__(self, cache_file=CACHE_FILE):
+        self.cache_file = Path(cache_file)
+        self._lock = threading.Lock()
+        self._environments = self._load_cache()
+        # orca_path -> Event set when the probe running for it ends
+        self._probing = {}
+
+    def get(self, orca_path):
+        """
+        Return the ExecutionEnvironment for orca_path, probing it if needed.
+
+        The probe runs without holding the lock, so peek() and other
+        executables are not held up by it; concurrent callers for the same
+        executable wait for the running probe instead of starting another.
+        """
+        orca_path = os.path.abspath(orca_path)
+        while True:
+            with self._lock:
+                environment = self._environments.get(orca_path)
+                if environment is not None and self._is_current(environment):
+                    return environment
+                in_flight = self._probing.get(orca_path)
+                if in_flight is None:
+                    in_flight = self._probing[orca_path] = threading.Event()
+                    break
+            in_flight.wait()
+        try:
+            environment = self._probe(orca_path)
+            with self._lock:
+                self._environments[orca_path] = environment
+                self._save_cache()
+            return environment
+        finally:
+            with self._lock:
+                del self._probing[orca_path]
+            in_flight.set()
+
+    def peek(self, orca_path):
+        """Return the cached environment for orca_path without probing, or None; never blocks."""
+        if not orca_path:
+            return None
+        return self._environments.get(os.path.abspath(orca_path))
+
+    def invalidate(self, orca_path=None):
+        """Drop the cached result for one executable, or for all of them."""
+        with self._lock:
+            if orca_path is None:
+                self._environments.clear()
+            else:
+                self._environments.pop(os.path.abspath(orca_path), None)
+            self._save_cache()
+
+    def _is_current(self, environment):
+        try:
+            mtime = os.path.getmtime(environment.orca_path)
+        except OSError:
+            return False
+        return mtime == environment.orca_mtime and os.environ.get('PATH', '') == environment.path_env
+
+    def _probe(self, orca_path):
+        logger.info(f"Probing execution environment for {orca_path}")
+        try:
+            orca_mtime = os.path.getmtime(orca_path)
+        except OSError:
+            orca_mtime = None
+        environment = ExecutionEnvironment(
+            orca_path, orca_mtime=orca_mtime, path_env=os.environ.get('PATH', '')
+        )
+        search_env = os.environ.copy()
+        search_env['PATH'] = os.path.dirname(orca_path) + os.pathsep + search_env.get('PATH', '')
+        environment.mpi_available, environment.mpi_dir = self._detect_mpi(search_env)
+        environment.orca_version = self._detect_orca_version(orca_path, search_env)
+        logger.info(f"Environment probe result: {environment.summary()}")
+        return environment
+
+    def _detect_mpi(self, env):
+        """Return (mpi_available, extra_mpi_dir)."""
+        try:
+            # mpiexec -help is more compatible than --version; any response counts
+            subprocess.run(['mpiexec', '-help'], capture_output=True, timeout=10, env=env, text=True)
+            return True, None
+        except FileNotFoundError:
+            logger.debug('mpiexec not found in PATH - trying alternative detection')
+        except subprocess.TimeoutExpired:
+            logger.debug('mpiexec command timed out - assuming MPI is available but slow')
+            return True, None
+        except Exception as e:
+            logger.debug(f'MPI detection error: {e} - assuming MPI is available')
+            return True, None
+
+        for mpi_path in MPI_SEARCH_PATHS:
+            matches = glob.glob(mpi_path) if '*' in mpi_path else [mpi_path]
+            for match in matches:
+                if os.path.exists(match):
+                    logger.debug(f'Found MPI at: {match}')
+                    return True, os.path.dirname(os.path.abspath(match))
+        return False, None
+
+    def _detect_orca_version(self, orca_path, env):
+        """Ask the ORCA binary for its version banner; None if it cannot be read."""
+        try:
+            result = subprocess.run([orca_path, '--version'], capture_output=True, timeout=15,
+                                    env=env, text=True, errors='ignore')
+        except Exception as e:
+            logger.debug(f'ORCA version detection failed: {e}')
+            return None
+        match = _VERSION_RE.search((result.stdout or '') + (result.stderr or ''))
+        if not match:
+            return None
+        return match.group(1) or match.group(2)
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            return {path: ExecutionEnvironment.from_dict(entry) for path, entry in data.items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable environment cache {self.cache_file}: {e}")
+            return {}
+
+    def _save_cache(self):
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump({path: env.to_dict() for path, env in self._environments.items()}, f, indent=2)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.warning(f"Could not write environment cache {self.cache_file}: {e}")
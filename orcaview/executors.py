@@ -0,0 +1,410 @@
+"""
+Executor backends: where and how the queue runs ORCA.
+
+An executor launches one job and returns a handle that behaves like a
+subprocess.Popen for the queue: wait(timeout), poll(), terminate() and
+returncode. LocalExecutor starts ORCA on this machine, on POSIX in a
+session (and process group) of its own: cancelling sends SIGTERM to the
+whole group, so mpirun, the MPI ranks and the orca_* sub-programs get it
+too, escalates to SIGKILL after a grace period and returns only once every
+process of the job's tree is gone. SlurmExecutor writes
+a batch script next to the input, submits it with sbatch and cancels with
+scancel; the cluster must see the input directory under the same path
+(a shared file system), and ORCA's stdout goes to the job's output file
+just like a local run.
+
+The state of all submitted Slurm jobs is polled in one squeue call per
+poll interval, by one thread, however many jobs are running; exit codes of
+the jobs that left the queue are read with one sacct call where sacct is
+available. The Slurm commands are looked up in commands_dir when given, so
+a stand-in script can replace the cluster.
+"""
+import getpass
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from .logger import logger
+from .process_telemetry import PROC_ROOT, process_tree, read_process_table
+
+LOCAL = 'local'
+SLURM = 'slurm'
+
+# Slurm states after which a job is gone for good
+_FAILED_SLURM_STATES = {'BOOT_FAIL', 'CANCELLED', 'DEADLINE', 'FAILED', 'NODE_FAIL', 'OUT_OF_MEMORY',
+                        'PREEMPTED', 'TIMEOUT'}
+
+
+class LocalExecutor:
+    """Runs ORCA as a child process of ORCAView."""
+
+    name = LOCAL
+    runs_locally = True
+    # Seconds the job's processes get to exit after SIGTERM before they are killed
+    TERMINATE_GRACE_SECONDS = 10.0
+    # How long to wait for the processes to disappear after SIGKILL
+    KILL_WAIT_SECONDS = 5.0
+
+    def __init__(self, proc_root=PROC_ROOT):
+        self.proc_root = proc_root
+
+    def launch(self, job, orca_cmd, env, cwd):
+        """Start ORCA with stdout going to the job's output file; returns the Popen."""
+        creationflags = subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+        logger.info(f'Launching ORCA: {orca_cmd} in {cwd}')
+        with open(job.output_path, 'w') as output_file:
+            return subprocess.Popen(
+                orca_cmd,
+                stdout=output_file,
+                stderr=subprocess.STDOUT,  # Redirect stderr to stdout (output file)
+                text=True,
+                env=env,
+                cwd=cwd,
+                creationflags=creationflags if sys.platform == "win32" else 0,
+                # The job's process group, which terminate() signals as a whole
+                start_new_session=sys.platform != "win32"
+            )
+
+    def terminate(self, handle):
+        """
+        Terminate ORCA with all its MPI ranks and sub-programs; returns once they are gone.
+
+        Returns False if processes of the job survived even SIGKILL.
+        """
+        if sys.platform == 'win32':
+            if handle.poll() is None:
+                subprocess.run(['taskkill', '/T', '/F', '/PID', str(handle.pid)], check=False)
+            return True
+        return self._terminate_group(handle, self.TERMINATE_GRACE_SECONDS)
+
+    def kill_leftovers(self, handle):
+        """
+        Terminate processes of a job whose ORCA process has exited but left children behind.
+
+        MPI ranks of an ORCA run that failed can keep running and hold
+        cores; nothing is waited for if the job's process group is empty.
+        """
+        if sys.platform == 'win32' or not self._group_alive(handle.pid, {}):
+            return True
+        logger.warning(f'Processes of ORCA {handle.pid} outlived it; terminating them')
+        return self._terminate_group(handle, self.TERMINATE_GRACE_SECONDS)
+
+    def _terminate_group(self, handle, grace_seconds):
+        pgid = handle.pid  # Session leader: its pid is the group id
+        # Processes that left the group (setsid) are still found through their parents
+        tree = self._descendants(handle.pid)
+        self._signal(pgid, tree, signal.SIGTERM)
+        if self._wait_gone(handle, pgid, tree, grace_seconds):
+            return True
+        logger.warning(f'ORCA {handle.pid} did not exit {grace_seconds:.0f} s after SIGTERM; killing it')
+        tree.update(self._descendants(handle.pid))
+        self._signal(pgid, tree, signal.SIGKILL)
+        if self._wait_gone(handle, pgid, tree, self.KILL_WAIT_SECONDS):
+            return True
+        survivors = sorted(pid for pid, start_time in tree.items() if self._alive(pid, start_time))
+        logger.error(f'Processes of ORCA {handle.pid} survived SIGKILL: {survivors}')
+        return False
+
+    def _descendants(self, root_pid):
+        """{pid: start time} of root_pid and its descendants, from /proc; {} without /proc."""
+        table = read_process_table(self.proc_root)
+        if root_pid not in table:
+            return {}
+        children = {}
+        for pid, (ppid, *_) in table.items():
+            children.setdefault(ppid, []).append(pid)
+        return {pid: table[pid][1] for pid in process_tree(root_pid, children)}
+
+    def _signal(self, pgid, tree, signum):
+        try:
+            os.killpg(pgid, signum)
+        except (ProcessLookupError, PermissionError):
+            pass
+        for pid, start_time in tree.items():
+            # Check the start time so a pid reused by another program is left alone
+            if self._alive(pid, start_time):
+                try:
+                    os.kill(pid, signum)
+                except (ProcessLookupError, PermissionError):
+                    pass
+
+    def _wait_gone(self, handle, pgid, tree, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            handle.poll()  # Reaps ORCA itself; its children are reaped by init
+            if not self._group_alive(pgid, tree):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.2)
+
+    def _group_alive(self, pgid, tree):
+        """True while a process of the group or of the snapshot tree is running (not a zombie)."""
+        if any(self._alive(pid, start_time) for pid, start_time in tree.items()):
+            return True
+        if not os.path.isdir(self.proc_root):
+            try:
+                os.killpg(pgid, 0)
+            except ProcessLookupError:
+                return False
+            except PermissionError:
+                pass
+            return True
+        for name in os.listdir(self.proc_root):
+            fields = self._stat_fields(name) if name.isdigit() else None
+            if fields and int(fields[2]) == pgid and fields[0] not in (b'Z', b'X'):
+                return True
+        return False
+
+    def _stat_fields(self, pid):
+        try:
+            with open(os.path.join(self.proc_root, str(pid), 'stat'), 'rb') as f:
+                stat = f.read()
+        except OSError:
+            return None
+        return stat[stat.rfind(b')') + 2:].split()
+
+    def _alive(self, pid, start_time):
+        """True if pid is still the process that started at start_time and is not a zombie."""
+        fields = self._stat_fields(pid)
+        if fields is None:
+            if os.path.isdir(self.proc_root):
+                return False
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return False
+            except PermissionError:
+                pass
+            return True
+        return fields[0] not in (b'Z', b'X') and int(fields[19]) == start_time
+
+    def attach(self, remote_id):
+        """Local processes do not survive ORCAView; there is nothing to re-attach to."""
+        return None
+
+    def has_capacity(self, active_jobs):
+        return True
+
+    def describe(self):
+        return "Local machine"
+
+
+class SlurmJobHandle:
+    """Popen-like view of one submitted Slurm job, updated by the executor's poller."""
+
+    def __init__(self, executor, slurm_id, command=None):
+        self.executor = executor
+        self.slurm_id = slurm_id
+        self.pid = slurm_id
+        self.args = command
+        self.state = 'PENDING'
+        self.returncode = None
+        self._done = threading.Event()
+
+    def poll(self):
+        return self.returncode if self._done.is_set() else None
+
+    def wait(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise subprocess.TimeoutExpired(self.args or f"slurm job {self.slurm_id}", timeout)
+        return self.returncode
+
+    def terminate(self):
+        self.executor.cancel(self)
+
+    def _finish(self, state, returncode):
+        self.state = state
+        if not returncode and state in _FAILED_SLURM_STATES:
+            returncode = -1
+        self.returncode = returncode
+        self._done.set()
+
+
+class SlurmExecutor:
+    """Submits jobs to a Slurm cluster with sbatch and polls them with squeue."""
+
+    name = SLURM
+    runs_locally = False
+
+    def __init__(self, orca_path=None, partition=None, time_limit=None, account=None, sbatch_options=(),
+                 setup_commands=(), commands_dir=None, poll_interval=30.0, max_active_jobs=200,
+                 memory_overhead_mb=1024):
+        # ORCA on the cluster; None uses the job's own ORCA path
+        self.orca_path = orca_path or None
+        self.partition = partition or None
+        self.time_limit = time_limit or None
+        self.account = account or None
+        # Extra '#SBATCH' options and shell lines (module load ...) for the batch script
+        self.sbatch_options = list(sbatch_options)
+        self.setup_commands = list(setup_commands)
+        self.commands_dir = commands_dir or None
+        self.poll_interval = poll_interval
+        self.max_active_jobs = max_active_jobs
+        # Added to maxcore x nprocs for --mem; ORCA needs some memory beyond maxcore
+        self.memory_overhead_mb = memory_overhead_mb
+        self._handles = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._poller = None
+
+    def _command(self, name):
+        return os.path.join(self.commands_dir, name) if self.commands_dir else name
+
+    def _run(self, args, timeout=60):
+        return subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+
+    def batch_script(self, job, orca_cmd, cwd):
+        """Return the text of the sbatch script for a job."""
+        name = os.path.splitext(os.path.basename(job.input_path))[0]
+        lines = [
+            '#!/bin/bash',
+            f'#SBATCH --job-name=orcaview-{name}',
+            f'#SBATCH --output={os.path.abspath(job.output_path)}',
+            f'#SBATCH --chdir={cwd}',
+            '#SBATCH --nodes=1',
+            f'#SBATCH --ntasks={job.nprocs}',
+        ]
+        if job.maxcore_mb:
+            lines.append(f'#SBATCH --mem={job.memory_mb + self.memory_overhead_mb}M')
+        if self.partition:
+            lines.append(f'#SBATCH --partition={self.partition}')
+        if self.time_limit:
+            lines.append(f'#SBATCH --time={self.time_limit}')
+        if self.account:
+            lines.append(f'#SBATCH --account={self.account}')
+        lines.extend(f'#SBATCH {option}' for option in self.sbatch_options)
+        lines.append('')
+        lines.extend(self.setup_commands)
+        orca = self.orca_path or orca_cmd[0]
+        # ORCA starts its MPI processes itself and needs its full path for that
+        lines.append(' '.join(shlex.quote(part) for part in [orca] + list(orca_cmd[1:])))
+        return '\n'.join(lines) + '\n'
+
+    def launch(self, job, orca_cmd, env, cwd):
+        """Write the batch script next to the input and submit it; returns a SlurmJobHandle."""
+        script_path = os.path.splitext(os.path.abspath(job.input_path))[0] + '.slurm.sh'
+        with open(script_path, 'w', newline='\n') as f:
+            f.write(self.batch_script(job, orca_cmd, cwd))
+        # Start from an empty output file, like a local run, so monitors do not show an old one
+        open(job.output_path, 'w').close()
+        result = self._run([self._command('sbatch'), '--parsable', script_path])
+        if result.returncode != 0:
+            raise RuntimeError(f"sbatch failed: {(result.stderr or result.stdout).strip()}")
+        slurm_id = result.stdout.strip().split(';')[0]
+        if not slurm_id:
+            raise RuntimeError(f"sbatch printed no job id for {script_path}")
+        logger.info(f"Submitted {job.input_path} to Slurm as job {slurm_id}")
+        return self._track(slurm_id, [self._command('sbatch'), script_path])
+
+    def attach(self, remote_id):
+        """Return a handle for a job submitted in an earlier session."""
+        return self._track(str(remote_id))
+
+    def _track(self, slurm_id, command=None):
+        handle = SlurmJobHandle(self, slurm_id, command)
+        with self._lock:
+            self._handles[slurm_id] = handle
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll_loop, daemon=True)
+                self._poller.start()
+        return handle
+
+    def cancel(self, handle):
+        result = self._run([self._command('scancel'), handle.slurm_id])
+        if result.returncode != 0:
+            logger.warning(f"scancel {handle.slurm_id} failed: {(result.stderr or result.stdout).strip()}")
+        # Look at the queue right away instead of waiting for the next poll
+        self._wakeup.set()
+
+    def terminate(self, handle):
+        # The handle's own executor, which may have been replaced since it was submitted
+        if handle.poll() is None:
+            handle.executor.cancel(handle)
+        return True
+
+    def kill_leftovers(self, handle):
+        """Slurm cleans up the processes of a job itself."""
+        return True
+
+    def has_capacity(self, active_jobs):
+        return active_jobs < self.max_active_jobs
+
+    def describe(self):
+        return f"Slurm{f' ({self.partition})' if self.partition else ''}"
+
+    def _poll_loop(self):
+        while True:
+            with self._lock:
+                if not self._handles:
+                    self._poller = None
+                    return
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"Slurm polling failed: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def poll_once(self):
+        """Query the state of every tracked job with one squeue call and finish the ones that left."""
+        with self._lock:
+            tracked = dict(self._handles)
+        if not tracked:
+            return
+        try:
+            result = self._run([self._command('squeue'), '-h', '-o', '%i|%T', '-u', getpass.getuser()])
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"squeue failed, keeping {len(tracked)} Slurm jobs as they were: {e}")
+            return
+        if result.returncode != 0:
+            # The controller may be briefly unreachable; never mistake that for finished jobs
+            logger.warning(f"squeue failed, keeping {len(tracked)} Slurm jobs as they were: {result.stderr.strip()}")
+            return
+        queued = {}
+        for line in result.stdout.splitlines():
+            slurm_id, _, state = line.strip().partition('|')
+            queued[slurm_id] = state
+        finished = []
+        for slurm_id, handle in tracked.items():
+            if slurm_id in queued:
+                handle.state = queued[slurm_id]
+            else:
+                finished.append(slurm_id)
+        if not finished:
+            return
+        accounting = self._accounting(finished)
+        with self._lock:
+            for slurm_id in finished:
+                self._handles.pop(slurm_id, None)
+        for slurm_id in finished:
+            state, returncode = accounting.get(slurm_id, ('COMPLETED', None))
+            logger.info(f"Slurm job {slurm_id} left the queue: {state} (exit code {returncode})")
+            tracked[slurm_id]._finish(state, returncode)
+
+    def _accounting(self, slurm_ids):
+        """Return {id: (state, returncode)} from one sacct call, or {} without sacct."""
+        try:
+            result = self._run([self._command('sacct'), '-n', '-P', '-X', '-o', 'JobID,State,ExitCode',
+                                '-j', ','.join(slurm_ids)])
+        except (OSError, subprocess.TimeoutExpired):
+            return {}
+        if result.returncode != 0:
+            return {}
+        accounting = {}
+        for line in result.stdout.splitlines():
+            fields = line.strip().split('|')
+            if len(fields) < 3:
+                continue
+            slurm_id, state, exit_code = fields[0], fields[1].split()[0] if fields[1] else '', fields[2]
+            code, _, signum = exit_code.partition(':')
+            try:
+                returncode = -int(signum) if signum and int(signum) else int(code)
+            except ValueError:
+                returncode = None
+            accounting[slurm_id] = (state, returncode)
+        return accounting
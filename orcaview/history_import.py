@@ -0,0 +1,282 @@
+"""
+Bulk import of ORCA runs made outside ORCAView into the job history.
+
+HistoryImporter walks a directory tree with os.scandir and treats every
+ORCA output (<name>.out) as one run, together with the <name>.inp and
+<name>.property.txt next to it. The files are parsed in a pool of worker
+processes: the outcome and run time come from the end of the output, the
+resource request and run time features from the input and the energies,
+dipole and thermochemistry from the property file. Each run is registered
+with the queue manager as a finished job, its results go to the manager's
+ResultsStore, and its run time teaches the run time model.
+
+A manifest (~/.orcaview/import_manifest.json) records the modification
+time and size of the files of every imported run and the job it became, so
+importing the same tree again only parses runs whose files have changed;
+a changed run replaces its earlier job.
+"""
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .executors import LOCAL
+from .input_parser import parse_resources
+from .job_outcome import JobOutcome, UNKNOWN, classify_output
+from .job_queue import JobStatus, OrcaJob
+from .logger import logger
+from .output_parser import OrcaOutputParser
+from .property_file import PROPERTY_SUFFIX, parse_property_file, results_from_blocks
+from .runtime_model import runtime_features
+
+MANIFEST_FILE = Path.home() / '.orcaview' / 'import_manifest.json'
+
+# ORCA prints its banner at the very start of the output; other .out files are skipped
+BANNER = b'O   R   C   A'
+HEADER_BYTES = 64 * 1024
+# The run time is printed at the very end of the output
+TAIL_BYTES = 16 * 1024
+
+# Parsed runs are registered with the manager and the results store in batches
+BATCH_SIZE = 200
+
+_SUFFIXES = ('.out', '.inp', PROPERTY_SUFFIX)
+
+
+def find_runs(root):
+    """
+    Return the ORCA runs below root as dicts of their file paths and signature.
+
+    A run is keyed by its output, '<name>.out'; 'input' and 'property' are
+    None when the run has no such file. The signature lists modification
+    time and size of the three files and changes whenever one of them does.
+    Symbolic links to directories are not followed.
+    """
+    runs = []
+    pending = [os.path.abspath(root)]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                entries = list(entries)
+        except OSError as e:
+            logger.warning(f"Cannot scan {directory}: {e}")
+            continue
+        files = {}
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                    continue
+                suffix = next((suffix for suffix in _SUFFIXES if entry.name.endswith(suffix)), None)
+                if suffix is None or not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            files[(entry.name[:-len(suffix)], suffix)] = (entry.path, stat.st_mtime_ns, stat.st_size)
+        for (stem, suffix), output in files.items():
+            if suffix != '.out':
+                continue
+            found = [output] + [files.get((stem, other)) for other in _SUFFIXES[1:]]
+            runs.append({
+                'output': output[0],
+                'input': found[1][0] if found[1] else None,
+                'property': found[2][0] if found[2] else None,
+                'signature': [list(item[1:]) if item else None for item in found],
+            })
+    return runs
+
+
+def _run_seconds(output_path):
+    """The TOTAL RUN TIME printed at the end of an output, or None."""
+    parser = OrcaOutputParser()
+    with open(output_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(f.tell() - TAIL_BYTES, 0))
+        parser.feed(f.read() + b'\n')
+    return parser.run_time_seconds
+
+
+def parse_run(run):
+    """
+    Parse the files of one run from find_runs(); runs in a worker process.
+
+    Returns a plain dict for build_job(), or None if the output is not an
+    ORCA output. Unreadable inputs and property files are left out.
+    """
+    output_path = run['output']
+    with open(output_path, 'rb') as f:
+        if BANNER not in f.read(HEADER_BYTES):
+            return None
+    parsed = dict(run)
+    parsed['outcome'] = classify_output(output_path).to_dict()
+    parsed['run_seconds'] = _run_seconds(output_path)
+    parsed['finished'] = os.path.getmtime(output_path)
+    parsed['nprocs'], parsed['maxcore_mb'], parsed['features'] = 1, None, None
+    if run['input']:
+        try:
+            with open(run['input'], 'r', encoding='utf-8', errors='ignore') as f:
+                text = f.read()
+            parsed['nprocs'], parsed['maxcore_mb'] = parse_resources(text)
+            parsed['features'] = runtime_features(text, run['input'])
+        except OSError:
+            pass
+    parsed['results'] = None
+    if run['property']:
+        try:
+            parsed['results'] = results_from_blocks(parse_property_file(run['property']))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read {run['property']}: {e}")
+    return parsed
+
+
+def _format_time(seconds):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(seconds))
+
+
+def build_job(parsed, job_id=None):
+    """A finished OrcaJob for a run parsed by parse_run()."""
+    output_path = parsed['output']
+    input_path = parsed['input'] or os.path.splitext(output_path)[0] + '.inp'
+    job = OrcaJob(input_path, output_path)
+    job.id = job_id or uuid.uuid4().hex
+    job.imported = True
+    # Runs found on disk count as runs on this machine, so their run times are learned
+    job.executor = LOCAL
+    job.nprocs = parsed['nprocs'] or 1
+    job.maxcore_mb = parsed['maxcore_mb']
+    job.runtime_features = parsed['features']
+    job.outcome = JobOutcome.from_dict(parsed['outcome'])
+    finished = parsed['finished']
+    job.finished_time = _format_time(finished)
+    if parsed['run_seconds'] is not None:
+        job.started_time = _format_time(finished - parsed['run_seconds'])
+    job.submitted_time = job.started_time or job.finished_time
+    if job.outcome.succeeded or (job.outcome.code == UNKNOWN and parsed['run_seconds'] is not None):
+        job.status = JobStatus.DONE
+    else:
+        job.status = JobStatus.ERROR
+        job.error_msg = job.outcome.describe()
+    return job
+
+
+class HistoryImporter:
+    """Imports the ORCA runs of directory trees into a JobQueueManager's history."""
+
+    def __init__(self, manager, manifest_path=MANIFEST_FILE, workers=None):
+        self.manager = manager
+        self.manifest_path = Path(manifest_path)
+        # Worker processes; None uses one per core
+        self.workers = workers
+        self._manifest_lock = threading.Lock()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f).get('runs', {})
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, runs):
+        tmp_path = self.manifest_path.with_name(f"{self.manifest_path.name}.tmp{os.getpid()}")
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': 1, 'runs': runs}, f)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning(f"Could not write the import manifest {self.manifest_path}: {e}")
+
+    def import_tree(self, root, progress=None, stop=None):
+        """
+        Import the runs below root; returns {'imported', 'updated', 'unchanged', 'skipped'} counts.
+
+        progress(done, total, message) is called from this thread as runs are
+        parsed; setting the threading.Event stop ends the import after the
+        runs parsed so far have been registered.
+        """
+        with self._manifest_lock:
+            return self._import_tree(root, progress or (lambda done, total, message: None), stop)
+
+    def _import_tree(self, root, progress, stop):
+        counts = {'imported': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        progress(0, 0, f"Scanning {root}...")
+        runs = find_runs(root)
+        manifest = self._load_manifest()
+        changed = []
+        for run in runs:
+            entry = manifest.get(run['output'])
+            if entry is not None and entry.get('signature') == run['signature']:
+                counts['unchanged'] += 1
+            else:
+                changed.append(run)
+        total = len(changed)
+        logger.info(f"Importing {total} of {len(runs)} runs found below {root} ({counts['unchanged']} unchanged)")
+        progress(0, total, f"Parsing {total} runs ({counts['unchanged']} unchanged)...")
+        batch = []
+        done = 0
+        if changed:
+            # Worker processes are spawned, not forked: the GUI process runs threads
+            with ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = {pool.submit(parse_run, run): run for run in changed}
+                for future in as_completed(futures):
+                    run = futures[future]
+                    done += 1
+                    try:
+                        parsed = future.result()
+                    except Exception as e:
+                        # Unreadable or gone; left out of the manifest, so the next import retries it
+                        logger.warning(f"Could not import {run['output']}: {e}")
+                        counts['skipped'] += 1
+                    else:
+                        if parsed is None:
+                            counts['skipped'] += 1
+                            # Not an ORCA output; not looked at again until it changes
+                            manifest[run['output']] = {'signature': run['signature'], 'job_id': None}
+                        else:
+                            batch.append(parsed)
+                    if len(batch) >= BATCH_SIZE:
+                        self._register(batch, manifest, counts)
+                        batch = []
+                        # Saved after every batch, so an interrupted import resumes where it stopped
+                        self._save_manifest(manifest)
+                    progress(done, total, f"Parsed {done} of {total} runs")
+                    if stop is not None and stop.is_set():
+                        pool.shutdown(cancel_futures=True)
+                        break
+        self._register(batch, manifest, counts)
+        if done:
+            self._save_manifest(manifest)
+        message = (f"Imported {counts['imported']} runs, updated {counts['updated']}, "
+                   f"{counts['unchanged']} unchanged, {counts['skipped']} skipped")
+        if done < total:
+            message += f" (stopped after {done} of {total})"
+        logger.info(message)
+        progress(done, total, message)
+        return counts
+
+    def _register(self, batch, manifest, counts):
+        """Add parsed runs to the manager and the results store, and record them in the manifest."""
+        if not batch:
+            return
+        jobs, results = [], []
+        for parsed in batch:
+            previous_id = manifest.get(parsed['output'], {}).get('job_id')
+            job = build_job(parsed, previous_id)
+            jobs.append(job)
+            counts['updated' if previous_id else 'imported'] += 1
+            if parsed['results'] is not None:
+                status, version, rows = parsed['results']
+                results.append((job.id, job.input_path, job.status.value, status, version, parsed['finished'], rows))
+            manifest[parsed['output']] = {'signature': parsed['signature'], 'job_id': job.id}
+        self.manager.import_jobs(jobs)
+        if self.manager.results_store is not None and results:
+            try:
+                self.manager.results_store.add_many(results)
+            except Exception as e:
+                logger.warning(f"Could not record the results of imported runs: {e}")
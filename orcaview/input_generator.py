@@ -1,3 +1,56 @@
+from . import config
+
+
+def compose_keywords(job_type, method, dft_functional="", basis_set="", se_method="", xtb_method="",
+                     solvation_model="None", solvent="", other_keywords=""):
+    """
+    Build the simple-input keyword list from the choices offered in the UI.
+
+    job_type, se_method and xtb_method are the display names used as keys in
+    config; an empty or '---' functional/basis placeholder falls back to the
+    defaults the Method tab uses.
+    """
+    keyword_parts = [config.JOB_TYPES.get(job_type, "")]
+    if method == "DFT":
+        keyword_parts.append(dft_functional if not dft_functional.startswith("---") else "")
+        keyword_parts.append(basis_set if not basis_set.startswith("---") else "def2-SVP")
+    elif method == "HF":
+        keyword_parts.append("HF")
+        keyword_parts.append(basis_set if not basis_set.startswith("---") else "def2-SVP")
+    elif method == "Semiempirical":
+        keyword_parts.append(config.SEMIEMPIRICAL_METHODS.get(se_method, ""))
+    elif method == "xTB":
+        keyword_parts.append(config.XTB_METHODS.get(xtb_method, ""))
+    if solvation_model and solvation_model != "None":
+        model_keyword = "CPCM" if solvation_model == "CPCMC" else solvation_model
+        if solvent:
+            keyword_parts.append(f"{model_keyword}({solvent})")
+    if other_keywords:
+        keyword_parts.extend(other_keywords.split())
+    return [part for part in keyword_parts if part]
+
+
+def parse_coordinates(coords_text):
+    """
+    Return [[atom, x, y, z], ...] from XYZ text.
+
+    Only lines with four fields are coordinates, so the atom count and
+    comment lines of an XYZ file are skipped. Raises ValueError naming the
+    first four-field line that is not a coordinate.
+    """
+    coordinates = []
+    for line in coords_text.split('\n'):
+        parts = line.split()
+        if len(parts) == 4:
+            try:
+                atom = parts[0]
+                x, y, z = map(float, parts[1:])
+            except ValueError:
+                raise ValueError(f"Could not parse coordinate line: {line}")
+            coordinates.append([atom, x, y, z])
+    return coordinates
+
+
 class OrcaInputGenerator:
     def __init__(self):
         self.keywords = []
@@ -0,0 +1,140 @@
+"""
+Lightweight readers for ORCA input files.
+
+These helpers only understand the parts of the input format that the job
+queue needs (resource requests, keywords, blocks and coordinates); they are
+not a full ORCA input parser.
+"""
+import os
+import re
+
+_PAL_KEYWORD_RE = re.compile(r'^PAL(\d+)$', re.IGNORECASE)
+_PAL_BLOCK_RE = re.compile(r'%pal\b(.*?)\bend\b', re.IGNORECASE | re.DOTALL)
+_NPROCS_RE = re.compile(r'\bnprocs\s+(\d+)', re.IGNORECASE)
+_MAXCORE_RE = re.compile(r'%maxcore\s+(\d+)', re.IGNORECASE)
+
+
+def strip_comments(text):
+    """Remove ORCA '#' comments from the input text."""
+    return "\n".join(line.split('#', 1)[0] for line in text.splitlines())
+
+
+def keyword_lines(text):
+    """Return the tokens of all '!' simple input lines, in order."""
+    tokens = []
+    for line in strip_comments(text).splitlines():
+        stripped = line.strip()
+        if stripped.startswith('!'):
+            tokens.extend(stripped[1:].split())
+    return tokens
+
+
+def parse_resources(text):
+    """
+    Return the (nprocs, maxcore_mb) requested by an ORCA input.
+
+    nprocs comes from '%pal nprocs N end' or a 'PALn' keyword and defaults
+    to 1. maxcore_mb is the per-process '%maxcore' value in MB, or None
+    when the input does not set it.
+    """
+    text = strip_comments(text)
+    nprocs = 1
+    for token in keyword_lines(text):
+        match = _PAL_KEYWORD_RE.match(token)
+        if match:
+            nprocs = int(match.group(1))
+    pal_match = _PAL_BLOCK_RE.search(text)
+    if pal_match:
+        nprocs_match = _NPROCS_RE.search(pal_match.group(1))
+        if nprocs_match:
+            nprocs = int(nprocs_match.group(1))
+    maxcore_match = _MAXCORE_RE.search(text)
+    maxcore = int(maxcore_match.group(1)) if maxcore_match else None
+    return max(nprocs, 1), maxcore
+
+
+def read_resources(input_path):
+    """Read an input file and return its (nprocs, maxcore_mb) request."""
+    with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+        return parse_resources(f.read())
+
+
+_COORDINATE_BLOCK_RE = re.compile(
+    r'^\s*\*\s*(xyz|int|internal|gzmt)\s+(-?\d+)\s+(\d+)\s*$(.*?)^\s*\*',
+    re.IGNORECASE | re.MULTILINE | re.DOTALL
+)
+_COORDINATE_FILE_RE = re.compile(
+    r'^\s*\*\s*(xyzfile|gzmtfile)\s+(-?\d+)\s+(\d+)\s+(\S+)', re.IGNORECASE | re.MULTILINE
+)
+_ELEMENT_RE = re.compile(r'^([A-Za-z]{1,2})')
+
+
+def _element(token):
+    match = _ELEMENT_RE.match(token)
+    if not match:
+        return None
+    symbol = match.group(1)
+    return symbol[0].upper() + symbol[1:].lower()
+
+
+def parse_molecule(text):
+    """
+    Return (charge, multiplicity, elements, xyz_file) from the input's coordinate section.
+
+    elements is the tuple of element symbols in input order, or None when
+    the coordinates live in an external file (xyz_file is then its name as
+    written in the input). Returns None when the input has no coordinates.
+    """
+    text = strip_comments(text)
+    match = _COORDINATE_BLOCK_RE.search(text)
+    if match:
+        elements = []
+        for line in match.group(4).splitlines():
+            tokens = line.split()
+            if tokens:
+                element = _element(tokens[0])
+                if element is not None:
+                    elements.append(element)
+        return int(match.group(2)), int(match.group(3)), tuple(elements), None
+    match = _COORDINATE_FILE_RE.search(text)
+    if match:
+        return int(match.group(2)), int(match.group(3)), None, match.group(4).strip('"')
+    return None
+
+
+def read_xyz_elements(xyz_path):
+    """Return the element symbols of the first structure in an XYZ file."""
+    with open(xyz_path, 'r', encoding='utf-8', errors='ignore') as f:
+        count = int(f.readline().split()[0])
+        f.readline()  # Comment line
+        return tuple(_element(f.readline().split()[0]) for _ in range(count))
+
+
+def read_molecule(input_path):
+    """
+    Read an input file and return (charge, multiplicity, elements), or None.
+
+    Coordinates given through '* xyzfile' are read from the referenced XYZ
+    file, relative to the input's directory.
+    """
+    with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+        molecule = parse_molecule(f.read())
+    if molecule is None:
+        return None
+    charge, multiplicity, elements, xyz_file = molecule
+    if elements is None:
+        if not xyz_file.lower().endswith('.xyz'):
+            return None
+        xyz_path = os.path.join(os.path.dirname(os.path.abspath(input_path)), xyz_file)
+        try:
+            elements = read_xyz_elements(xyz_path)
+        except (OSError, ValueError, IndexError):
+            return None
+    return charge, multiplicity, elements
+
+
+def requests_moread(text):
+    """True if the input already reads starting orbitals itself (MORead / %moinp)."""
+    if any(token.lower() == 'moread' for token in keyword_lines(text)):
+        return True
+    return '%moinp' in strip_comments(text).lower()
@@ -0,0 +1,113 @@
+"""
+Classification of how an ORCA run ended.
+
+ORCA reports its fate at the end of the output file, so the classifier only
+reads the last few hundred KB and scans those lines from the end backwards
+instead of reading a possibly multi-GB output from the start.
+"""
+import os
+import re
+
+# Outcome codes
+NORMAL_TERMINATION = 'normal_termination'
+SCF_NOT_CONVERGED = 'scf_not_converged'
+GBW_OPEN_ERROR = 'gbw_open_error'
+OUT_OF_MEMORY = 'out_of_memory'
+MPI_FAILURE = 'mpi_failure'
+INPUT_ERROR = 'input_error'
+ABORTED = 'aborted'
+NO_OUTPUT = 'no_output'
+UNKNOWN = 'unknown'
+
+OUTCOME_DESCRIPTIONS = {
+    NORMAL_TERMINATION: "ORCA terminated normally",
+    SCF_NOT_CONVERGED: "SCF did not converge",
+    GBW_OPEN_ERROR: "Cannot open GBW file",
+    OUT_OF_MEMORY: "Out of memory",
+    MPI_FAILURE: "MPI failure",
+    INPUT_ERROR: "Error in the input",
+    ABORTED: "ORCA aborted the run",
+    NO_OUTPUT: "No output was written",
+    UNKNOWN: "ORCA stopped without a recognized message",
+}
+
+# How much of the end of the output file is examined
+TAIL_BYTES = 256 * 1024
+
+# Checked in order: the first pattern found anywhere in the tail decides the
+# outcome, so specific causes win over the generic abort messages that ORCA
+# prints after them.
+_PATTERNS = [
+    (NORMAL_TERMINATION, re.compile(r'ORCA TERMINATED NORMALLY')),
+    (GBW_OPEN_ERROR, re.compile(r'Cannot open GBW file', re.IGNORECASE)),
+    (OUT_OF_MEMORY, re.compile(
+        r'not enough memory|out of memory|std::bad_alloc|memory allocation failed|Please increase MaxCore',
+        re.IGNORECASE)),
+    (SCF_NOT_CONVERGED, re.compile(r'SCF NOT CONVERGED|The SCF is NOT CONVERGED', re.IGNORECASE)),
+    (MPI_FAILURE, re.compile(
+        r'mpirun (?:noticed|has exited|was unable)|MPI_ABORT|ORTE (?:has lost|was unable)|'
+        r'mpiexec.*(?:failed|not found)|primary job\s+terminated normally, but',
+        re.IGNORECASE)),
+    (INPUT_ERROR, re.compile(r'INPUT ERROR|Unknown identifier|UNRECOGNIZED OR DUPLICATED KEYWORD',
+                             re.IGNORECASE)),
+    (ABORTED, re.compile(r'ABORTING THE RUN|error termination|\bError\b:', re.IGNORECASE)),
+]
+
+
+class JobOutcome:
+    """Structured result of classify_output()."""
+
+    def __init__(self, code, line=None):
+        self.code = code
+        # The output line that decided the outcome, if any
+        self.line = line
+
+    @property
+    def succeeded(self):
+        return self.code == NORMAL_TERMINATION
+
+    def describe(self):
+        description = OUTCOME_DESCRIPTIONS.get(self.code, self.code)
+        if self.line and self.code != NORMAL_TERMINATION:
+            return f"{description}: {self.line}"
+        return description
+
+    def to_dict(self):
+        return {'code': self.code, 'line': self.line}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('code', UNKNOWN), data.get('line'))
+
+    def __repr__(self):
+        return f"JobOutcome({self.code!r}, {self.line!r})"
+
+
+def read_tail_lines(path, tail_bytes=TAIL_BYTES):
+    """Return the lines of the last tail_bytes of path, last line first."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        start = max(0, size - tail_bytes)
+        f.seek(start)
+        data = f.read()
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    if start > 0 and lines:
+        lines = lines[1:]  # Drop the partial first line
+    lines.reverse()
+    return lines
+
+
+def classify_output(path, tail_bytes=TAIL_BYTES):
+    """Classify the end of an ORCA output file into a JobOutcome."""
+    try:
+        lines = read_tail_lines(path, tail_bytes)
+    except (OSError, TypeError):
+        return JobOutcome(NO_OUTPUT)
+    if not any(line.strip() for line in lines):
+        return JobOutcome(NO_OUTPUT)
+    for code, pattern in _PATTERNS:
+        for line in lines:
+            if pattern.search(line):
+                return JobOutcome(code, line.strip())
+    return JobOutcome(UNKNOWN)
@@ -1,12 +1,37 @@
 import threading
 import time
 from enum import Enum
-from collections import deque
 import logging
-import sys
+import os
+import shutil
+import subprocess
 import traceback
+import uuid
+
+from .environment_probe import EnvironmentProbe
+from .executors import LOCAL, LocalExecutor
+from .input_parser import parse_resources
+from .job_outcome import JobOutcome, GBW_OPEN_ERROR, UNKNOWN, classify_output
+from .logger import logger
+from .orbital_reuse import OrbitalLibrary, OrbitalReuse
+from .priority_queue import JobPriorityQueue
+from .process_telemetry import DEFAULT_INTERVAL as DEFAULT_TELEMETRY_INTERVAL, JobTelemetry, TelemetrySampler
+from .result_cache import fingerprint_file
+from .runtime_model import RuntimeModel, runtime_features
+from .scratch import ScratchDirectory
+from .system_memory import DEFAULT_MAXCORE_MB, DEFAULT_RESERVE_MB, MemoryAdmission
+from .workflow import hand_off
 logging.basicConfig(level=logging.INFO, force=True)
 
+
+def _timestamp(value):
+    """Seconds since the epoch of a '%Y-%m-%d %H:%M:%S' job time, or None."""
+    try:
+        return time.mktime(time.strptime(value, '%Y-%m-%d %H:%M:%S'))
+    except (TypeError, ValueError):
+        return None
+
+
 class JobStatus(Enum):
     QUEUED = 'Queued'
     RUNNING = 'Running'
@@ -16,6 +41,7 @@ class JobStatus(Enum):
 
 class OrcaJob:
     def __init__(self, input_path, output_path, orca_path=None):
+        self.id = uuid.uuid4().hex
         self.input_path = input_path
         self.output_path = output_path
         self.orca_path = orca_path
@@ -24,53 +50,484 @@ class OrcaJob:
         self.started_time = None
         self.finished_time = None
         self.error_msg = None
+        # JobOutcome assigned when the process exits (see job_outcome)
+        self.outcome = None
         self.process = None
+        self.environment = None
+        # Shared incremental parser of the output file (see output_parser.parser_for_job)
+        self.output_parser = None
+        # Incremented on every state change so views can update only changed rows
+        self.version = 0
+        self._cancel_requested = False
+        # Thread terminating the job's processes after cancel_job()
+        self._terminator = None
+        # Resource request read from the input (%pal nprocs / %maxcore)
+        self.nprocs = 1
+        self.maxcore_mb = None
+        # Peak size of the job's scratch directory, when it ran in one
+        self.scratch_peak_bytes = None
+        # Result cache (see result_cache.py): skip the lookup when forced,
+        # and remember whether the result came from the cache
+        self.force_recompute = False
+        self.fingerprint = None
+        self.cache_hit = False
+        # Set for jobs generated by a parameter sweep (see sweep.py)
+        self.sweep_id = None
+        self.sweep_label = None
+        # Jobs that must finish successfully first; the first one hands over
+        # its final geometry and optionally its orbitals (see workflow.py)
+        self.dependencies = []
+        self.handoff_geometry = True
+        self.handoff_orbitals = False
+        # Dependency ids read from the store, resolved by the manager
+        self._dependency_ids = []
+        # Why the dispatcher holds this queued job back (not persisted)
+        self.wait_reason = None
+        # Ordering in the queue (see priority_queue.py): higher priority runs
+        # first; jobs of one project share the cores fairly with other projects
+        self.priority = 0
+        self.project = None
+        self.queue_rank = None
+        # Name of the executor that runs the job (see executors.py) and the
+        # job's id there, e.g. the Slurm job id, once it was submitted
+        self.executor = None
+        self.remote_id = None
+        # MORead injected into the job's own input while it runs (see orbital_reuse.py)
+        self.orbital_reuse = None
+        # CPU, memory and I/O of the job's process tree (see process_telemetry.py)
+        self.telemetry = None
+        # What the run time depends on, read from the input (see runtime_model.py),
+        # and the job's rank in shortest-predicted-first order
+        self.runtime_features = None
+        self.sjf_rank = None
+        self._prediction = (None, None)  # (model version, predicted seconds)
+        # Found on disk by the history importer rather than run by ORCAView (see history_import.py)
+        self.imported = False
+
+    @property
+    def project_key(self):
+        """Fair-share group: the explicit project, else the sweep, else the input's directory."""
+        if self.project:
+            return self.project
+        if self.sweep_id:
+            return f"sweep:{self.sweep_id}"
+        return os.path.dirname(os.path.abspath(self.input_path))
+
+    def depends_on(self, parent, orbitals=False):
+        """Hold this job until parent has finished and start it from parent's geometry."""
+        self.dependencies.append(parent)
+        self.handoff_orbitals = self.handoff_orbitals or orbitals
+
+    @property
+    def memory_mb(self):
+        """Total memory demand in MB (maxcore x nprocs), with ORCA's default maxcore if unset."""
+        return (self.maxcore_mb or DEFAULT_MAXCORE_MB) * self.nprocs
+
+    def to_record(self):
+        """Return a plain dict of the job's persistent state (see JobStore)."""
+        return {
+            'id': self.id,
+            'input_path': self.input_path,
+            'output_path': self.output_path,
+            'orca_path': self.orca_path,
+            'status': self.status.value,
+            'submitted_time': self.submitted_time,
+            'started_time': self.started_time,
+            'finished_time': self.finished_time,
+            'error_msg': self.error_msg,
+            'nprocs': self.nprocs,
+            'maxcore_mb': self.maxcore_mb,
+            'extra': self._extra_record(),
+        }
+
+    def _extra_record(self):
+        extra = {'priority': self.priority}
+        if self.project:
+            extra['project'] = self.project
+        if self.executor:
+            extra['executor'] = self.executor
+        if self.remote_id:
+            extra['remote_id'] = self.remote_id
+        if self.status == JobStatus.QUEUED and self.queue_rank is not None:
+            extra['queue_rank'] = self.queue_rank
+        if self.status == JobStatus.QUEUED and self.sjf_rank is not None:
+            extra['sjf_rank'] = self.sjf_rank
+        if self.runtime_features is not None:
+            extra['runtime_features'] = self.runtime_features
+        if self.outcome is not None:
+            extra['outcome'] = self.outcome.to_dict()
+        if self.scratch_peak_bytes is not None:
+            extra['scratch_peak_bytes'] = self.scratch_peak_bytes
+        if self.telemetry is not None:
+            extra['telemetry'] = self.telemetry.to_dict()
+        if self.force_recompute:
+            extra['force_recompute'] = True
+        if self.fingerprint is not None:
+            extra['fingerprint'] = self.fingerprint
+            extra['cache_hit'] = self.cache_hit
+        if self.imported:
+            extra['imported'] = True
+        if self.sweep_id is not None:
+            extra['sweep_id'] = self.sweep_id
+            extra['sweep_label'] = self.sweep_label
+        if self.orbital_reuse is not None:
+            extra['orbital_reuse'] = self.orbital_reuse.to_dict()
+        if self.dependencies:
+            extra['depends_on'] = [parent.id for parent in self.dependencies]
+            extra['handoff_geometry'] = self.handoff_geometry
+            extra['handoff_orbitals'] = self.handoff_orbitals
+        return extra
+
+    @classmethod
+    def from_record(cls, record):
+        """Rebuild a job from a dict produced by to_record()."""
+        job = cls(record['input_path'], record['output_path'], record.get('orca_path'))
+        job.id = record['id']
+        job.status = JobStatus(record['status'])
+        job.submitted_time = record.get('submitted_time')
+        job.started_time = record.get('started_time')
+        job.finished_time = record.get('finished_time')
+        job.error_msg = record.get('error_msg')
+        job.nprocs = record.get('nprocs') or 1
+        job.maxcore_mb = record.get('maxcore_mb')
+        extra = record.get('extra') or {}
+        if extra.get('outcome'):
+            job.outcome = JobOutcome.from_dict(extra['outcome'])
+        job.scratch_peak_bytes = extra.get('scratch_peak_bytes')
+        if extra.get('telemetry'):
+            job.telemetry = JobTelemetry.from_dict(extra['telemetry'])
+        job.force_recompute = extra.get('force_recompute', False)
+        job.fingerprint = extra.get('fingerprint')
+        job.cache_hit = extra.get('cache_hit', False)
+        job.sweep_id = extra.get('sweep_id')
+        job.sweep_label = extra.get('sweep_label')
+        job.priority = extra.get('priority', 0)
+        job.project = extra.get('project')
+        job.queue_rank = extra.get('queue_rank')
+        job.sjf_rank = extra.get('sjf_rank')
+        job.runtime_features = extra.get('runtime_features')
+        job.imported = extra.get('imported', False)
+        job.executor = extra.get('executor')
+        job.remote_id = extra.get('remote_id')
+        if extra.get('orbital_reuse'):
+            job.orbital_reuse = OrbitalReuse.from_dict(extra['orbital_reuse'])
+        job._dependency_ids = list(extra.get('depends_on', []))
+        job.handoff_geometry = extra.get('handoff_geometry', True)
+        job.handoff_orbitals = extra.get('handoff_orbitals', False)
+        return job
+
+    def read_resource_request(self):
+        """Update nprocs/maxcore_mb and the run time features from the job's input file."""
+        try:
+            with open(self.input_path, 'r', encoding='utf-8', errors='ignore') as f:
+                text = f.read()
+        except OSError as e:
+            logger.warning(f"Could not read resource request from {self.input_path}: {e}")
+            return
+        self.nprocs, self.maxcore_mb = parse_resources(text)
+        self.runtime_features = runtime_features(text, self.input_path)
+        self._prediction = (None, None)
 
 class JobQueueManager:
-    def __init__(self, on_update_callback=None):
-        self.queue = deque()
-        self.running_job = None
+    # How often the size of a job's scratch directory is sampled
+    SCRATCH_SAMPLE_SECONDS = 10
+    # How often jobs held for memory are reconsidered; other programs may free it
+    MEMORY_RECHECK_SECONDS = 15
+
+    def __init__(self, on_update_callback=None, max_cores=None, max_memory_mb=None, environment_probe=None,
+                 store=None, scratch_root=None, reuse_orbitals=True, result_cache=None,
+                 memory_reserve_mb=DEFAULT_RESERVE_MB, executors=None, default_executor=LOCAL, restore=True,
+                 telemetry_interval=DEFAULT_TELEMETRY_INTERVAL, shortest_first=False, results_store=None):
+        self.queue = JobPriorityQueue(shortest_first)
+        self.running_jobs = []
         self.completed_jobs = []
+        # Budget used to pack concurrent jobs; a single job that exceeds the
+        # budget on its own is still started once nothing else is running.
+        self.max_cores = max_cores or os.cpu_count() or 1
+        self.max_memory_mb = max_memory_mb
+        # Checks demands against the machine's RAM (see system_memory.py)
+        self.memory_admission = MemoryAdmission(memory_reserve_mb)
+        self._held_for_memory = False
+        self._wait_reasons_changed = False
+        self._waiting = {}  # job id -> queued job with a wait_reason
+        # Parent job id -> queued children, and the failed or cancelled
+        # parents whose children the dispatcher still has to cancel
+        self._children = {}
+        self._failed_parents = []
+        # MPI/version detection is cached per ORCA executable
+        self.environment_probe = environment_probe or EnvironmentProbe()
+        # Fast local directory (tmpfs, NVMe) to run jobs in; None runs them next to the input
+        self.scratch_root = scratch_root or None
+        # Samples CPU, memory and I/O of running local jobs from /proc
+        self.telemetry = TelemetrySampler(telemetry_interval)
+        # Learns run times from finished local jobs, for ETAs and shortest-first order
+        self.runtime_model = RuntimeModel()
+        # Start jobs from the GBW of a finished job on the same molecule (MORead)
+        self.reuse_orbitals = reuse_orbitals
+        self.orbital_library = OrbitalLibrary()
+        # Optional ResultCache; identical inputs complete from it without running ORCA
+        self.result_cache = result_cache
+        # Optional ResultsStore; the property file of every finished job is recorded to it
+        self.results_store = results_store
+        # Executors by name; jobs without an executor of their own use the default
+        self.executors = {LOCAL: LocalExecutor()}
+        for executor in executors or ():
+            self.executors[executor.name] = executor
+        self.default_executor = default_executor
         self.lock = threading.Lock()
         self.condition = threading.Condition(self.lock)
         self._should_stop = False
         self.on_update_callback = on_update_callback
+        # Optional JobStore; every state change is written through to it.
+        # With restore=False the store is only recorded to: the jobs in it
+        # belong to another session (the GUI) and are left alone.
+        self.store = store
+        resumed = []
+        if self.store is not None and restore:
+            resumed = self._restore_from_store()
+            # Reading the inputs of old jobs can take a while; the queue does not wait for it
+            threading.Thread(target=self._learn_run_times, args=(list(self.completed_jobs),), daemon=True).start()
         self.worker_thread = threading.Thread(target=self._worker, daemon=True)
         self.worker_thread.start()
+        for job in resumed:
+            threading.Thread(target=self._resume_job, args=(job,), daemon=True).start()
 
     def add_job(self, job):
+        job.read_resource_request()
+        job.executor = job.executor or self.default_executor
+        self._set_sjf_rank(job)
+        with self.condition:
+            self._check_dependencies(job, self._known_ids())
+            self.queue.push(job)
+            self._link_to_parents(job)
+            self._job_changed(job)
+            self.condition.notify()
+        logger.info(f"Job added: {job.input_path} (nprocs={job.nprocs}, maxcore={job.maxcore_mb})")
+        self._trigger_update()
+
+    def add_jobs(self, jobs):
+        """Queue several jobs at once, in the given order, with a single store transaction."""
+        for job in jobs:
+            job.read_resource_request()
+            job.executor = job.executor or self.default_executor
+            self._set_sjf_rank(job)
+        with self.condition:
+            known = self._known_ids()
+            for job in jobs:
+                self._check_dependencies(job, known)
+                known.add(job.id)
+            for job in jobs:
+                self.queue.push(job)
+                self._link_to_parents(job)
+                job.version += 1
+            if self.store is not None:
+                self.store.save_many([job.to_record() for job in jobs])
+            self.condition.notify()
+        logger.info(f"{len(jobs)} jobs added")
+        self._trigger_update()
+
+    def import_jobs(self, jobs):
+        """
+        Add finished runs found on disk (see history_import.py) to the history.
+
+        A job with the id of one already in the history replaces it: the run
+        was imported before and its files have changed since. The run time
+        model already learned from such a run, so only new runs teach it.
+        """
+        ids = {job.id for job in jobs}
+        with self.condition:
+            known = {job.id for job in self.completed_jobs}
+            self.completed_jobs[:] = [job for job in self.completed_jobs if job.id not in ids]
+            self.completed_jobs.extend(jobs)
+            for job in jobs:
+                job.version += 1
+                if job.id not in known:
+                    self._learn_run_time(job)
+            if self.store is not None:
+                self.store.save_many([job.to_record() for job in jobs])
+        logger.info(f"{len(jobs)} runs imported into the job history")
+        self._trigger_update()
+
+    def _known_ids(self):
+        """Ids of every job the manager holds (caller holds the lock)."""
+        return {job.id for job in self.queue.jobs() + self.running_jobs + self.completed_jobs}
+
+    def _check_dependencies(self, job, known_ids):
+        """
+        Refuse jobs whose parents the manager does not know yet.
+
+        Parents must be added before their children, which also keeps the
+        dependency graph free of cycles. Caller holds the lock.
+        """
+        for parent in job.dependencies:
+            if parent.id not in known_ids:
+                raise ValueError(f"Parent job {parent.input_path} of {job.input_path} has not been added")
+
+    def _link_to_parents(self, job):
+        """Index a queued job under its unfinished parents (caller holds the lock)."""
+        for parent in job.dependencies:
+            if parent.status == JobStatus.DONE:
+                continue
+            self._children.setdefault(parent.id, []).append(job)
+            if parent.status in (JobStatus.ERROR, JobStatus.CANCELLED):
+                self._failed_parents.append(parent)
+
+    def dependency_state(self, job):
+        """Return ('ready' | 'waiting' | 'failed', blocking parent or None) for a queued job."""
+        for parent in job.dependencies:
+            if parent.status in (JobStatus.ERROR, JobStatus.CANCELLED):
+                return 'failed', parent
+        for parent in job.dependencies:
+            if parent.status != JobStatus.DONE:
+                return 'waiting', parent
+        return 'ready', None
+
+    def sweep_progress(self):
+        """Return {sweep id: {JobStatus: count}} for the sweeps that still have queued or running jobs."""
+        with self.lock:
+            active = {job.sweep_id for job in self.queue.jobs() + self.running_jobs if job.sweep_id}
+            if not active:
+                return {}
+            progress = {sweep_id: {} for sweep_id in active}
+            for job in self.queue.jobs() + self.running_jobs + self.completed_jobs:
+                counts = progress.get(job.sweep_id)
+                if counts is not None:
+                    counts[job.status] = counts.get(job.status, 0) + 1
+        return progress
+
+    def predict_runtime(self, job):
+        """Predicted wall time of a job in seconds, or None when the run time model cannot tell."""
+        version, seconds = job._prediction
+        if version != self.runtime_model.version:
+            seconds = self.runtime_model.predict(job.runtime_features, job.nprocs)
+            job._prediction = (self.runtime_model.version, seconds)
+        return seconds
+
+    def queue_eta(self):
+        """
+        Return (seconds, jobs without a prediction) until the local queue is worked off.
+
+        The remaining core-seconds of the running and queued local jobs are
+        spread over the core budget, which assumes the queue keeps it full.
+        """
+        with self.lock:
+            running = [job for job in self.running_jobs if self.runs_locally(job)]
+            queued = [job for job in self.queue.jobs() if self.runs_locally(job)]
+            max_cores = self.max_cores
+        now = time.time()
+        core_seconds = 0.0
+        unknown = 0
+        for job in running + queued:
+            seconds = self.predict_runtime(job)
+            if seconds is None:
+                unknown += 1
+                continue
+            started = _timestamp(job.started_time) if job.status == JobStatus.RUNNING else None
+            if started is not None:
+                seconds = max(seconds - (now - started), 0.0)
+            core_seconds += seconds * job.nprocs
+        return core_seconds / max_cores, unknown
+
+    def set_shortest_first(self, enabled):
+        """Order queued jobs of equal priority by predicted run time instead of fair share."""
         with self.condition:
-            self.queue.append(job)
+            self.queue.set_shortest_first(enabled)
             self.condition.notify()
-        print('JOB ADDED:', job.input_path)
         self._trigger_update()
 
+    def _set_sjf_rank(self, job):
+        """
+        Rank a new job for shortest-first order: its submission time plus its predicted run time.
+
+        Jobs without a prediction count as short, so the model learns about them early.
+        """
+        if job.sjf_rank is None:
+            submitted = _timestamp(job.submitted_time) or time.time()
+            job.sjf_rank = submitted + (self.predict_runtime(job) or 0.0)
+
+    def _learn_run_time(self, job):
+        """Feed a job that finished successfully on this machine to the run time model."""
+        if job.status != JobStatus.DONE or job.cache_hit or not self.runs_locally(job):
+            return
+        started, finished = _timestamp(job.started_time), _timestamp(job.finished_time)
+        if started is None or finished is None:
+            return
+        self.runtime_model.observe(job.runtime_features, job.nprocs, finished - started)
+
+    def _learn_run_times(self, jobs):
+        """Learn from the history of earlier sessions, reading the inputs of jobs stored without features."""
+        for job in jobs:
+            if job.runtime_features is None and job.status == JobStatus.DONE and not job.cache_hit:
+                try:
+                    with open(job.input_path, 'r', encoding='utf-8', errors='ignore') as f:
+                        job.runtime_features = runtime_features(f.read(), job.input_path)
+                except OSError:
+                    continue
+            self._learn_run_time(job)
+        logger.info(f"Run time model learned from {self.runtime_model.observations} finished jobs")
+
+    def set_force_recompute(self, job, enabled):
+        """Make a queued job bypass (and refresh) the result cache."""
+        with self.condition:
+            if job.status != JobStatus.QUEUED:
+                return False
+            job.force_recompute = enabled
+            self._job_changed(job)
+        self._trigger_update()
+        return True
+
     def cancel_job(self, job):
         with self.lock:
-            if job.status == JobStatus.QUEUED:
-                self.queue.remove(job)
+            if job.status == JobStatus.QUEUED and self.queue.remove(job):
                 job.status = JobStatus.CANCELLED
+                job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
                 self.completed_jobs.append(job)
+                self._job_changed(job)
+                # Let the dispatcher cancel the jobs that depend on this one
+                self._failed_parents.append(job)
+                self.condition.notify()
                 self._trigger_update()
                 return True
-            elif job.status == JobStatus.RUNNING:
-                # Instead of terminating here (which can deadlock GUI), set a cancel flag
+            elif job.status == JobStatus.RUNNING and job in self.running_jobs:
+                # The job's runner thread is blocked in process.wait(); killing the
+                # process wakes it up, and the runner then waits for the terminator
+                # until all of the job's processes are gone. Killing happens off the
+                # GUI thread because it may wait out a grace period. If the process has
+                # not been launched yet, the runner sees the flag right after launching.
                 job._cancel_requested = True
+                if job.process is not None and job._terminator is None:
+                    job._terminator = threading.Thread(target=self._terminate_process, args=(job,), daemon=True)
+                    job._terminator.start()
                 return True
         return False
 
-    def reorder_job(self, job, new_index):
+    def move_job(self, job, offset):
+        """Move a queued job one place up (-1) or down (1) in dispatch order."""
         with self.lock:
-            if job in self.queue:
-                self.queue.remove(job)
-                self.queue.insert(new_index, job)
+            moved = self.queue.move(job, offset)
+            if moved:
+                self._job_changed(job)
+        self._trigger_update()
+        return moved
+
+    def set_priority(self, job, priority):
+        """Change the priority of a queued job; higher priorities run first."""
+        with self.condition:
+            if not self.queue.reprioritize(job, priority):
+                return False
+            self._job_changed(job)
+            # A higher priority may let the job start right away
+            self.condition.notify()
         self._trigger_update()
+        return True
 
     def remove_completed_job(self, job):
         """Remove a completed job from the completed jobs list."""
         with self.lock:
             if job in self.completed_jobs and job.status in (JobStatus.DONE, JobStatus.ERROR, JobStatus.CANCELLED):
                 self.completed_jobs.remove(job)
+                if self.store is not None:
+                    self.store.delete([job.id])
                 self._trigger_update()
                 return True
         return False
@@ -81,281 +538,560 @@ class JobQueueManager:
             finished_jobs = [job for job in self.completed_jobs if job.status in (JobStatus.DONE, JobStatus.ERROR, JobStatus.CANCELLED)]
             for job in finished_jobs:
                 self.completed_jobs.remove(job)
+            if self.store is not None:
+                self.store.delete([job.id for job in finished_jobs])
             self._trigger_update()
             return len(finished_jobs)
 
+    def set_budget(self, max_cores=None, max_memory_mb=None):
+        """Change the core/memory budget; a falsy value means the default/unlimited."""
+        with self.condition:
+            self.max_cores = max_cores or os.cpu_count() or 1
+            self.max_memory_mb = max_memory_mb or None
+            # A larger budget may let queued jobs start right away
+            self.condition.notify()
+
+    def set_executor(self, executor):
+        """Register (or replace) an executor under its name."""
+        with self.condition:
+            self.executors[executor.name] = executor
+            self.condition.notify()
+
+    def set_default_executor(self, name):
+        """Choose the executor of jobs added from now on."""
+        with self.lock:
+            self.default_executor = name
+
+    def set_job_executor(self, job, name):
+        """Send a queued job to another executor."""
+        with self.condition:
+            if job.status != JobStatus.QUEUED:
+                return False
+            job.executor = name
+            self._job_changed(job)
+            self.condition.notify()
+        self._trigger_update()
+        return True
+
+    def executor_for(self, job):
+        """The executor that runs job; raises RuntimeError if it is not configured."""
+        name = job.executor or self.default_executor
+        executor = self.executors.get(name)
+        if executor is None:
+            raise RuntimeError(f"Executor '{name}' is not configured")
+        return executor
+
+    def runs_locally(self, job):
+        """Whether job runs on this machine (and counts against the local budget)."""
+        executor = self.executors.get(job.executor or self.default_executor)
+        return executor is None or executor.runs_locally
+
+    def set_memory_reserve(self, reserve_mb):
+        """Change the memory kept free for the system when admitting jobs."""
+        with self.condition:
+            self.memory_admission.reserve_mb = reserve_mb if reserve_mb is not None else DEFAULT_RESERVE_MB
+            self.condition.notify()
+
+    def set_scratch_root(self, scratch_root):
+        """Change the scratch root used by jobs started from now on; falsy disables scratch."""
+        with self.lock:
+            self.scratch_root = scratch_root or None
+
+    def cores_in_use(self):
+        """Number of local cores claimed by the running jobs (caller holds the lock)."""
+        return sum(job.nprocs for job in self.running_jobs if self.runs_locally(job))
+
+    def memory_in_use(self):
+        """Local memory in MB claimed by the running jobs (caller holds the lock)."""
+        return sum(job.memory_mb for job in self.running_jobs if self.runs_locally(job))
+
+    def _fits(self, job, memory=None):
+        """
+        Check whether job fits next to the running jobs (caller holds the lock).
+
+        memory is the MemorySnapshot of this dispatch pass, or None where
+        the machine's memory is unknown. Sets job.wait_reason when the job
+        is held back. The first local job is exempt from the core and
+        memory budgets, so a job larger than the budget still runs, but it
+        still waits for memory that other programs hold.
+        """
+        executor = self.executors.get(job.executor or self.default_executor)
+        if executor is not None and not executor.runs_locally:
+            # The cluster's scheduler packs remote jobs; only cap how many are submitted
+            active = sum(1 for running in self.running_jobs if running.executor == executor.name)
+            return executor.has_capacity(active)
+        alone = not any(self.runs_locally(running) for running in self.running_jobs)
+        held_for_memory = False
+        if not alone and self.cores_in_use() + job.nprocs > self.max_cores:
+            reason = f"Waiting for cores: needs {job.nprocs}, {self.cores_in_use()} of {self.max_cores} in use"
+        elif not alone and self.max_memory_mb and self.memory_in_use() + job.memory_mb > self.max_memory_mb:
+            reason = f"Waiting for memory: needs {job.memory_mb} MB of the {self.max_memory_mb} MB budget"
+            held_for_memory = True
+        else:
+            reason = self.memory_admission.check(job.memory_mb, self.memory_in_use(), memory, alone=alone)
+            held_for_memory = reason is not None
+        self._set_wait_reason(job, reason)
+        if held_for_memory:
+            self._held_for_memory = True
+        return reason is None
+
+    def _set_wait_reason(self, job, reason):
+        """Change why a queued job waits; shown in the queue's tooltip only, not persisted."""
+        if reason == job.wait_reason:
+            return
+        job.wait_reason = reason
+        job.version += 1
+        self._wait_reasons_changed = True
+        if reason is None:
+            self._waiting.pop(job.id, None)
+        else:
+            self._waiting[job.id] = job
+
+    def _cancel_orphaned_jobs(self):
+        """
+        Cancel the queued children of parents that failed or were cancelled, transitively.
+
+        Only the children of _failed_parents are looked at, not the whole
+        queue. Returns the number of jobs cancelled. Caller holds the lock.
+        """
+        cancelled = 0
+        while self._failed_parents:
+            parent = self._failed_parents.pop()
+            for job in self._children.pop(parent.id, ()):
+                if job.status != JobStatus.QUEUED or not self.queue.remove(job):
+                    continue
+                job.status = JobStatus.CANCELLED
+                job.error_msg = f"Parent job {os.path.basename(parent.input_path)} did not finish successfully"
+                job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
+                self.completed_jobs.append(job)
+                self._job_changed(job)
+                logger.info(f"Job {job.input_path} cancelled: {job.error_msg}")
+                self._failed_parents.append(job)
+                cancelled += 1
+        return cancelled
+
+    def _take_startable_jobs(self):
+        """
+        Move every queued job that fits into the budget to the running slots.
+
+        Jobs are considered in queue order; a large job at the head does not
+        block smaller jobs behind it from filling idle cores, and jobs still
+        waiting for their parents are passed over.
+        Caller holds the lock.
+        """
+        started = []
+        considered = set()
+        self._held_for_memory = False
+        self._wait_reasons_changed = False
+        memory = self.memory_admission.snapshot()
+        for job in self.queue:
+            if len(self.executors) == 1 and self.running_jobs and self.cores_in_use() >= self.max_cores:
+                break  # Nothing else can fit; skip the rest of a long queue
+            if self.dependency_state(job)[0] != 'ready':
+                continue
+            considered.add(job.id)
+            if self._fits(job, memory):
+                if memory is not None:
+                    # The new job has not allocated yet; count its demand for this pass
+                    memory.available_mb -= job.memory_mb
+                self.queue.take(job)
+                self.running_jobs.append(job)
+                job.status = JobStatus.RUNNING
+                job.started_time = time.strftime('%Y-%m-%d %H:%M:%S')
+                self._job_changed(job)
+                started.append(job)
+        # Reasons of jobs this pass did not look at (or that left the queue) are stale
+        for job in [job for job_id, job in self._waiting.items() if job_id not in considered]:
+            self._set_wait_reason(job, None)
+        return started
+
     def _worker(self):
-        import threading
         while not self._should_stop:
             with self.condition:
-                while self.running_job is not None or not self.queue:
-                    self.condition.wait(timeout=0.5)
-                    if self._should_stop:
-                        return
-                job = self.queue.popleft()
-                print('DEQUEUED JOB:', job.input_path)
-                self.running_job = job
-                job.status = JobStatus.RUNNING
-                job.started_time = time.strftime('%Y-%m-%d %H:%M:%S')
-                print('SET JOB TO RUNNING:', job.input_path)
-                self._trigger_update()  # Update UI when job starts running
-            if job:
-                try:
-                    print('STEP: about to import subprocess and os')
-                    import subprocess
-                    import os
-                    print('STEP: about to set up env')
-                    env = os.environ.copy()
-                    if job.orca_path:
-                        orca_dir = os.path.dirname(os.path.abspath(job.orca_path))
-                        old_path = env.get('PATH', '')
-                        # Add ORCA directory to PATH for MPI and other dependencies
-                        env['PATH'] = orca_dir + os.pathsep + old_path
-                        
-                        # Set ORCA-specific environment variables for better compatibility
-                        env['RSH_COMMAND'] = 'ssh'  # For remote shell if needed
-                        env['ORCA_EXE_DIR'] = orca_dir  # ORCA executable directory
-                        
-                        # Check MPI availability with improved detection
-                        mpi_available = False
-                        try:
-                            # Try multiple MPI detection methods
-                            print('Testing MPI availability...')
-                            
-                            # Method 1: Check mpiexec with help flag (more compatible than --version)
-                            result = subprocess.run(['mpiexec', '-help'], 
-                                                   capture_output=True, timeout=10, env=env, text=True)
-                            print(f'mpiexec -help exit code: {result.returncode}')
-                            print(f'mpiexec stdout: {result.stdout[:200]}...' if result.stdout else 'No stdout')
-                            
-                            # Consider MPI available if mpiexec responds (even with non-zero exit code)
-                            mpi_available = True
-                            print('MPI available - parallel execution enabled')
-                            
-                        except FileNotFoundError:
-                            print('mpiexec not found in PATH - trying alternative detection')
-                            
-                            # Method 2: Check for common MPI installations
-                            mpi_paths = [
-                                'mpiexec.exe',
-                                r'C:\Program Files\Microsoft MPI\Bin\mpiexec.exe',
-                                r'C:\Program Files (x86)\Microsoft MPI\Bin\mpiexec.exe',
-                                r'C:\Program Files\Intel\MPI\*\bin\mpiexec.exe'
-                            ]
-                            
-                            for mpi_path in mpi_paths:
-                                if '*' in mpi_path:
-                                    # Handle wildcard paths
-                                    import glob
-                                    matches = glob.glob(mpi_path)
-                                    if matches:
-                                        print(f'Found MPI at: {matches[0]}')
-                                        mpi_available = True
-                                        # Add MPI directory to PATH
-                                        mpi_dir = os.path.dirname(matches[0])
-                                        env['PATH'] = mpi_dir + os.pathsep + env['PATH']
-                                        break
-                                else:
-                                    import os
-                                    if os.path.exists(mpi_path):
-                                        print(f'Found MPI at: {mpi_path}')
-                                        mpi_available = True
-                                        # Add MPI directory to PATH
-                                        mpi_dir = os.path.dirname(mpi_path)
-                                        env['PATH'] = mpi_dir + os.pathsep + env['PATH']
-                                        break
-                            
-                            if not mpi_available:
-                                print('No MPI installation detected')
-                                
-                        except subprocess.TimeoutExpired:
-                            print('mpiexec command timed out - assuming MPI is available but slow')
-                            mpi_available = True
-                            
-                        except Exception as e:
-                            print(f'MPI detection error: {e} - assuming MPI is available')
-                            mpi_available = True
-                        
-                        # Only force serial execution if MPI is definitely not available
-                        if not mpi_available:
-                            print('MPI not available - forcing serial execution')
-                            # Force ORCA to run in serial mode by setting nprocs to 1
-                            env['ORCA_NPROCS'] = '1'
-                            env['ORCA_MPI_PROCS'] = '1'
-                            # Disable OpenMPI warnings about missing components
-                            env['OMPI_MCA_btl_base_warn_component_unused'] = '0'
-                            env['OMPI_MCA_mpi_warn_on_fork'] = '0'
-                        else:
-                            print('MPI detected - allowing parallel execution')
-                    print('STEP: about to set input_dir and creationflags')
-                    input_dir = os.path.dirname(os.path.abspath(job.input_path))
-                    creationflags = subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                    
-                    # Prepare ORCA command arguments
-                    # Use full absolute paths for both ORCA executable and input file for parallel job support
-                    orca_executable = os.path.abspath(job.orca_path)
-                    input_file = os.path.abspath(job.input_path)
-                    
-                    # Only modify input file if MPI is not available
-                    if env.get('ORCA_NPROCS') == '1':
-                        print('Modifying input file for serial execution')
-                        try:
-                            # Read the input file
-                            with open(input_file, 'r') as f:
-                                input_content = f.read()
-                            
-                            # Check if %pal block exists and modify it
-                            lines = input_content.split('\n')
-                            modified_lines = []
-                            in_pal_block = False
-                            pal_block_modified = False
-                            
-                            for line in lines:
-                                line_stripped = line.strip().lower()
-                                if line_stripped.startswith('%pal'):
-                                    in_pal_block = True
-                                    modified_lines.append(line)
-                                elif in_pal_block and line_stripped == 'end':
-                                    in_pal_block = False
-                                    if not pal_block_modified:
-                                        # Add nprocs 1 before end
-                                        modified_lines.append('   nprocs 1')
-                                        pal_block_modified = True
-                                    modified_lines.append(line)
-                                elif in_pal_block and 'nprocs' in line_stripped:
-                                    # Replace existing nprocs with 1
-                                    modified_lines.append('   nprocs 1')
-                                    pal_block_modified = True
-                                else:
-                                    modified_lines.append(line)
-                            
-                            # If no %pal block exists, add one
-                            if not pal_block_modified:
-                                # Find the first line that doesn't start with ! or #
-                                insert_index = 0
-                                for i, line in enumerate(modified_lines):
-                                    if not line.strip().startswith(('!', '#', '%')):
-                                        insert_index = i
-                                        break
-                                
-                                # Insert %pal block
-                                modified_lines.insert(insert_index, '%pal')
-                                modified_lines.insert(insert_index + 1, '   nprocs 1')
-                                modified_lines.insert(insert_index + 2, 'end')
-                                modified_lines.insert(insert_index + 3, '')
-                            
-                            # Write back the modified content
-                            with open(input_file, 'w') as f:
-                                f.write('\n'.join(modified_lines))
-                            
-                            print('Input file modified for serial execution')
-                        except Exception as e:
-                            print(f'Warning: Could not modify input file for serial execution: {e}')
-                    else:
-                        print('MPI available - preserving original input file for parallel execution')
-                    
-                    orca_cmd = [orca_executable, input_file]
-                    
-                    print('ABOUT TO LAUNCH ORCA DIRECTLY:', orca_cmd)
-                    print('WORKING DIRECTORY:', input_dir)
-                    
-                    # Open output file for writing
-                    with open(job.output_path, 'w') as output_file:
-                        job.process = subprocess.Popen(
-                            orca_cmd,
-                            stdout=output_file,
-                            stderr=subprocess.STDOUT,  # Redirect stderr to stdout (output file)
-                            text=True,
-                            env=env,
-                            cwd=input_dir,
-                            creationflags=creationflags if sys.platform == "win32" else 0
-                        )
-                    print('ORCA LAUNCHED, WAITING FOR COMPLETION')
-                    while True:
-                        # Check for cancellation
-                        if getattr(job, '_cancel_requested', False):
-                            if job.process and job.process.poll() is None:
-                                print('TERMINATING PROCESS FOR CANCEL:', job.input_path)
-                                try:
-                                    if sys.platform == 'win32':
-                                        import subprocess
-                                        print(f'Attempting to taskkill PID tree: {job.process.pid}')
-                                        subprocess.run(['taskkill', '/T', '/F', '/PID', str(job.process.pid)], check=False)
-                                    else:
-                                        job.process.terminate()
-                                except Exception as te:
-                                    print('EXCEPTION DURING TERMINATE:', te)
-                                job.status = JobStatus.CANCELLED
-                                job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
-                                print('JOB CANCELLED:', job.input_path)
-                                self._trigger_update()  # Update UI when job is cancelled
-                                break
-                        if job.process.poll() is not None:
-                            break
-                        time.sleep(0.2)
-                    if job.status != JobStatus.CANCELLED:
-                        job.process.wait()  # Ensure process is fully finished
-                        print('ORCA FINISHED. RETURN CODE:', job.process.returncode)
-                        print('OUTPUT WRITTEN TO:', job.output_path)
-                        if job.process.returncode == 0:
-                            job.status = JobStatus.DONE
-                            job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
-                            print('JOB FINISHED SUCCESSFULLY:', job.input_path)
-                        else:
-                            # Check output file for normal ORCA termination
-                            output_ok = False
-                            try:
-                                if job.output_path and os.path.isfile(job.output_path):
-                                    with open(job.output_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                        for line in f:
-                                            if 'ORCA TERMINATED NORMALLY' in line:
-                                                output_ok = True
-                                                break
-                            except Exception as file_err:
-                                print('ERROR READING OUTPUT FILE:', file_err)
-                            if output_ok:
-                                job.status = JobStatus.DONE
-                                job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
-                                print('JOB FINISHED SUCCESSFULLY (output file check):', job.input_path)
-                            else:
-                                job.status = JobStatus.ERROR
-                                job.error_msg = f"STDOUT:\n{stdout}\nSTDERR:\n{stderr}"
-                                job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
-                                print('JOB FAILED:', job.input_path, 'STDOUT:', stdout, 'STDERR:', stderr)
-                except Exception as e:
-                    print('EXCEPTION IN WORKER FOR JOB:', job.input_path if job else None, e)
-                    traceback.print_exc()
-                    job.status = JobStatus.ERROR
-                    job.error_msg = str(e)
-                    job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
-                with self.lock:
-                    self.completed_jobs.append(job)
-                    self.running_job = None
-                    print('JOB MOVED TO COMPLETED:', job.input_path)
-                    # Trigger UI update when job completes
-                    self._trigger_update()
-                    # Also notify condition to wake up worker for next job
-                    self.condition.notify()
-            time.sleep(0.5)
+                cancelled = self._cancel_orphaned_jobs()
+                started = self._take_startable_jobs()
+                if not started:
+                    if cancelled or self._wait_reasons_changed:
+                        self._trigger_update()
+                    # Woken by add_job, job completion, budget changes or stop();
+                    # jobs held for memory are also reconsidered periodically
+                    self.condition.wait(self.MEMORY_RECHECK_SECONDS if self._held_for_memory else None)
+                    continue
+            for job in started:
+                logger.info(f"Starting job: {job.input_path} ({job.nprocs} cores)")
+                threading.Thread(target=self._run_job, args=(job,), daemon=True).start()
+            self._trigger_update()  # Update UI when jobs start running
+
+    def _force_serial_input(self, input_file):
+        """Rewrite the input file so that it requests a single process."""
+        try:
+            with open(input_file, 'r') as f:
+                input_content = f.read()
+
+            # Check if %pal block exists and modify it
+            lines = input_content.split('\n')
+            modified_lines = []
+            in_pal_block = False
+            pal_block_modified = False
+
+            for line in lines:
+                line_stripped = line.strip().lower()
+                if line_stripped.startswith('%pal'):
+                    in_pal_block = True
+                    modified_lines.append(line)
+                elif in_pal_block and line_stripped == 'end':
+                    in_pal_block = False
+                    if not pal_block_modified:
+                        # Add nprocs 1 before end
+                        modified_lines.append('   nprocs 1')
+                        pal_block_modified = True
+                    modified_lines.append(line)
+                elif in_pal_block and 'nprocs' in line_stripped:
+                    # Replace existing nprocs with 1
+                    modified_lines.append('   nprocs 1')
+                    pal_block_modified = True
+                else:
+                    modified_lines.append(line)
+
+            # If no %pal block exists, add one
+            if not pal_block_modified:
+                # Find the first line that doesn't start with ! or #
+                insert_index = 0
+                for i, line in enumerate(modified_lines):
+                    if not line.strip().startswith(('!', '#', '%')):
+                        insert_index = i
+                        break
+
+                # Insert %pal block
+                modified_lines.insert(insert_index, '%pal')
+                modified_lines.insert(insert_index + 1, '   nprocs 1')
+                modified_lines.insert(insert_index + 2, 'end')
+                modified_lines.insert(insert_index + 3, '')
+
+            # Write back the modified content
+            with open(input_file, 'w') as f:
+                f.write('\n'.join(modified_lines))
+            logger.info(f'Input file modified for serial execution: {input_file}')
+        except Exception as e:
+            logger.warning(f'Could not modify input file for serial execution: {e}')
+
+    def _run_job(self, job):
+        """Run a single job to completion in its own thread."""
+        try:
+            # Before fingerprinting: the handed-over geometry is part of the input
+            handoff = hand_off(job)
+        except (OSError, ValueError) as e:
+            logger.error(f'Hand-off to {job.input_path} failed: {e}')
+            job.status = JobStatus.ERROR
+            job.error_msg = f"Hand-off from parent job failed: {e}"
+            job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
+            self._finish_job(job)
+            return
+        if self._complete_from_cache(job):
+            self._record_results(job)
+            self._finish_job(job)
+            return
+        scratch = None
+        reuse = None
+        try:
+            executor = self.executor_for(job)
+            serial_only = False
+            env = None
+            if executor.runs_locally:
+                job.environment = self.environment_probe.get(job.orca_path)
+                env = job.environment.build_env()
+                serial_only = job.environment.serial_only
+
+            # Prepare ORCA command arguments
+            # Use full absolute paths for both ORCA executable and input file for parallel job support
+            orca_executable = os.path.abspath(job.orca_path)
+            input_file = os.path.abspath(job.input_path)
+            with self.lock:
+                scratch_root = self.scratch_root
+                reuse_orbitals = self.reuse_orbitals
+                candidates = list(self.completed_jobs)
+            if scratch_root and executor.runs_locally:
+                # ORCA's temporary files stay on the fast scratch storage
+                scratch = ScratchDirectory(scratch_root, job)
+                input_file = scratch.stage()
+            input_dir = os.path.dirname(input_file)
+
+            if reuse_orbitals:
+                # Start the SCF from the orbitals of a finished job on the same molecule
+                reuse = self.orbital_library.prepare(job, input_file, candidates)
+                if reuse is not None and scratch is None:
+                    # The user's own input was rewritten; keep the original in the
+                    # store until it is restored, in case ORCAView does not get to it
+                    with self.lock:
+                        job.orbital_reuse = reuse
+                        self._job_changed(job)
+
+            # Only modify input file if MPI is not available
+            if serial_only:
+                self._force_serial_input(input_file)
+
+            orca_cmd = [orca_executable, input_file]
+            self._execute(job, executor, orca_cmd, env, input_dir, scratch)
+            if job._cancel_requested:
+                job.status = JobStatus.CANCELLED
+                job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
+                logger.info(f'Job cancelled: {job.input_path}')
+            else:
+                # Only the end of the output is read, however large the file is
+                job.outcome = classify_output(job.output_path)
+                # Reused and handed-over orbitals are mutually exclusive: both make the input request MORead
+                injected = reuse or handoff
+                if job.outcome.code == GBW_OPEN_ERROR and injected is not None:
+                    logger.warning(f'ORCA could not read the orbitals of {injected.source_gbw}; '
+                                   f'running {job.input_path} again from a fresh guess')
+                    injected.revert()
+                    if handoff is not None and scratch is not None:
+                        # The hand-off was written to the job's own input; ORCA runs the staged copy
+                        shutil.copyfile(job.input_path, input_file)
+                    reuse = handoff = job.orbital_reuse = None
+                    if serial_only:
+                        self._force_serial_input(input_file)
+                    self._execute(job, executor, orca_cmd, env, input_dir, scratch)
+                    job.outcome = classify_output(job.output_path)
+                self._record_exit(job)
+        except Exception as e:
+            logger.error(f'Exception in worker for job {job.input_path}: {e}')
+            traceback.print_exc()
+            job.status = JobStatus.ERROR
+            job.error_msg = str(e)
+            job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
+        if reuse is not None:
+            # Leave the user's input as it was and drop the copied GBW
+            reuse.revert()
+            job.orbital_reuse = None
+        if scratch is not None:
+            # Copy back the artefacts even for failed or cancelled jobs (e.g. the GBW for a restart)
+            scratch.finish()
+            job.scratch_peak_bytes = scratch.peak_bytes
+            logger.info(f'Scratch usage of {job.input_path}: peak {scratch.peak_bytes / 2**20:.1f} MB')
+        if self.result_cache is not None and job.fingerprint and job.status == JobStatus.DONE:
+            self.result_cache.store(job.fingerprint, job, replace=job.force_recompute)
+        self._record_results(job)
+        self._finish_job(job)
+
+    def _record_exit(self, job):
+        """Set the final status of a job whose ORCA run ended, from its outcome and return code."""
+        returncode = job.process.returncode
+        job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
+        if job._cancel_requested:
+            job.status = JobStatus.CANCELLED
+        elif job.outcome.succeeded or (returncode == 0 and job.outcome.code == UNKNOWN):
+            job.status = JobStatus.DONE
+        else:
+            job.status = JobStatus.ERROR
+            job.error_msg = f"{job.outcome.describe()} (return code {returncode})"
+            # Batch schedulers report why they ended a job (TIMEOUT, OUT_OF_MEMORY, ...)
+            state = getattr(job.process, 'state', None)
+            if state and state != 'COMPLETED':
+                job.error_msg += f", {job.executor} state {state}"
+            logger.warning(f'Job failed: {job.input_path} ({job.error_msg})')
+
+    def _resume_job(self, job):
+        """Wait for a job that kept running on a remote executor while ORCAView was closed."""
+        try:
+            handle = self.executor_for(job).attach(job.remote_id)
+            with self.lock:
+                job.process = handle
+                cancel_requested = job._cancel_requested
+            if cancel_requested:
+                self._terminate_process(job)
+            handle.wait()
+            job.outcome = classify_output(job.output_path)
+            self._record_exit(job)
+        except Exception as e:
+            logger.error(f'Could not resume {job.input_path} on {job.executor}: {e}')
+            job.status = JobStatus.ERROR
+            job.error_msg = f"Lost track of the {job.executor} job {job.remote_id}: {e}"
+            job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
+        if job.orbital_reuse is not None:
+            job.orbital_reuse.revert()
+            job.orbital_reuse = None
+        if self.result_cache is not None and job.fingerprint and job.status == JobStatus.DONE:
+            self.result_cache.store(job.fingerprint, job, replace=job.force_recompute)
+        self._record_results(job)
+        self._finish_job(job)
+
+    def _record_results(self, job):
+        """Add the energies, dipole and thermochemistry of a finished job to the results store."""
+        if self.results_store is None or job.status == JobStatus.CANCELLED:
+            return
+        try:
+            self.results_store.add_job(job)
+        except Exception as e:
+            logger.warning(f'Could not record the results of {job.input_path}: {e}')
+
+    def _complete_from_cache(self, job):
+        """Fingerprint the job and, unless recomputing is forced, finish it from a cached result."""
+        if self.result_cache is None:
+            return False
+        try:
+            job.fingerprint = fingerprint_file(job.input_path)
+        except OSError as e:
+            logger.warning(f'Could not fingerprint {job.input_path}: {e}')
+            return False
+        if job.force_recompute:
+            return False
+        try:
+            meta = self.result_cache.restore(job.fingerprint, job)
+        except OSError as e:
+            logger.warning(f'Could not restore cached result for {job.input_path}: {e}')
+            return False
+        if meta is None:
+            return False
+        job.cache_hit = True
+        job.outcome = JobOutcome.from_dict(meta['outcome']) if meta.get('outcome') else None
+        job.status = JobStatus.DONE
+        job.finished_time = time.strftime('%Y-%m-%d %H:%M:%S')
+        logger.info(f"Result of {job.input_path} taken from the cache (computed for {meta.get('input_path')})")
+        return True
+
+    def _finish_job(self, job):
+        """Move a job that stopped running to the completed list and wake the dispatcher."""
+        with self.condition:
+            self.running_jobs.remove(job)
+            self.completed_jobs.append(job)
+            self._job_changed(job)
+            self._learn_run_time(job)
+            if job.status in (JobStatus.ERROR, JobStatus.CANCELLED):
+                self._failed_parents.append(job)
+            else:
+                self._children.pop(job.id, None)
+            # Wake up the dispatcher: the freed cores may fit queued jobs
+            self.condition.notify()
+        self._trigger_update()
+
+    def _execute(self, job, executor, orca_cmd, env, input_dir, scratch=None):
+        """Launch ORCA through the executor, with stdout going to the job's output file, and wait for it to exit."""
+        process = executor.launch(job, orca_cmd, env, input_dir)
+        with self.lock:
+            job.process = process
+            cancel_requested = job._cancel_requested
+            if not executor.runs_locally:
+                # Remembered so a restarted ORCAView can pick the job up again
+                job.remote_id = process.pid
+                self._job_changed(job)
+        if cancel_requested:
+            self._terminate_process(job)
+        if executor.runs_locally:
+            self.telemetry.track(job, process.pid)
+        # Block until ORCA exits; cancel_job() terminates the process to wake us up
+        try:
+            if scratch is None:
+                process.wait()
+            else:
+                self._wait_sampling_scratch(process, scratch)
+        finally:
+            self.telemetry.untrack(job)
+        with self.lock:
+            terminator = job._terminator
+        if terminator is not None:
+            # The cores are only free once every process of the cancelled job is gone
+            terminator.join()
+        else:
+            executor.kill_leftovers(process)
+        logger.info(f'ORCA finished with return code {process.returncode}: {job.output_path}')
+        return process
+
+    def _wait_sampling_scratch(self, process, scratch):
+        """Wait for process to exit, measuring the scratch directory in between."""
+        while True:
+            try:
+                process.wait(timeout=self.SCRATCH_SAMPLE_SECONDS)
+                return
+            except subprocess.TimeoutExpired:
+                scratch.sample_usage()
+
+    def _terminate_process(self, job):
+        """Terminate a running job's ORCA process through its executor."""
+        process = job.process
+        if process is None:
+            return
+        logger.info(f'Terminating process for cancel: {job.input_path}')
+        try:
+            self.executor_for(job).terminate(process)
+        except Exception as te:
+            logger.error(f'Exception during terminate: {te}')
 
     def stop(self):
         self._should_stop = True
+        with self.condition:
+            self.condition.notify()
         self.worker_thread.join()
 
+    def _job_changed(self, job):
+        """Record a state change: bump the job's version and write it to the store."""
+        job.version += 1
+        if self.store is not None:
+            self.store.save(job.to_record())
+
+    def _restore_from_store(self):
+        """
+        Load queued jobs and history saved by a previous session.
+
+        Returns the running jobs of remote executors, which outlive
+        ORCAView and are waited for again.
+        """
+        interrupted = []
+        queued = []
+        resumed = []
+        for record in self.store.load_all():
+            try:
+                job = OrcaJob.from_record(record)
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Skipping unreadable job record {record.get('id')}: {e}")
+                continue
+            if job.status == JobStatus.QUEUED:
+                self._set_sjf_rank(job)
+                queued.append(job)
+            elif job.status == JobStatus.RUNNING and job.remote_id and not self.runs_locally(job):
+                self.running_jobs.append(job)
+                resumed.append(job)
+            else:
+                if job.status == JobStatus.RUNNING:
+                    # The ORCA process did not survive the previous session
+                    job.status = JobStatus.ERROR
+                    job.error_msg = "Interrupted: ORCAView exited while the job was running"
+                    job.finished_time = job.finished_time or time.strftime('%Y-%m-%d %H:%M:%S')
+                    if job.orbital_reuse is not None:
+                        job.orbital_reuse.revert_interrupted()
+                        job.orbital_reuse = None
+                    interrupted.append(job.to_record())
+                self.completed_jobs.append(job)
+        # Records written before priorities existed have no queue_rank and
+        # are queued in their stored (submission) order
+        for job in queued:
+            self.queue.push(job)
+        by_id = {job.id: job for job in self.queue.jobs() + self.running_jobs + self.completed_jobs}
+        for job in queued:
+            for parent_id in job._dependency_ids:
+                parent = by_id.get(parent_id)
+                if parent is None:
+                    # Removed from the history; treat it as failed so the child is cancelled
+                    parent = OrcaJob('<removed job>', '', None)
+                    parent.id = parent_id
+                    parent.status = JobStatus.CANCELLED
+                job.dependencies.append(parent)
+            job._dependency_ids = []
+            self._link_to_parents(job)
+        self.store.save_many(interrupted)
+        logger.info(f"Restored {len(self.queue)} queued, {len(resumed)} remotely running "
+                    f"and {len(self.completed_jobs)} finished jobs")
+        return resumed
+
     def _trigger_update(self):
-        # Always schedule the UI update in the main thread
-        try:
-            from PyQt6.QtCore import QTimer
-            QTimer.singleShot(0, self.on_update_callback)
-        except Exception:
-            # fallback for non-GUI/early init
-            if self.on_update_callback:
-                self.on_update_callback()
+        # May run on a worker thread and with the lock held: the callback must
+        # not block or call back into the manager synchronously. The GUI
+        # passes a queued Qt signal emit; the batch runner sets an event.
+        if self.on_update_callback:
+            self.on_update_callback()
 
     def get_all_jobs(self):
         with self.lock:
-            all_jobs = list(self.queue)
-            if self.running_job:
-                all_jobs = [self.running_job] + all_jobs
+            all_jobs = list(self.running_jobs) + list(self.queue)
             all_jobs += self.completed_jobs
         return all_jobs
@@ -1,105 +1,358 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QHBoxLayout, QMessageBox, QMenu, QDialog, QTextEdit, QVBoxLayout as QVBL
-from PyQt6.QtGui import QAction, QTextCursor
-from PyQt6.QtCore import Qt, QTimer, QPoint
-from .job_queue import JobStatus
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTableView, QHeaderView, QPushButton, QHBoxLayout, QMessageBox, QMenu, QLabel, QSpinBox, QLineEdit, QFileDialog, QCheckBox, QComboBox, QProgressBar
+from PyQt6.QtGui import QAction
+from PyQt6.QtCore import Qt, QTimer, QPoint, pyqtSignal
+from .history_import import HistoryImporter
+from .job_queue import JobStatus, OrcaJob
+from .job_table_model import JobTableModel, JobActionsDelegate, ACTIONS_COLUMN, format_seconds
+from .output_monitor import OutputMonitorDialog
+from .slurm_dialog import SlurmSettingsDialog, slurm_executor_from_settings
+from .trajectory import XYZTrajectory, trajectory_path
+from .viewer_3d import MoleculeViewer3D, molecule_from_xyz_block
 import os
 import threading
 
 class JobQueueTab(QWidget):
-    def __init__(self, queue_manager, parent=None):
+    # Emitted from the history import thread; (done, total, message) and the final message
+    import_progress = pyqtSignal(int, int, str)
+    import_finished = pyqtSignal(str)
+
+    def __init__(self, queue_manager, settings=None, parent=None):
         super().__init__(parent)
         self.queue_manager = queue_manager
+        self.settings = settings
+        self.history_importer = HistoryImporter(queue_manager)
+        self._import_stop = None
         self.layout = QVBoxLayout(self)
-        self.table = QTableWidget(0, 8)
-        self.table.setHorizontalHeaderLabels([
-            "Input File", "Output File", "Status", "Submitted", "Started", "Finished", "Duration", "Actions"
-        ])
+        self.layout.addLayout(self._create_budget_controls())
+        self.layout.addLayout(self._create_environment_row())
+        self.layout.addLayout(self._create_scratch_row())
+        self.layout.addLayout(self._create_executor_row())
+        # Progress of parameter sweeps that are still running
+        self.sweep_label = QLabel()
+        self.sweep_label.hide()
+        self.layout.addWidget(self.sweep_label)
+        self.model = JobTableModel(queue_manager, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.actions_delegate = JobActionsDelegate(self.table)
+        self.actions_delegate.action_triggered.connect(self._on_action_triggered)
+        self.table.setItemDelegateForColumn(ACTIONS_COLUMN, self.actions_delegate)
         self.layout.addWidget(self.table)
         self.table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self._show_context_menu)
         self._open_monitors = []  # Hold references to open monitor dialogs
-        
-        # Set up automatic refresh timer
+        self._open_viewers = []  # and to open trajectory viewers
+        self._columns_sized = False
+
+        # Set up automatic refresh timer; refreshes only touch changed rows
         self.refresh_timer = QTimer()
         self.refresh_timer.timeout.connect(self.refresh)
         self.refresh_timer.start(2000)  # Refresh every 2 seconds
-        
+
+        # Only the duration/progress cells of running jobs change with time
+        self.duration_timer = QTimer()
+        self.duration_timer.timeout.connect(self.model.tick_running)
+        self.duration_timer.start(1000)
+
         self.refresh()
 
+    def _create_budget_controls(self):
+        """Spin boxes for the core/memory budget shared by concurrent jobs."""
+        budget_layout = QHBoxLayout()
+        self.max_cores_input = QSpinBox()
+        self.max_cores_input.setRange(1, 4096)
+        self.max_cores_input.setValue(self.queue_manager.max_cores)
+        self.max_memory_input = QSpinBox()
+        self.max_memory_input.setRange(0, 16 * 1024 * 1024)
+        self.max_memory_input.setSingleStep(1000)
+        self.max_memory_input.setSpecialValueText("Unlimited")
+        self.max_memory_input.setValue(self.queue_manager.max_memory_mb or 0)
+        self.memory_reserve_input = QSpinBox()
+        self.memory_reserve_input.setRange(0, 1024 * 1024)
+        self.memory_reserve_input.setSingleStep(512)
+        self.memory_reserve_input.setValue(self.queue_manager.memory_admission.reserve_mb)
+        self.memory_reserve_input.setToolTip("Memory kept free for the system; jobs whose %maxcore \u00d7 nprocs "
+                                             "would not fit into the remaining RAM wait until memory is free")
+        self.shortest_first_checkbox = QCheckBox("Shortest predicted job first")
+        self.shortest_first_checkbox.setChecked(self.queue_manager.queue.shortest_first)
+        self.shortest_first_checkbox.setToolTip("Among jobs of equal priority, start the ones predicted to finish "
+                                                "soonest; a long job waits at most its own predicted run time")
+        self.shortest_first_checkbox.toggled.connect(self._apply_shortest_first)
+        self.usage_label = QLabel()
+        budget_layout.addWidget(QLabel("Core budget:"))
+        budget_layout.addWidget(self.max_cores_input)
+        budget_layout.addWidget(QLabel("Memory budget (MB):"))
+        budget_layout.addWidget(self.max_memory_input)
+        budget_layout.addWidget(QLabel("RAM reserve (MB):"))
+        budget_layout.addWidget(self.memory_reserve_input)
+        budget_layout.addWidget(self.shortest_first_checkbox)
+        budget_layout.addStretch()
+        budget_layout.addWidget(self.usage_label)
+        self.max_cores_input.valueChanged.connect(self._apply_budget)
+        self.max_memory_input.valueChanged.connect(self._apply_budget)
+        self.memory_reserve_input.valueChanged.connect(self._apply_memory_reserve)
+        return budget_layout
+
+    def _create_environment_row(self):
+        """Label showing the cached MPI/ORCA probe result, with a re-detect button."""
+        environment_layout = QHBoxLayout()
+        self.environment_label = QLabel()
+        self.redetect_button = QPushButton("Re-detect Environment")
+        self.redetect_button.clicked.connect(self._redetect_environment)
+        self.telemetry_interval_input = QSpinBox()
+        self.telemetry_interval_input.setRange(0, 3600)
+        self.telemetry_interval_input.setSuffix(" s")
+        self.telemetry_interval_input.setSpecialValueText("Off")
+        self.telemetry_interval_input.setValue(int(self.queue_manager.telemetry.interval or 0))
+        self.telemetry_interval_input.setToolTip("How often CPU, memory and I/O of the processes of running "
+                                                 "jobs are sampled from /proc (Linux only)")
+        self.telemetry_interval_input.setEnabled(self.queue_manager.telemetry.available)
+        self.telemetry_interval_input.valueChanged.connect(self._apply_telemetry_interval)
+        environment_layout.addWidget(self.environment_label)
+        environment_layout.addStretch()
+        environment_layout.addWidget(QLabel("Sample resources every:"))
+        environment_layout.addWidget(self.telemetry_interval_input)
+        environment_layout.addWidget(self.redetect_button)
+        return environment_layout
+
+    def _create_scratch_row(self):
+        """Directory on fast local storage that jobs run in; empty runs them next to the input."""
+        scratch_layout = QHBoxLayout()
+        self.scratch_input = QLineEdit(self.queue_manager.scratch_root or "")
+        self.scratch_input.setPlaceholderText("None - run jobs in the input directory")
+        self.scratch_input.editingFinished.connect(self._apply_scratch_dir)
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self._browse_scratch_dir)
+        scratch_layout.addWidget(QLabel("Scratch directory:"))
+        scratch_layout.addWidget(self.scratch_input)
+        scratch_layout.addWidget(browse_button)
+        self.reuse_orbitals_checkbox = QCheckBox("Reuse orbitals of earlier jobs (MORead)")
+        self.reuse_orbitals_checkbox.setChecked(self.queue_manager.reuse_orbitals)
+        self.reuse_orbitals_checkbox.toggled.connect(self._apply_reuse_orbitals)
+        scratch_layout.addWidget(self.reuse_orbitals_checkbox)
+        return scratch_layout
+
+    def _create_executor_row(self):
+        """Where new jobs run: this machine or a batch system such as Slurm."""
+        executor_layout = QHBoxLayout()
+        self.executor_combo = QComboBox()
+        self._fill_executor_combo()
+        self.executor_combo.currentIndexChanged.connect(self._apply_default_executor)
+        slurm_button = QPushButton("Slurm Settings...")
+        slurm_button.clicked.connect(self._edit_slurm_settings)
+        executor_layout.addWidget(QLabel("Run new jobs on:"))
+        executor_layout.addWidget(self.executor_combo)
+        executor_layout.addWidget(slurm_button)
+        executor_layout.addStretch()
+        # Importing old runs from disk; progress is streamed from the import thread
+        self.import_label = QLabel()
+        self.import_progress_bar = QProgressBar()
+        self.import_progress_bar.setMaximumWidth(200)
+        self.import_progress_bar.hide()
+        self.import_button = QPushButton("Import History...")
+        self.import_button.setToolTip("Add the ORCA runs in a directory tree to the job history; "
+                                      "importing it again only reads runs whose files have changed")
+        self.import_button.clicked.connect(self._import_history)
+        self.import_progress.connect(self._show_import_progress, Qt.ConnectionType.QueuedConnection)
+        self.import_finished.connect(self._finish_import, Qt.ConnectionType.QueuedConnection)
+        executor_layout.addWidget(self.import_label)
+        executor_layout.addWidget(self.import_progress_bar)
+        executor_layout.addWidget(self.import_button)
+        return executor_layout
+
+    def _import_history(self):
+        if self._import_stop is not None:
+            # The button reads "Stop Import" while an import runs
+            self._import_stop.set()
+            self.import_button.setEnabled(False)
+            return
+        start = self.settings.value("import_history_dir", "") if self.settings is not None else ""
+        directory = QFileDialog.getExistingDirectory(self, "Import ORCA Runs From", start)
+        if not directory:
+            return
+        if self.settings is not None:
+            self.settings.setValue("import_history_dir", directory)
+        self._import_stop = threading.Event()
+        self.import_button.setText("Stop Import")
+        self.import_progress_bar.setRange(0, 0)
+        self.import_progress_bar.show()
+        threading.Thread(target=self._run_import, args=(directory, self._import_stop), daemon=True).start()
+
+    def _run_import(self, directory, stop):
+        try:
+            self.history_importer.import_tree(directory, self.import_progress.emit, stop)
+            message = ""
+        except Exception as e:
+            message = f"Import failed: {e}"
+        self.import_finished.emit(message)
+
+    def _show_import_progress(self, done, total, message):
+        self.import_progress_bar.setRange(0, total)  # 0 of 0 shows a busy indicator while scanning
+        self.import_progress_bar.setValue(done)
+        self.import_label.setText(message)
+
+    def _finish_import(self, message):
+        self._import_stop = None
+        self.import_button.setText("Import History...")
+        self.import_button.setEnabled(True)
+        self.import_progress_bar.hide()
+        if message:
+            self.import_label.setText(message)
+
+    def _fill_executor_combo(self):
+        self.executor_combo.blockSignals(True)
+        self.executor_combo.clear()
+        for name, executor in self.queue_manager.executors.items():
+            self.executor_combo.addItem(executor.describe(), name)
+        index = self.executor_combo.findData(self.queue_manager.default_executor)
+        self.executor_combo.setCurrentIndex(max(index, 0))
+        self.executor_combo.blockSignals(False)
+
+    def _apply_default_executor(self, index):
+        name = self.executor_combo.itemData(index)
+        if name is None:
+            return
+        self.queue_manager.set_default_executor(name)
+        if self.settings is not None:
+            self.settings.setValue("default_executor", name)
+
+    def _edit_slurm_settings(self):
+        if self.settings is None:
+            return
+        dialog = SlurmSettingsDialog(self.settings, self)
+        if dialog.exec() != SlurmSettingsDialog.DialogCode.Accepted:
+            return
+        dialog.save()
+        # Jobs already submitted keep polling through the executor that submitted them
+        self.queue_manager.set_executor(slurm_executor_from_settings(self.settings))
+        self._fill_executor_combo()
+
+    def _apply_reuse_orbitals(self, enabled):
+        self.queue_manager.reuse_orbitals = enabled
+        if self.settings is not None:
+            self.settings.setValue("reuse_orbitals", enabled)
+
+    def _browse_scratch_dir(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select Scratch Directory", self.scratch_input.text())
+        if directory:
+            self.scratch_input.setText(directory)
+            self._apply_scratch_dir()
+
+    def _apply_scratch_dir(self):
+        scratch_dir = self.scratch_input.text().strip()
+        if scratch_dir and not os.path.isdir(scratch_dir):
+            QMessageBox.warning(self, "Scratch Directory", f"Directory does not exist:\n{scratch_dir}")
+            return
+        self.queue_manager.set_scratch_root(scratch_dir)
+        if self.settings is not None:
+            self.settings.setValue("scratch_dir", scratch_dir)
+
+    def _current_orca_path(self):
+        if self.settings is not None and self.settings.value("orca_path", ""):
+            return self.settings.value("orca_path", "")
+        for job in getattr(self, 'jobs', []):
+            if job.orca_path:
+                return job.orca_path
+        return None
+
+    def _update_environment_label(self):
+        orca_path = self._current_orca_path()
+        environment = self.queue_manager.environment_probe.peek(orca_path)
+        if environment is not None:
+            self.environment_label.setText(environment.summary())
+        elif orca_path:
+            self.environment_label.setText("Environment will be detected when the first job starts.")
+        else:
+            self.environment_label.setText("ORCA executable not configured.")
+
+    def _redetect_environment(self):
+        orca_path = self._current_orca_path()
+        if not orca_path:
+            return
+        probe = self.queue_manager.environment_probe
+        probe.invalidate(orca_path)
+        self.environment_label.setText("Detecting environment...")
+        # Probing spawns processes; keep it off the GUI thread
+        threading.Thread(target=probe.get, args=(orca_path,), daemon=True).start()
+
+    def _apply_budget(self):
+        max_cores = self.max_cores_input.value()
+        max_memory_mb = self.max_memory_input.value()
+        self.queue_manager.set_budget(max_cores, max_memory_mb)
+        if self.settings is not None:
+            self.settings.setValue("queue_max_cores", max_cores)
+            self.settings.setValue("queue_max_memory_mb", max_memory_mb)
+
+    def _apply_shortest_first(self, enabled):
+        self.queue_manager.set_shortest_first(enabled)
+        if self.settings is not None:
+            self.settings.setValue("shortest_first", enabled)
+
+    def _apply_telemetry_interval(self, interval):
+        self.queue_manager.telemetry.set_interval(interval)
+        if self.settings is not None:
+            self.settings.setValue("telemetry_interval", interval)
+
+    def _apply_memory_reserve(self, reserve_mb):
+        self.queue_manager.set_memory_reserve(reserve_mb)
+        if self.settings is not None:
+            self.settings.setValue("memory_reserve_mb", reserve_mb)
+
     def closeEvent(self, event):
         """Clean up timer when tab is closed."""
         if hasattr(self, 'refresh_timer'):
             self.refresh_timer.stop()
+        if hasattr(self, 'duration_timer'):
+            self.duration_timer.stop()
         super().closeEvent(event)
 
     def refresh(self):
-        jobs = self.queue_manager.get_all_jobs()
-        self.jobs = jobs  # Store for context menu access
-        self.table.setRowCount(len(jobs))
-        for row, job in enumerate(jobs):
-            self.table.setItem(row, 0, QTableWidgetItem(job.input_path))
-            self.table.setItem(row, 1, QTableWidgetItem(job.output_path))
-            status_item = QTableWidgetItem(job.status.value)
-            if job.status == JobStatus.RUNNING:
-                status_item.setBackground(Qt.GlobalColor.yellow)
-                status_item.setForeground(Qt.GlobalColor.black)
-            elif job.status == JobStatus.QUEUED:
-                status_item.setBackground(Qt.GlobalColor.cyan)
-                status_item.setForeground(Qt.GlobalColor.black)
-            elif job.status == JobStatus.DONE:
-                status_item.setBackground(Qt.GlobalColor.green)
-            elif job.status == JobStatus.ERROR:
-                status_item.setBackground(Qt.GlobalColor.red)
-            elif job.status == JobStatus.CANCELLED:
-                status_item.setBackground(Qt.GlobalColor.gray)
-            self.table.setItem(row, 2, status_item)
-            self.table.setItem(row, 3, QTableWidgetItem(job.submitted_time or ""))
-            self.table.setItem(row, 4, QTableWidgetItem(job.started_time or ""))
-            self.table.setItem(row, 5, QTableWidgetItem(job.finished_time or ""))
-
-            # Duration column
-            duration_str = ""
-            from datetime import datetime
-            def parse_time(t):
-                try:
-                    return datetime.strptime(t, '%Y-%m-%d %H:%M:%S')
-                except Exception:
-                    return None
-            start = parse_time(job.started_time) if job.started_time else None
-            end = parse_time(job.finished_time) if job.finished_time else None
-            if job.status == JobStatus.DONE and start and end:
-                duration = end - start
-                duration_str = str(duration).split('.')[0]  # HH:MM:SS
-            elif job.status == JobStatus.RUNNING and start:
-                now = datetime.now()
-                duration = now - start
-                duration_str = str(duration).split('.')[0]
-            self.table.setItem(row, 6, QTableWidgetItem(duration_str))
-
-            # Actions: Cancel, Move Up, Move Down
-            actions_layout = QHBoxLayout()
-            actions_layout.setContentsMargins(0, 0, 0, 0)
-            actions_widget = QWidget()
-            if job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
-                cancel_btn = QPushButton("Cancel")
-                cancel_btn.setMinimumWidth(60)
-                cancel_btn.clicked.connect(lambda _, j=job: self._cancel_job(j))
-                actions_layout.addWidget(cancel_btn)
-            if job.status == JobStatus.QUEUED:
-                up_btn = QPushButton("Up")
-                down_btn = QPushButton("Down")
-                up_btn.setMinimumWidth(38)
-                down_btn.setMinimumWidth(38)
-                up_btn.clicked.connect(lambda _, j=job, r=row: self._move_job(j, r-1))
-                down_btn.clicked.connect(lambda _, j=job, r=row: self._move_job(j, r+1))
-                actions_layout.addWidget(up_btn)
-                actions_layout.addWidget(down_btn)
-            actions_layout.addStretch()
-            actions_widget.setLayout(actions_layout)
-            actions_widget.setMinimumWidth(150)
-            self.table.setCellWidget(row, 7, actions_widget)
-        self.table.resizeColumnsToContents()
-        self.table.resizeRowsToContents()
+        self.model.refresh()
+        self.jobs = self.model.jobs  # Store for context menu access
+        running = [job for job in self.jobs if job.status == JobStatus.RUNNING]
+        # Remote jobs do not use the local budget
+        local = [job for job in running if self.queue_manager.runs_locally(job)]
+        usage = (f"Running: {len(local)} jobs, {sum(job.nprocs for job in local)}/{self.queue_manager.max_cores} cores, "
+                 f"{sum(job.memory_mb for job in local)} MB")
+        if len(running) > len(local):
+            usage += f"; {len(running) - len(local)} remote"
+        if local or any(job.status == JobStatus.QUEUED for job in self.jobs):
+            eta, unknown = self.queue_manager.queue_eta()
+            if eta:
+                usage += f"; queue done in ~{format_seconds(eta)}"
+                if unknown:
+                    usage += f" + {unknown} jobs without estimate"
+        self.usage_label.setText(usage)
+        self._update_sweep_label()
+        self._update_environment_label()
+        if not self._columns_sized and self.jobs:
+            # Size columns once; resizing on every refresh is O(rows) per call
+            self.table.resizeColumnsToContents()
+            self._columns_sized = True
+
+    def _update_sweep_label(self):
+        lines = []
+        for sweep_id, counts in sorted(self.queue_manager.sweep_progress().items()):
+            total = sum(counts.values())
+            finished = sum(count for status, count in counts.items()
+                           if status in (JobStatus.DONE, JobStatus.ERROR, JobStatus.CANCELLED))
+            line = f"Sweep {sweep_id}: {finished}/{total} finished, {counts.get(JobStatus.RUNNING, 0)} running"
+            failed = counts.get(JobStatus.ERROR, 0)
+            if failed:
+                line += f", {failed} failed"
+            lines.append(line)
+        self.sweep_label.setText("\n".join(lines))
+        self.sweep_label.setVisible(bool(lines))
+
+    def _on_action_triggered(self, job, action):
+        if action == "Cancel":
+            self._cancel_job(job)
+        elif action == "Up":
+            self._move_job(job, -1)
+        elif action == "Down":
+            self._move_job(job, 1)
 
     def _cancel_job(self, job):
         ok = self.queue_manager.cancel_job(job)
@@ -107,8 +360,9 @@ class JobQueueTab(QWidget):
             QMessageBox.warning(self, "Cancel Failed", "Unable to cancel this job.")
         self.refresh()
 
-    def _move_job(self, job, new_index):
-        self.queue_manager.reorder_job(job, new_index)
+    def _move_job(self, job, offset):
+        # Moving past a job of another priority takes over its priority
+        self.queue_manager.move_job(job, offset)
         self.refresh()
 
     def _remove_finished_job(self, job):
@@ -208,18 +462,48 @@ class JobQueueTab(QWidget):
         # Move Up
         if job.status == JobStatus.QUEUED and row > 0:
             up_action = QAction("Move Up", self)
-            up_action.triggered.connect(lambda: self._move_job(job, row-1))
+            up_action.triggered.connect(lambda: self._move_job(job, -1))
             menu.addAction(up_action)
         # Move Down
         if job.status == JobStatus.QUEUED and row < len(self.jobs)-1:
             down_action = QAction("Move Down", self)
-            down_action.triggered.connect(lambda: self._move_job(job, row+1))
+            down_action.triggered.connect(lambda: self._move_job(job, 1))
             menu.addAction(down_action)
+        # Force Recompute
+        if job.status == JobStatus.QUEUED:
+            force_action = QAction("Force Recompute", self)
+            force_action.setCheckable(True)
+            force_action.setChecked(job.force_recompute)
+            force_action.toggled.connect(lambda checked: self._set_force_recompute(job, checked))
+            menu.addAction(force_action)
+        elif job.status in (JobStatus.DONE, JobStatus.ERROR, JobStatus.CANCELLED):
+            rerun_action = QAction("Run Again (Force Recompute)", self)
+            rerun_action.triggered.connect(lambda: self._run_again(job))
+            menu.addAction(rerun_action)
+        # Run On (executor)
+        if job.status == JobStatus.QUEUED and len(self.queue_manager.executors) > 1:
+            executor_menu = menu.addMenu("Run On")
+            for name, executor in self.queue_manager.executors.items():
+                executor_action = QAction(executor.describe(), self)
+                executor_action.setCheckable(True)
+                executor_action.setChecked((job.executor or self.queue_manager.default_executor) == name)
+                executor_action.triggered.connect(lambda _, name=name: self.queue_manager.set_job_executor(job, name))
+                executor_menu.addAction(executor_action)
+        # Add Dependent Job
+        if job.status in (JobStatus.QUEUED, JobStatus.RUNNING, JobStatus.DONE):
+            dependent_action = QAction("Add Dependent Job...", self)
+            dependent_action.triggered.connect(lambda: self._add_dependent_job(job))
+            menu.addAction(dependent_action)
         # Monitor Output File
         if job.output_path:
             monitor_action = QAction("Monitor Output File", self)
             monitor_action.triggered.connect(lambda: self._monitor_output_file(job))
             menu.addAction(monitor_action)
+        # View Trajectory (optimization, NEB, IRC)
+        if os.path.isfile(trajectory_path(job.input_path)):
+            trajectory_action = QAction("View Trajectory", self)
+            trajectory_action.triggered.connect(lambda: self._view_trajectory(job))
+            menu.addAction(trajectory_action)
         # Remove Finished Job
         if job.status in (JobStatus.DONE, JobStatus.ERROR, JobStatus.CANCELLED):
             if menu.actions():  # Add separator if there are other actions
@@ -239,63 +523,73 @@ class JobQueueTab(QWidget):
         
         menu.exec(self.table.viewport().mapToGlobal(pos))
 
-    def _monitor_output_file(self, job):
-        dialog = QDialog()
-        dialog.setWindowFlag(Qt.WindowType.Window)
-        dialog.setWindowTitle(f"Monitor Output: {os.path.basename(job.output_path)}")
-        layout = QVBL(dialog)
-        text_edit = QTextEdit(dialog)
-        text_edit.setReadOnly(True)
-        layout.addWidget(text_edit)
-        dialog.setLayout(layout)
-        timer = QTimer(dialog)
-        timer.setInterval(500)
-        last_size = {'val': 0}  # Mutable holder
-        def poll_file():
-            try:
-                if os.path.exists(job.output_path):
-                    with open(job.output_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        if last_size['val'] == 0:
-                            # Always show full file on first tick or if window is reopened
-                            content = f.read()
-                            text_edit.setPlainText(content)
-                            last_size['val'] = f.tell()
-                            text_edit.moveCursor(QTextCursor.MoveOperation.End)
-                        else:
-                            f.seek(last_size['val'])
-                            new_data = f.read()
-                            if new_data:
-                                text_edit.moveCursor(QTextCursor.MoveOperation.End)
-                                text_edit.insertPlainText(new_data)
-                                text_edit.moveCursor(QTextCursor.MoveOperation.End)
-                            last_size['val'] = f.tell()
-                # Stop polling if job is done/error/cancelled
-                if job.status not in (JobStatus.RUNNING, JobStatus.QUEUED):
-                    timer.stop()
-            except Exception:
-                pass
-        timer.timeout.connect(poll_file)
-        # Always show file content on open
+    def _set_force_recompute(self, job, enabled):
+        self.queue_manager.set_force_recompute(job, enabled)
+
+    def _run_again(self, job):
+        new_job = OrcaJob(job.input_path, job.output_path, job.orca_path)
+        new_job.force_recompute = True
+        self.queue_manager.add_job(new_job)
+
+    def _add_dependent_job(self, parent):
+        input_path, _ = QFileDialog.getOpenFileName(
+            self, "Select Input of the Dependent Job", os.path.dirname(parent.input_path),
+            "ORCA Input Files (*.inp);;All Files (*)"
+        )
+        if not input_path:
+            return
+        if os.path.abspath(input_path) == os.path.abspath(parent.input_path):
+            QMessageBox.warning(self, "Add Dependent Job", "A job cannot depend on its own input file.")
+            return
+        reply = QMessageBox.question(
+            self, "Add Dependent Job",
+            f"The job will start from the final geometry of {os.path.basename(parent.input_path)}.\n\n"
+            "Also start its SCF from the parent's orbitals (MORead)?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel
+        )
+        if reply == QMessageBox.StandardButton.Cancel:
+            return
+        child = OrcaJob(input_path, os.path.splitext(input_path)[0] + '.out', parent.orca_path)
+        child.depends_on(parent, orbitals=reply == QMessageBox.StandardButton.Yes)
         try:
-            if os.path.exists(job.output_path):
-                with open(job.output_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    text_edit.setPlainText(content)
-                    last_size['val'] = f.tell()
-                    text_edit.moveCursor(QTextCursor.MoveOperation.End)
-            else:
-                text_edit.setPlainText(f"Output file does not exist:\n{job.output_path}\n\nCheck if the job has started, or if the output path is correct.")
-        except Exception as e:
-            text_edit.setPlainText(f"(Could not read output file)\n{job.output_path}\nError: {e}")
-        if job.status in (JobStatus.RUNNING, JobStatus.QUEUED):
-            timer.start()
+            self.queue_manager.add_job(child)
+        except ValueError as e:
+            QMessageBox.warning(self, "Add Dependent Job", str(e))
+
+    def _view_trajectory(self, job):
+        """Open the 3D viewer on the job's trajectory, showing its latest frame."""
+        path = trajectory_path(job.input_path)
+        try:
+            # A running job may be writing its last frame
+            trajectory = XYZTrajectory(path, final=job.status not in (JobStatus.RUNNING, JobStatus.QUEUED))
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Trajectory", f"Could not read {path}:\n{e}")
+            return
+        if not len(trajectory):
+            trajectory.close()
+            QMessageBox.information(self, "Trajectory", f"{path} has no complete frame yet.")
+            return
+        try:
+            # Bonds are taken from the latest frame and kept for all frames
+            molecule = molecule_from_xyz_block(trajectory.xyz_block(-1))
+            viewer = MoleculeViewer3D(molecule, trajectory=trajectory)
+        except ValueError as e:
+            trajectory.close()
+            QMessageBox.warning(self, "Trajectory", f"Could not show {path}:\n{e}")
+            return
+        viewer.setWindowTitle(f"Trajectory - {os.path.basename(path)}")
+        viewer.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self._open_viewers.append(viewer)
+        viewer.destroyed.connect(lambda: self._open_viewers.remove(viewer))
+        viewer.show()
+
+    def _monitor_output_file(self, job):
+        dialog = OutputMonitorDialog(job)
         def on_close():
-            timer.stop()
             try:
                 self._open_monitors.remove(dialog)
             except ValueError:
                 pass
         dialog.finished.connect(on_close)
         self._open_monitors.append(dialog)
-        dialog.resize(800, 600)
         dialog.show()
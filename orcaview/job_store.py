@@ -0,0 +1,143 @@
+"""
+Persistent SQLite storage for the job queue and job history.
+
+Every state change of a job is written through to ~/.orcaview/jobs.db so the
+queue and the history survive a crash or restart of the GUI. The database
+runs in WAL mode, which keeps writes from the worker threads cheap and lets
+readers list the history while jobs are being updated.
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from .logger import logger
+
+DB_FILE = Path.home() / '.orcaview' / 'jobs.db'
+
+# Columns stored as real table columns; everything else a job wants to keep
+# goes into the JSON 'extra' column.
+COLUMNS = (
+    'id', 'input_path', 'output_path', 'orca_path', 'status',
+    'submitted_time', 'started_time', 'finished_time', 'error_msg',
+    'nprocs', 'maxcore_mb', 'extra',
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    input_path TEXT NOT NULL,
+    output_path TEXT,
+    orca_path TEXT,
+    status TEXT NOT NULL,
+    submitted_time TEXT,
+    started_time TEXT,
+    finished_time TEXT,
+    error_msg TEXT,
+    nprocs INTEGER,
+    maxcore_mb INTEGER,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_submitted_time ON jobs(submitted_time);
+CREATE INDEX IF NOT EXISTS idx_jobs_input_path ON jobs(input_path);
+"""
+
+
+class JobStore:
+    """Write-through store of job records (dicts as produced by OrcaJob.to_record)."""
+
+    def __init__(self, db_path=DB_FILE):
+        self.db_path = Path(db_path)
+        if str(db_path) != ':memory:':
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # One connection shared by the GUI and worker threads, serialized by _lock
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def save(self, record):
+        """Insert or update one job record."""
+        self.save_many([record])
+
+    def save_many(self, records):
+        """Insert or update several job records in one transaction."""
+        rows = [self._to_row(record) for record in records]
+        if not rows:
+            return
+        placeholders = ', '.join('?' for _ in COLUMNS)
+        sql = f"INSERT OR REPLACE INTO jobs ({', '.join(COLUMNS)}) VALUES ({placeholders})"
+        self._write(sql, rows)
+
+    def delete(self, job_ids):
+        """Remove the jobs with the given ids."""
+        self._write('DELETE FROM jobs WHERE id = ?', [(job_id,) for job_id in job_ids])
+
+    def list_jobs(self, status=None, input_path=None, submitted_after=None, limit=None, offset=0):
+        """
+        Return job records, newest first, optionally filtered.
+
+        status may be a single status string or a list of them; every filter
+        is backed by an index.
+        """
+        clauses, params = [], []
+        if status is not None:
+            statuses = [status] if isinstance(status, str) else list(status)
+            clauses.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if input_path is not None:
+            clauses.append('input_path = ?')
+            params.append(input_path)
+        if submitted_after is not None:
+            clauses.append('submitted_time >= ?')
+            params.append(submitted_after)
+        sql = 'SELECT * FROM jobs'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY submitted_time DESC'
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params.extend([limit, offset])
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def load_all(self):
+        """Return all records in submission order, for restoring the manager."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT * FROM jobs ORDER BY submitted_time'
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _write(self, sql, rows):
+        try:
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany(sql, rows)
+        except sqlite3.Error as e:
+            # Persistence must never take down the queue itself
+            logger.error(f"Job store write failed ({self.db_path}): {e}")
+
+    @staticmethod
+    def _to_row(record):
+        record = dict(record)
+        record['extra'] = json.dumps(record.get('extra') or {})
+        return tuple(record.get(column) for column in COLUMNS)
+
+    @staticmethod
+    def _from_row(row):
+        record = dict(row)
+        try:
+            record['extra'] = json.loads(record.get('extra') or '{}')
+        except ValueError:
+            record['extra'] = {}
+        return record
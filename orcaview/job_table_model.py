@@ -0,0 +1,325 @@
+import os
+from datetime import datetime, timedelta
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, QRect, pyqtSignal
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+
+from .executors import LOCAL
+from .job_queue import JobStatus
+from .output_parser import MAX_CHUNK_BYTES, parser_for_job
+
+# Smallest share of the per-tick parsing budget a running job gets
+MIN_TICK_BYTES = 32 * 1024
+
+HEADERS = ["Input File", "Output File", "Status", "Priority", "Submitted", "Started", "Finished", "Duration", "Progress",
+           "Resources", "Actions"]
+PRIORITY_COLUMN = HEADERS.index("Priority")
+DURATION_COLUMN = HEADERS.index("Duration")
+PROGRESS_COLUMN = HEADERS.index("Progress")
+RESOURCES_COLUMN = HEADERS.index("Resources")
+ACTIONS_COLUMN = HEADERS.index("Actions")
+
+STATUS_COLORS = {
+    JobStatus.RUNNING: (Qt.GlobalColor.yellow, Qt.GlobalColor.black),
+    JobStatus.QUEUED: (Qt.GlobalColor.cyan, Qt.GlobalColor.black),
+    JobStatus.DONE: (Qt.GlobalColor.green, None),
+    JobStatus.ERROR: (Qt.GlobalColor.red, None),
+    JobStatus.CANCELLED: (Qt.GlobalColor.gray, None),
+}
+
+
+def _parse_time(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+    except (TypeError, ValueError):
+        return None
+
+
+def _format_duration(delta):
+    return str(delta).split('.')[0]  # HH:MM:SS
+
+
+def format_seconds(seconds):
+    return _format_duration(timedelta(seconds=round(seconds)))
+
+
+class JobRow:
+    """Display snapshot of one job, rebuilt only when the job's version changes."""
+
+    def __init__(self, job):
+        self.job = job
+        self.update()
+
+    def update(self):
+        job = self.job
+        self.version = job.version
+        self.status = job.status
+        self.start = _parse_time(job.started_time)
+        self.end = _parse_time(job.finished_time)
+        self.texts = [
+            job.input_path or "",
+            job.output_path or "",
+            job.status.value,
+            str(job.priority),
+            job.submitted_time or "",
+            job.started_time or "",
+            job.finished_time or "",
+        ]
+        self.duration = ""
+        if job.status == JobStatus.DONE and self.start and self.end:
+            self.duration = _format_duration(self.end - self.start)
+        self.progress = job.output_parser.summary() if job.output_parser is not None else ""
+        details = []
+        if job.sweep_id:
+            details.append(f"Sweep {job.sweep_id}: {job.sweep_label}")
+        if job.status == JobStatus.QUEUED and job.wait_reason:
+            details.append(job.wait_reason)
+        if job.executor and job.executor != LOCAL:
+            details.append(f"Runs on {job.executor}" + (f" as job {job.remote_id}" if job.remote_id else ""))
+        if job.dependencies:
+            parents = ", ".join(os.path.basename(parent.input_path) for parent in job.dependencies)
+            details.append(f"Depends on: {parents}")
+        if job.cache_hit:
+            details.append("Result reused from cache")
+        elif job.force_recompute:
+            details.append("Recompute forced (result cache bypassed)")
+        if job.error_msg:
+            details.append(job.error_msg)
+        if job.scratch_peak_bytes is not None:
+            details.append(f"Scratch peak usage: {job.scratch_peak_bytes / 2**20:.1f} MB")
+        self.tooltip = "\n".join(details) or None
+
+    def duration_text(self, predicted=None):
+        """Elapsed or final duration; with a predicted run time also the estimate (~) for unfinished jobs."""
+        if self.status == JobStatus.RUNNING and self.start:
+            elapsed = _format_duration(datetime.now() - self.start)
+            return f"{elapsed} of ~{format_seconds(predicted)}" if predicted is not None else elapsed
+        if self.status == JobStatus.QUEUED and predicted is not None:
+            return f"~{format_seconds(predicted)}"
+        return self.duration
+
+    def resources_text(self):
+        """CPU and memory of the job's processes: current values while running, peaks afterwards."""
+        telemetry = self.job.telemetry
+        if telemetry is None:
+            return ""
+        return telemetry.summary(running=self.status == JobStatus.RUNNING)
+
+    def resources_tooltip(self):
+        telemetry = self.job.telemetry
+        if telemetry is None:
+            return None
+        return "\n".join(telemetry.details(self.job.memory_mb * 2**20, running=self.status == JobStatus.RUNNING))
+
+
+class JobTableModel(QAbstractTableModel):
+    """
+    Table model over the queue manager's jobs.
+
+    refresh() diffs the current job list against the previous one by job id
+    and version, so only rows that actually changed are re-read and emitted
+    through dataChanged; rows are inserted, removed and moved instead of the
+    whole table being rebuilt.
+    """
+
+    def __init__(self, queue_manager, parent=None):
+        super().__init__(parent)
+        self.queue_manager = queue_manager
+        self._rows = []
+        self._row_of_id = {}
+
+    @property
+    def jobs(self):
+        return [row.job for row in self._rows]
+
+    def job_at(self, row):
+        if 0 <= row < len(self._rows):
+            return self._rows[row].job
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column < DURATION_COLUMN:
+                return row.texts[column]
+            if column == DURATION_COLUMN:
+                predicted = None
+                if row.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+                    predicted = self.queue_manager.predict_runtime(row.job)
+                return row.duration_text(predicted)
+            if column == PROGRESS_COLUMN:
+                return row.progress
+            if column == RESOURCES_COLUMN:
+                return row.resources_text()
+            return None
+        if role == Qt.ItemDataRole.EditRole and column == PRIORITY_COLUMN:
+            return row.job.priority
+        if role == Qt.ItemDataRole.ToolTipRole:
+            if column == PRIORITY_COLUMN and row.status == JobStatus.QUEUED:
+                return "Higher priorities run first; double-click to change"
+            if column == DURATION_COLUMN and row.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+                return "~ is the run time predicted from finished jobs of the same kind"
+            if column == RESOURCES_COLUMN:
+                return row.resources_tooltip()
+            return row.tooltip
+        if column == HEADERS.index("Status") and role in (Qt.ItemDataRole.BackgroundRole, Qt.ItemDataRole.ForegroundRole):
+            background, foreground = STATUS_COLORS.get(row.status, (None, None))
+            color = background if role == Qt.ItemDataRole.BackgroundRole else foreground
+            return QColor(color) if color is not None else None
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() == PRIORITY_COLUMN and self._rows[index.row()].status == JobStatus.QUEUED:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or index.column() != PRIORITY_COLUMN:
+            return False
+        try:
+            priority = int(value)
+        except (TypeError, ValueError):
+            return False
+        # The manager bumps the job's version; the next refresh() re-reads the row
+        return self.queue_manager.set_priority(self._rows[index.row()].job, priority)
+
+    def refresh(self):
+        """Bring the model in line with the manager's current job list."""
+        jobs = self.queue_manager.get_all_jobs()
+        new_ids = [job.id for job in jobs]
+        if new_ids != [row.job.id for row in self._rows]:
+            self._apply_structure(jobs, new_ids)
+        last_column = len(HEADERS) - 1
+        for row_index, row in enumerate(self._rows):
+            if row.version != row.job.version:
+                row.update()
+                self.dataChanged.emit(self.index(row_index, 0), self.index(row_index, last_column))
+
+    def tick_running(self):
+        """
+        Update only the time-dependent cells of running jobs: the duration,
+        the progress parsed from the bytes ORCA appended since the last tick
+        and the resources last sampled by the telemetry thread.
+
+        The running jobs share one chunk of parsing per tick, so large
+        outputs are caught up on over several ticks instead of stalling
+        the GUI thread.
+        """
+        running = [row_index for row_index, row in enumerate(self._rows) if row.status == JobStatus.RUNNING]
+        if not running:
+            return
+        tick_bytes = max(MAX_CHUNK_BYTES // len(running), MIN_TICK_BYTES)
+        for row_index in running:
+            row = self._rows[row_index]
+            parser = parser_for_job(row.job)
+            if parser.parse_new(tick_bytes):
+                row.progress = parser.summary()
+            first = self.index(row_index, DURATION_COLUMN)
+            last = self.index(row_index, RESOURCES_COLUMN)
+            self.dataChanged.emit(first, last, [Qt.ItemDataRole.DisplayRole])
+
+    def _apply_structure(self, jobs, new_ids):
+        new_id_set = set(new_ids)
+        # 1. Remove rows of jobs that disappeared, bottom-up to keep indexes valid
+        for row_index in range(len(self._rows) - 1, -1, -1):
+            if self._rows[row_index].job.id not in new_id_set:
+                self.beginRemoveRows(QModelIndex(), row_index, row_index)
+                del self._rows[row_index]
+                self.endRemoveRows()
+        # 2. Append rows for new jobs
+        known = {row.job.id for row in self._rows}
+        added = [job for job in jobs if job.id not in known]
+        if added:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            self._rows.extend(JobRow(job) for job in added)
+            self.endInsertRows()
+        # 3. Reorder to match the manager, keeping persistent indexes (selection) valid
+        if [row.job.id for row in self._rows] != new_ids:
+            self.layoutAboutToBeChanged.emit()
+            row_by_id = {row.job.id: row for row in self._rows}
+            old_ids = [row.job.id for row in self._rows]
+            self._rows = [row_by_id[job_id] for job_id in new_ids]
+            new_position = {job_id: row_index for row_index, job_id in enumerate(new_ids)}
+            old_indexes = self.persistentIndexList()
+            new_indexes = [
+                self.index(new_position[old_ids[index.row()]], index.column())
+                for index in old_indexes
+            ]
+            self.changePersistentIndexList(old_indexes, new_indexes)
+            self.layoutChanged.emit()
+
+
+class JobActionsDelegate(QStyledItemDelegate):
+    """
+    Paints Cancel/Up/Down buttons in the Actions column and reports clicks.
+
+    The buttons are drawn with the current style instead of being real
+    widgets, so thousands of rows do not create thousands of widgets.
+    """
+
+    action_triggered = pyqtSignal(object, str)
+
+    BUTTON_WIDTHS = {"Cancel": 60, "Up": 38, "Down": 38}
+
+    def _actions_for(self, job):
+        actions = []
+        if job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+            actions.append("Cancel")
+        if job.status == JobStatus.QUEUED:
+            actions.extend(["Up", "Down"])
+        return actions
+
+    def _button_rects(self, rect, job):
+        rects = []
+        x = rect.left() + 2
+        for action in self._actions_for(job):
+            width = self.BUTTON_WIDTHS[action]
+            rects.append((action, QRect(x, rect.top() + 2, width, rect.height() - 4)))
+            x += width + 4
+        return rects
+
+    def paint(self, painter, option, index):
+        job = index.model().job_at(index.row())
+        if job is None:
+            return
+        style = option.widget.style() if option.widget else QApplication.style()
+        for action, rect in self._button_rects(option.rect, job):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = action
+            button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        size.setWidth(sum(self.BUTTON_WIDTHS.values()) + 16)
+        return size
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() != QEvent.Type.MouseButtonRelease:
+            return False
+        job = model.job_at(index.row())
+        if job is None:
+            return False
+        for action, rect in self._button_rects(option.rect, job):
+            if rect.contains(event.position().toPoint()):
+                self.action_triggered.emit(job, action)
+                return True
+        return False
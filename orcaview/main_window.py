@@ -10,7 +10,7 @@ from PyQt6.QtWidgets import (
 )
 
 from rdkit import Chem
-from rdkit.Chem import Draw, AllChem
+from rdkit.Chem import Draw
 
 from . import config
 from .logger import logger
@@ -21,11 +21,22 @@ from .tabs.advanced_options_tab import AdvancedOptionsTab
 from .tabs.coordinates_tab import CoordinatesTab
 from .tabs.submission_tab import SubmissionTab
 from .tabs.input_blocks_tab import InputBlocksTab
-from .job_queue import JobQueueManager, OrcaJob
+from .job_queue import JobQueueManager, JobStatus, OrcaJob
+from .job_store import JobStore
+from .executors import LOCAL
+from .result_cache import ResultCache
+from .results_store import ResultsStore
+from .slurm_dialog import slurm_executor_from_settings
+from .system_memory import DEFAULT_RESERVE_MB
+from .process_telemetry import DEFAULT_INTERVAL as DEFAULT_TELEMETRY_INTERVAL
 from .job_queue_tab import JobQueueTab
 from .menu import MainMenu
 from .signals import AppSignals
-from .input_generator import OrcaInputGenerator
+from .input_generator import OrcaInputGenerator, compose_keywords, parse_coordinates
+from .structures import molecule_from_smiles
+from .sweep import generate_sweep
+from .sweep_dialog import SweepDialog
+from .trajectory import XYZTrajectory
 from .viewer_3d import MoleculeViewer3D
 from .ketcher_server import run_server
 from .ketcher_window import KetcherWindow
@@ -63,8 +74,25 @@ class MainWindow(QMainWindow):
 
         # Ensure solvation models are filtered for the initial method
         initial_method = self.method_tab.method_combo.currentText()
-        self.job_queue_manager = JobQueueManager(on_update_callback=self._refresh_job_queue_tab)
-        self.job_queue_tab = JobQueueTab(self.job_queue_manager)
+        # Created before the queue manager, whose worker threads report through it
+        self.signals = AppSignals()
+        self.job_queue_manager = JobQueueManager(
+            on_update_callback=self.signals.job_queue_updated.emit,
+            max_cores=int(self.settings.value("queue_max_cores", 0) or 0),
+            max_memory_mb=int(self.settings.value("queue_max_memory_mb", 0) or 0),
+            store=self._open_job_store(),
+            scratch_root=self.settings.value("scratch_dir", "") or None,
+            reuse_orbitals=self.settings.value("reuse_orbitals", True, type=bool),
+            result_cache=ResultCache(),
+            results_store=ResultsStore(),
+            memory_reserve_mb=int(self.settings.value("memory_reserve_mb", DEFAULT_RESERVE_MB)),
+            executors=[slurm_executor_from_settings(self.settings)],
+            default_executor=self.settings.value("default_executor", LOCAL),
+            telemetry_interval=int(self.settings.value("telemetry_interval", DEFAULT_TELEMETRY_INTERVAL)),
+            shortest_first=self.settings.value("shortest_first", False, type=bool)
+        )
+        self.job_queue_tab = JobQueueTab(self.job_queue_manager, self.settings)
+        self.signals.job_queue_updated.connect(self._refresh_job_queue_tab, Qt.ConnectionType.QueuedConnection)
 
         # Add tabs to the main tab widget
         self.tabs.addTab(self.coordinates_tab, "Coordinates")
@@ -78,13 +106,15 @@ class MainWindow(QMainWindow):
 
         # Menu bar
         self.menu = MainMenu(self)
+        self.menu.parameter_sweep_action.triggered.connect(self._open_sweep_dialog)
 
         # Signals
-        self.signals = AppSignals()
         self._connect_signals()
 
         # Internal state
         self.current_molecule = None
+        # Multi-frame XYZ file the current molecule is the last frame of
+        self.current_trajectory_path = None
         self.ketcher_window = None
 
         # Start the Ketcher server in a background thread
@@ -136,6 +166,19 @@ class MainWindow(QMainWindow):
         file_path, _ = QFileDialog.getOpenFileName(self, "Load XYZ File", "", "XYZ Files (*.xyz);;All Files (*)")
         if not file_path:
             return
+        try:
+            with XYZTrajectory(file_path, final=True) as trajectory:
+                frames = len(trajectory)
+                last_frame = trajectory.xyz_block(-1) if frames > 1 else None
+        except (OSError, ValueError):
+            frames = 0  # Not a regular XYZ file; the single-frame parser below reports why
+        if frames > 1:
+            # An optimization, NEB or IRC trajectory: its last frame becomes the
+            # structure, the 3D viewer can step through all frames
+            self._process_molecule_from_xyz(last_frame)
+            if self.current_molecule is not None:
+                self.current_trajectory_path = file_path
+            return
         try:
             with open(file_path, 'r') as f:
                 xyz_block = f.read()
@@ -203,6 +246,7 @@ class MainWindow(QMainWindow):
     def _update_ui_with_molecule(self, mol):
         """Updates the coordinates tab UI with the new molecule."""
         self.current_molecule = mol
+        self.current_trajectory_path = None
 
         # Update 2D depiction using a more robust method
         try:
@@ -232,42 +276,8 @@ class MainWindow(QMainWindow):
             return
 
         try:
-            mol = Chem.MolFromSmiles(smiles)
-            if mol is None:
-                raise ValueError("Invalid SMILES string")
-
-            mol = Chem.AddHs(mol)
-
-            # Set up multithreading parameters for conformer generation
-            num_conformers = 50
-            num_cores = os.cpu_count() or 1
-            params = AllChem.ETKDG()
-            params.numThreads = num_cores
-
-            # Generate and optimize conformers using multithreading
-            AllChem.EmbedMultipleConfs(mol, numConfs=num_conformers, params=params)
-            results = AllChem.UFFOptimizeMoleculeConfs(mol, numThreads=num_cores)
-
-            # Find the conformer with the lowest energy
-            min_energy = float('inf')
-            min_energy_id = -1
-            for i, result in enumerate(results):
-                if not result[0] and result[1] < min_energy:
-                    min_energy = result[1]
-                    min_energy_id = i
-
-            # If all optimizations failed, fallback to the first conformer
-            if min_energy_id == -1:
-                min_energy_id = 0
-
-            # Create a new molecule containing only the lowest-energy conformer
-            final_mol = Chem.Mol(mol)
-            final_mol.RemoveAllConformers()
-            conf = mol.GetConformer(min_energy_id)
-            final_mol.AddConformer(conf, assignId=True)
-
+            final_mol = molecule_from_smiles(smiles)
             self._update_ui_with_molecule(final_mol)
-
         except Exception as e:
             QMessageBox.critical(self, "SMILES Error", f"Failed to generate structure: {e}")
             self.current_molecule = None
@@ -299,37 +309,16 @@ class MainWindow(QMainWindow):
             nprocs = self.advanced_options_tab.nprocs_input.value()
             memory = self.advanced_options_tab.memory_input.text()
             coords_text = self.coordinates_tab.coordinates_input.toPlainText().strip()
-            # Compose keywords
-            keyword_parts = [config.JOB_TYPES.get(job_type, "")]
-            if method == "DFT":
-                keyword_parts.append(dft_functional if not dft_functional.startswith("---") else "")
-                keyword_parts.append(basis_set if not basis_set.startswith("---") else "def2-SVP")
-            elif method == "HF":
-                keyword_parts.append("HF")
-                keyword_parts.append(basis_set if not basis_set.startswith("---") else "def2-SVP")
-            elif method == "Semiempirical":
-                keyword_parts.append(config.SEMIEMPIRICAL_METHODS.get(se_method, ""))
-            elif method == "xTB":
-                keyword_parts.append(config.XTB_METHODS.get(xtb_method, ""))
-            if solvation_model and solvation_model != "None":
-                model_keyword = "CPCM" if solvation_model == "CPCMC" else solvation_model
-                if solvent:
-                    keyword_parts.append(f"{model_keyword}({solvent})")
-            if other_keywords:
-                keyword_parts.extend(other_keywords.split())
-            generator.set_keywords([part for part in keyword_parts if part])
+            generator.set_keywords(compose_keywords(
+                job_type, method, dft_functional, basis_set, se_method, xtb_method,
+                solvation_model, solvent, other_keywords
+            ))
             generator.set_charge_and_multiplicity(charge, multiplicity)
-            coordinates = []
-            for line in coords_text.split('\n'):
-                parts = line.split()
-                if len(parts) == 4:
-                    try:
-                        atom = parts[0]
-                        x, y, z = map(float, parts[1:])
-                        coordinates.append([atom, x, y, z])
-                    except (ValueError, IndexError):
-                        QMessageBox.warning(self, "Coordinate Error", f"Could not parse coordinate line: {line}")
-                        return
+            try:
+                coordinates = parse_coordinates(coords_text)
+            except ValueError as e:
+                QMessageBox.warning(self, "Coordinate Error", str(e))
+                return
             if not coordinates:
                 QMessageBox.warning(self, "Input Error", "No coordinates provided. Please generate or paste molecular coordinates.")
                 return
@@ -352,9 +341,63 @@ class MainWindow(QMainWindow):
             tb = traceback.format_exc()
             QMessageBox.critical(self, "Input Generation Error", f"An error occurred while generating the input file:\n{e}\n\n{tb}")
 
+    def _open_sweep_dialog(self):
+        """Generate and queue one job per functional/basis/solvent combination."""
+        orca_path = self.settings.value("orca_path", "").strip()
+        if not orca_path or not os.path.isfile(orca_path):
+            QMessageBox.warning(self, "Configuration Error", "ORCA executable path is not set. Please browse for the ORCA executable in the Submission tab.")
+            return
+        try:
+            coordinates = parse_coordinates(self.coordinates_tab.coordinates_input.toPlainText().strip())
+        except ValueError as e:
+            QMessageBox.warning(self, "Coordinate Error", str(e))
+            return
+        if not coordinates:
+            QMessageBox.warning(self, "Input Error", "No coordinates provided. Please generate or paste molecular coordinates.")
+            return
+        input_path = self.submission_tab.input_file_path_input.text().strip()
+        output_dir = os.path.dirname(input_path) if input_path else ""
+        base_name = os.path.splitext(os.path.basename(input_path))[0] if input_path else "sweep"
+        other_keywords = self.advanced_options_tab.other_keywords_input.text()
+        dialog = SweepDialog(other_keywords, output_dir, base_name, self)
+        if dialog.exec() != SweepDialog.DialogCode.Accepted:
+            return
+        memory = self.advanced_options_tab.memory_input.text()
+        busy_inputs = [job.input_path for job in self.job_queue_manager.get_all_jobs()
+                       if job.status in (JobStatus.QUEUED, JobStatus.RUNNING)]
+        try:
+            sweep_id, jobs = generate_sweep(
+                dialog.selected_points(), coordinates, dialog.output_dir(), dialog.base_name(), orca_path,
+                job_type=self.job_type_tab.job_type_combo.currentText(),
+                charge=self.advanced_options_tab.charge_input.value(),
+                multiplicity=self.advanced_options_tab.multiplicity_input.value(),
+                nprocs=self.advanced_options_tab.nprocs_input.value(),
+                maxcore=int(memory) if memory.isdigit() else None,
+                other_keywords=other_keywords,
+                blocks=self.input_blocks_tab.input_blocks,
+                busy_inputs=busy_inputs,
+            )
+        except OSError as e:
+            QMessageBox.critical(self, "File Error", f"Failed to write sweep inputs: {e}")
+            return
+        self.job_queue_manager.add_jobs(jobs)
+        QMessageBox.information(self, "Sweep Queued", f"Sweep {sweep_id}: {len(jobs)} jobs added to the queue, cheapest first.")
+
     def _open_3d_viewer(self):
         if self.current_molecule:
-            self.viewer_3d_window = MoleculeViewer3D(self.current_molecule)
+            trajectory = None
+            if self.current_trajectory_path:
+                try:
+                    trajectory = XYZTrajectory(self.current_trajectory_path, final=True)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not open trajectory {self.current_trajectory_path}: {e}")
+            try:
+                self.viewer_3d_window = MoleculeViewer3D(self.current_molecule, trajectory=trajectory)
+            except ValueError as e:
+                # The file changed since the structure was loaded from it
+                logger.warning(f"Not showing trajectory {self.current_trajectory_path}: {e}")
+                trajectory.close()
+                self.viewer_3d_window = MoleculeViewer3D(self.current_molecule)
             self.viewer_3d_window.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
             self.viewer_3d_window.show()
             self.signals.view_3d_requested.emit(self.current_molecule)
@@ -386,6 +429,14 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Job Error", f"Failed to create and queue job: {e}")
             return False
 
+    def _open_job_store(self):
+        """Open the persistent job store; fall back to an in-memory queue on failure."""
+        try:
+            return JobStore()
+        except Exception as e:
+            logger.error(f"Could not open job store, queue will not be persisted: {e}")
+            return None
+
     def _cleanup_old_bat_files(self):
         """Remove any old .bat files from previous versions that used batch files."""
         try:
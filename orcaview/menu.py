@@ -5,6 +5,8 @@ class MainMenu:
         self.menu_bar = main_window.menuBar()
         self.settings_menu = self.menu_bar.addMenu("&Settings")
         self.set_orca_path_action = self.settings_menu.addAction("Set ORCA Path")
+        self.tools_menu = self.menu_bar.addMenu("&Tools")
+        self.parameter_sweep_action = self.tools_menu.addAction("Parameter Sweep...")
         # Add more menu actions as needed
 
     def set_orca_path(self, main_window):
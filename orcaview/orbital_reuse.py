@@ -0,0 +1,176 @@
+"""
+Reuse of converged orbitals between related jobs (MORead chaining).
+
+Jobs on the same molecule - an optimization, then a frequency run, then a
+single point at a higher level - each start their SCF from a guess. When a
+finished job left a .gbw file for the same atoms, charge and multiplicity,
+the queue copies it next to the new job's input and adds '! MORead' with a
+%moinp block at dispatch time, so the SCF starts from converged orbitals.
+
+The user's input is restored after the run, and a job whose injected GBW
+cannot be read is run again once without it. The queue keeps the original
+text in the job store while ORCA runs, so an input left injected by a
+crash is restored when ORCAView starts again.
+"""
+import os
+import shutil
+import time
+
+from .input_parser import read_molecule, requests_moread, keyword_lines
+from .logger import logger
+
+# Name of the copied GBW, next to the input ORCA runs; ORCA cannot MORead
+# from the GBW file it is about to write itself.
+MOREAD_SUFFIX = '_moread.gbw'
+
+
+def gbw_path_for(input_path):
+    """Path of the GBW file ORCA writes for input_path."""
+    return os.path.splitext(os.path.abspath(input_path))[0] + '.gbw'
+
+
+def inject_moread(text, gbw_name):
+    """Return the input text with '! MORead' and a %moinp block for gbw_name added."""
+    lines = text.splitlines()
+    insert_at = 0
+    for index, line in enumerate(lines):
+        if line.strip().startswith('!'):
+            insert_at = index + 1
+    lines[insert_at:insert_at] = ['! MORead', f'%moinp "{gbw_name}"']
+    return '\n'.join(lines) + '\n'
+
+
+def _parse_time(value):
+    try:
+        return time.mktime(time.strptime(value, '%Y-%m-%d %H:%M:%S'))
+    except (TypeError, ValueError):
+        return None
+
+
+class OrbitalReuse:
+    """Orbitals injected into one job's run input, and how to undo that."""
+
+    def __init__(self, input_file, original_text, moread_file, source_gbw):
+        self.input_file = input_file
+        self.original_text = original_text
+        self.moread_file = moread_file
+        self.source_gbw = source_gbw
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def revert_interrupted(self):
+        """Revert an injection left behind by a run that never finished, unless the input changed since."""
+        try:
+            with open(self.input_file, 'r', encoding='utf-8', errors='ignore') as f:
+                text = f.read()
+        except OSError:
+            return
+        if f'%moinp "{os.path.basename(self.moread_file)}"' not in text:
+            return  # Reverted already, or edited by the user
+        logger.info(f"Removing the MORead injection an interrupted run left in {self.input_file}")
+        self.revert()
+
+    def revert(self):
+        """Restore the input as it was before injection and remove the copied GBW."""
+        try:
+            with open(self.input_file, 'w', encoding='utf-8') as f:
+                f.write(self.original_text)
+        except OSError as e:
+            logger.warning(f"Could not restore {self.input_file} after MORead injection: {e}")
+        try:
+            os.remove(self.moread_file)
+        except OSError:
+            pass
+
+
+class OrbitalLibrary:
+    """Finds GBW files of finished jobs that match a new job's molecule."""
+
+    def __init__(self):
+        # input path -> (mtime, molecule) so inputs are parsed once per change
+        self._molecules = {}
+
+    def molecule(self, input_path):
+        """Return the (charge, multiplicity, elements) of an input, cached by mtime."""
+        try:
+            mtime = os.path.getmtime(input_path)
+        except OSError:
+            return None
+        cached = self._molecules.get(input_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            molecule = read_molecule(input_path)
+        except OSError:
+            molecule = None
+        self._molecules[input_path] = (mtime, molecule)
+        return molecule
+
+    def find_gbw(self, job, candidates):
+        """
+        Return the GBW of the most recently finished compatible candidate job, or None.
+
+        A GBW qualifies when its job finished successfully on the same atoms
+        (in the same order), charge and multiplicity, and the file is not
+        older than that job's start, i.e. it was not left by an earlier run.
+        """
+        molecule = self.molecule(job.input_path)
+        if molecule is None or not molecule[2]:
+            return None
+        own_gbw = gbw_path_for(job.input_path)
+        ordered = sorted(candidates, key=lambda candidate: candidate.finished_time or '', reverse=True)
+        for candidate in ordered:
+            if candidate is job or candidate.outcome is None or not candidate.outcome.succeeded:
+                continue
+            gbw = gbw_path_for(candidate.input_path)
+            if gbw == own_gbw:
+                continue  # ORCA already restarts from its own GBW (autostart)
+            try:
+                stat = os.stat(gbw)
+            except OSError:
+                continue
+            started = _parse_time(candidate.started_time)
+            if stat.st_size == 0 or (started is not None and stat.st_mtime < started):
+                continue
+            if self.molecule(candidate.input_path) == molecule:
+                return gbw
+        return None
+
+    def prepare(self, job, input_file, candidates):
+        """
+        Inject MORead for a compatible GBW into input_file (the file ORCA will run).
+
+        Returns an OrbitalReuse to revert the injection, or None when the
+        input already handles its orbitals or nothing compatible exists.
+        """
+        try:
+            with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
+                text = f.read()
+        except OSError:
+            return None
+        if requests_moread(text):
+            return None
+        keywords = [token.upper() for token in keyword_lines(text)]
+        if any('XTB' in token or token.startswith('GFN') for token in keywords):
+            return None  # xTB methods do not start from SCF orbitals
+        source = self.find_gbw(job, candidates)
+        if source is None:
+            return None
+        base = os.path.splitext(os.path.basename(input_file))[0]
+        moread_file = os.path.join(os.path.dirname(input_file), base + MOREAD_SUFFIX)
+        try:
+            shutil.copy2(source, moread_file)
+            with open(input_file, 'w', encoding='utf-8') as f:
+                f.write(inject_moread(text, os.path.basename(moread_file)))
+        except OSError as e:
+            logger.warning(f"Could not set up orbital reuse from {source}: {e}")
+            reuse = OrbitalReuse(input_file, text, moread_file, source)
+            reuse.revert()
+            return None
+        logger.info(f"Starting {job.input_path} from the orbitals of {source}")
+        return OrbitalReuse(input_file, text, moread_file, source)
@@ -0,0 +1,242 @@
+"""
+Section index of ORCA output files.
+
+An ORCA output announces its parts with banner lines: "SCF ITERATIONS",
+"* GEOMETRY OPTIMIZATION CYCLE 12 *", "FINAL SINGLE POINT ENERGY",
+"VIBRATIONAL FREQUENCIES", "MULLIKEN POPULATION ANALYSIS", "TIMINGS" and
+so on. OutputIndex finds them in one pass over the file, a chunk at a
+time, and records the byte offset of every banner line; a section runs
+from its banner to the next one. Reading a section then reads only that
+byte range, however large the output is.
+
+The index is kept in a sidecar file next to the output
+(<name>.out.sections.json) together with how far the output was indexed
+and a checksum of its first bytes. Opening the output again reuses the
+index, and an output that grew (the job is still running) is only indexed
+from where the previous pass stopped. An output that was rewritten is
+indexed again from the start.
+"""
+import json
+import os
+import re
+import zlib
+
+from .logger import logger
+
+SECTION_INDEX_SUFFIX = '.sections.json'
+INDEX_VERSION = 1
+
+# Bytes read per step of indexing
+CHUNK_BYTES = 8 * 1024 * 1024
+# The checksum of this many leading bytes tells a rewritten output from a grown one
+HEAD_BYTES = 4096
+# Sections longer than this are read only up to this size
+MAX_SECTION_BYTES = 4 * 1024 * 1024
+
+# Section kind -> banner patterns. A banner is a line of its own, apart from
+# the asterisks, dashes and blanks ORCA frames it with.
+BANNERS = (
+    ('input', (rb'INPUT FILE',)),
+    ('scf', (rb'SCF ITERATIONS',)),
+    ('scf_energy', (rb'TOTAL SCF ENERGY',)),
+    ('geometry_cycle', (rb'GEOMETRY OPTIMIZATION CYCLE\s+\d+',)),
+    ('optimization', (rb'THE OPTIMIZATION HAS CONVERGED', rb'OPTIMIZATION RUN DONE')),
+    ('final_energy', (rb'FINAL SINGLE POINT ENERGY\s+\S+',)),
+    ('orbitals', (rb'ORBITAL ENERGIES',)),
+    ('population', (rb'(?:MULLIKEN|LOEWDIN|MAYER|HIRSHFELD)(?: POPULATION)? ANALYSIS',)),
+    ('dipole', (rb'DIPOLE MOMENT',)),
+    ('frequencies', (rb'VIBRATIONAL FREQUENCIES', rb'NORMAL MODES', rb'IR SPECTRUM')),
+    ('thermochemistry', (rb'THERMOCHEMISTRY AT\s+\S+',)),
+    ('timings', (rb'TIMINGS', rb'TOTAL RUN TIME:.*')),
+    ('termination', (rb'ORCA TERMINATED NORMALLY',)),
+)
+
+SECTION_LABELS = {
+    'input': "Input",
+    'scf': "SCF iterations",
+    'scf_energy': "SCF energy",
+    'geometry_cycle': "Geometry cycles",
+    'optimization': "Optimization",
+    'final_energy': "Final energies",
+    'orbitals': "Orbital energies",
+    'population': "Population analysis",
+    'dipole': "Dipole moment",
+    'frequencies': "Frequencies",
+    'thermochemistry': "Thermochemistry",
+    'timings': "Timings",
+    'termination': "Termination",
+}
+
+_FRAME = rb'[ \t*=-]*'
+# Anchored on the newline before the banner; the lookahead discards lines
+# that do not start with a capitalized word early, which keeps the scan fast
+_BANNER_RE = re.compile(
+    rb'\n(?=' + _FRAME + rb'[A-Z][A-Z ]{5})' + _FRAME + rb'(?:' +
+    rb'|'.join(rb'(?P<%s>%s)' % (kind.encode(), rb'|'.join(patterns)) for kind, patterns in BANNERS) +
+    rb')' + _FRAME + rb'\r?$',
+    re.MULTILINE,
+)
+
+
+def index_path(output_path):
+    """The sidecar file holding the section index of output_path."""
+    return os.path.abspath(output_path) + SECTION_INDEX_SUFFIX
+
+
+class Section:
+    """One banner of an output: its byte offset, kind (a key of BANNERS) and title."""
+
+    __slots__ = ('offset', 'kind', 'title')
+
+    def __init__(self, offset, kind, title):
+        self.offset = offset
+        self.kind = kind
+        self.title = title
+
+    def __repr__(self):
+        return f"Section({self.offset}, {self.kind!r}, {self.title!r})"
+
+
+class OutputIndex:
+    """Byte offsets of the section banners of one ORCA output, kept in a sidecar file."""
+
+    def __init__(self, output_path, sidecar_path=None):
+        self.output_path = output_path
+        self.sidecar_path = sidecar_path or index_path(output_path)
+        self.sections = []
+        # The output is indexed up to this offset (always the start of a line)
+        self.indexed_to = 0
+        self._head_length = 0
+        self._head_crc = 0
+        self._load()
+
+    def __len__(self):
+        return len(self.sections)
+
+    def size(self):
+        try:
+            return os.path.getsize(self.output_path)
+        except OSError:
+            return None
+
+    def _head(self, length):
+        with open(self.output_path, 'rb') as f:
+            return zlib.crc32(f.read(length))
+
+    def _reset(self):
+        self.sections = []
+        self.indexed_to = self._head_length = self._head_crc = 0
+
+    def _load(self):
+        try:
+            with open(self.sidecar_path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') != INDEX_VERSION:
+                return
+            self.sections = [Section(*entry) for entry in data['sections']]
+            self.indexed_to = data['indexed_to']
+            self._head_length, self._head_crc = data['head']
+        except (OSError, ValueError, KeyError, TypeError):
+            self._reset()
+            return
+        if not self._still_valid():
+            logger.debug(f"Output {self.output_path} changed since it was indexed; indexing it again")
+            self._reset()
+
+    def _still_valid(self):
+        size = self.size()
+        if size is None or size < self.indexed_to:
+            return False
+        try:
+            return self._head(self._head_length) == self._head_crc
+        except OSError:
+            return False
+
+    def save(self):
+        """Write the index to the sidecar file; a directory we cannot write to keeps it in memory."""
+        data = {
+            'version': INDEX_VERSION,
+            'indexed_to': self.indexed_to,
+            'head': [self._head_length, self._head_crc],
+            'sections': [[section.offset, section.kind, section.title] for section in self.sections],
+        }
+        tmp_path = f"{self.sidecar_path}.tmp{os.getpid()}"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.sidecar_path)
+        except OSError as e:
+            logger.debug(f"Could not write the section index {self.sidecar_path}: {e}")
+
+    def has_more(self):
+        """True if the output has data past what is indexed."""
+        size = self.size()
+        return size is not None and size > self.indexed_to
+
+    def update(self, max_bytes=None):
+        """
+        Index the output from where the previous pass stopped; returns the number of new sections.
+
+        At most max_bytes (all of the file if None) are read, in chunks of
+        CHUNK_BYTES; call again while has_more() to continue. Only complete
+        lines are indexed, so a banner ORCA is still writing is found next
+        time. The sidecar file is written when anything was indexed.
+        """
+        size = self.size()
+        if size is None:
+            return 0
+        if size < self.indexed_to or (self.indexed_to and not self._still_valid()):
+            self._reset()
+        before = len(self.sections)
+        start = self.indexed_to
+        budget = size - start if max_bytes is None else min(max_bytes, size - start)
+        with open(self.output_path, 'rb') as f:
+            if self._head_length < HEAD_BYTES and size > self._head_length:
+                self._head_length = min(size, HEAD_BYTES)
+                self._head_crc = zlib.crc32(f.read(self._head_length))
+            f.seek(start)
+            while budget > 0:
+                data = f.read(min(CHUNK_BYTES, budget))
+                if not data:
+                    break
+                end = data.rfind(b'\n') + 1
+                if end == 0:
+                    if len(data) < CHUNK_BYTES:
+                        break  # An incomplete last line
+                    end = len(data)  # A line longer than a chunk holds no banner
+                self._scan(data[:end], self.indexed_to)
+                self.indexed_to += end
+                budget -= end
+                f.seek(self.indexed_to)
+        if self.indexed_to != start:
+            self.save()
+        return len(self.sections) - before
+
+    def _scan(self, data, base):
+        # data starts a line; the newline put in front makes the offset of a
+        # match's newline in the buffer the file offset of its line
+        for match in _BANNER_RE.finditer(b'\n' + data):
+            title = b' '.join(match.group(match.lastgroup).split()).decode('ascii', 'replace')
+            self.sections.append(Section(base + match.start(), match.lastgroup, title))
+
+    def section_range(self, index):
+        """(start, end) byte offsets of a section; the last one ends where indexing stopped."""
+        start = self.sections[index].offset
+        end = self.sections[index + 1].offset if index + 1 < len(self.sections) else self.indexed_to
+        return start, end
+
+    def read_section(self, index, max_bytes=MAX_SECTION_BYTES):
+        """Return (text, truncated): the text of a section, read from its byte range alone."""
+        start, end = self.section_range(index)
+        length = min(end - start, max_bytes)
+        with open(self.output_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(length)
+        truncated = end - start > length
+        if truncated:
+            data = data[:data.rfind(b'\n') + 1] or data
+        return data.decode('utf-8', errors='replace'), truncated
+
+    def find(self, kind):
+        """Indices of the sections of one kind, in file order."""
+        return [index for index, section in enumerate(self.sections) if section.kind == kind]
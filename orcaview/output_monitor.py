@@ -0,0 +1,447 @@
+"""
+Live viewer for ORCA output files.
+
+The viewer never loads the whole file: it shows the last part of the output,
+then reads only the bytes appended since the previous read. Changes are
+picked up through QFileSystemWatcher (inotify on Linux) with a stat-based
+timer as fallback for file systems that do not deliver change events, such
+as network shares. Earlier parts of the file can be loaded on demand.
+Next to the text, a ConvergencePanel plots the SCF and geometry
+convergence of the job from its shared output parser.
+
+OutputNavigatorDialog lists the sections of the output (SCF runs,
+optimization cycles, frequencies, ...) from its OutputIndex and shows the
+one selected by reading only its byte range.
+"""
+import codecs
+import os
+import re
+from collections import deque
+
+from PyQt6.QtCore import Qt, QTimer, QFileSystemWatcher
+from PyQt6.QtGui import QTextCursor, QFont
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton, QLabel, QSplitter,
+                             QComboBox, QListWidget, QListWidgetItem)
+
+from .convergence_plot import ConvergencePanel
+from .job_queue import JobStatus
+from .logger import logger
+from .output_index import OutputIndex, SECTION_LABELS, CHUNK_BYTES
+from .output_parser import parser_for_job
+
+# How much of an existing file is shown when the monitor opens
+INITIAL_TAIL_BYTES = 256 * 1024
+# Chunk read by "Load Earlier Output"
+EARLIER_CHUNK_BYTES = 1024 * 1024
+# Cap on the number of lines held by the viewer while following the tail
+MAX_BLOCK_COUNT = 20000
+# Largest amount of new data read per change notification
+MAX_READ_BYTES = 4 * 1024 * 1024
+
+
+class TailReader:
+    """Incrementally read the bytes appended to a file since the last call."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        # Offset of the earliest byte handed out so far (for loading earlier data)
+        self.first_offset = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return None
+
+    def start_at_tail(self, tail_bytes=INITIAL_TAIL_BYTES):
+        """Position the reader so the first read returns about tail_bytes of the file."""
+        size = self.size() or 0
+        start = max(0, size - tail_bytes)
+        if start > 0:
+            start = self._next_line_start(start)
+        self.offset = self.first_offset = start
+        self._decoder.reset()
+
+    def read_new(self, max_bytes=MAX_READ_BYTES):
+        """
+        Return (text, truncated, line_starts) for data appended since the last read.
+
+        truncated is True when the file shrank (e.g. ORCA was restarted and
+        rewrote it); reading then restarts from the beginning. line_starts
+        holds the file offsets of the lines that begin inside the new data.
+        """
+        size = self.size()
+        if size is None:
+            return '', False, []
+        truncated = size < self.offset
+        if truncated:
+            self.offset = self.first_offset = 0
+            self._decoder.reset()
+        if size == self.offset:
+            return '', truncated, []
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(max_bytes)
+        line_starts = [self.offset + match.end() for match in re.finditer(b'\n', data)]
+        self.offset += len(data)
+        return self._decoder.decode(data), truncated, line_starts
+
+    def has_more(self):
+        size = self.size()
+        return size is not None and size > self.offset
+
+    def read_earlier(self, max_bytes=EARLIER_CHUNK_BYTES):
+        """
+        Return (text, line_starts) for up to max_bytes before first_offset.
+
+        The text starts on a line boundary; line_starts are the file offsets
+        of the lines that begin inside it after its first line.
+        """
+        if self.first_offset == 0:
+            return '', []
+        start = max(0, self.first_offset - max_bytes)
+        if start > 0:
+            start = self._next_line_start(start)
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            data = f.read(self.first_offset - start)
+        line_starts = [start + match.end() for match in re.finditer(b'\n', data)]
+        self.first_offset = start
+        return data.decode('utf-8', errors='replace'), line_starts
+
+    def _next_line_start(self, offset):
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            f.readline()
+            return f.tell()
+
+
+class OutputMonitorDialog(QDialog):
+    """Follow a job's output file with bounded memory use."""
+
+    FALLBACK_POLL_MS = 1000
+
+    def __init__(self, job, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.setWindowFlag(Qt.WindowType.Window)
+        self.setWindowTitle(f"Monitor Output: {os.path.basename(job.output_path)}")
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.load_earlier_button = QPushButton("Load Earlier Output")
+        self.load_earlier_button.clicked.connect(self._load_earlier)
+        self.position_label = QLabel()
+        self.plots_button = QPushButton("Convergence Plots")
+        self.plots_button.setCheckable(True)
+        self.plots_button.setChecked(True)
+        self.sections_button = QPushButton("Sections...")
+        self.sections_button.clicked.connect(self._open_navigator)
+        self._navigator = None
+        controls.addWidget(self.load_earlier_button)
+        controls.addWidget(self.plots_button)
+        controls.addWidget(self.sections_button)
+        controls.addStretch()
+        controls.addWidget(self.position_label)
+        layout.addLayout(controls)
+
+        # Live progress from the shared incremental parser
+        self.parser = parser_for_job(job)
+        self._progress_pending = False
+        self.progress_label = QLabel()
+        layout.addWidget(self.progress_label)
+
+        self.text_edit = QPlainTextEdit(self)
+        self.text_edit.setReadOnly(True)
+        self.text_edit.setUndoRedoEnabled(False)
+        self.text_edit.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.text_edit.setFont(QFont("Courier New", 10))
+        self.text_edit.setMaximumBlockCount(MAX_BLOCK_COUNT)
+        self.text_edit.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        self.convergence_panel = ConvergencePanel(self.parser)
+        self.plots_button.toggled.connect(self.convergence_panel.setVisible)
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.text_edit)
+        splitter.addWidget(self.convergence_panel)
+        splitter.setStretchFactor(0, 3)
+        splitter.setStretchFactor(1, 2)
+        layout.addWidget(splitter)
+
+        self.reader = TailReader(job.output_path)
+        # File offsets of every displayed line except the first. When the
+        # block limit trims lines from the top, this tells us where the
+        # visible output now starts, so "Load Earlier" continues seamlessly.
+        self._line_starts = deque()
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._on_file_changed)
+        self.watcher.directoryChanged.connect(self._on_file_changed)
+        # Fallback for file systems without change notifications
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(self.FALLBACK_POLL_MS)
+        self.poll_timer.timeout.connect(self._on_file_changed)
+        self.finished.connect(self._stop_following)
+
+        self._open()
+        self.resize(1200, 650)
+
+    def _open(self):
+        if os.path.exists(self.job.output_path):
+            self.reader.start_at_tail()
+            self._read_new_data()
+        else:
+            self.text_edit.setPlainText(
+                f"Output file does not exist:\n{self.job.output_path}\n\n"
+                "Check if the job has started, or if the output path is correct."
+            )
+        if self._job_active():
+            self._watch()
+            self.poll_timer.start()
+
+    def _watch(self):
+        if os.path.exists(self.job.output_path):
+            if self.job.output_path not in self.watcher.files():
+                self.watcher.addPath(self.job.output_path)
+            # ORCA writes many temporary files; stop listening to the directory
+            if self.watcher.directories():
+                self.watcher.removePaths(self.watcher.directories())
+        else:
+            # Wait for ORCA to create the file
+            directory = os.path.dirname(os.path.abspath(self.job.output_path))
+            if os.path.isdir(directory) and directory not in self.watcher.directories():
+                self.watcher.addPath(directory)
+
+    def _job_active(self):
+        return self.job.status in (JobStatus.RUNNING, JobStatus.QUEUED)
+
+    def _on_file_changed(self, *_):
+        if not os.path.exists(self.job.output_path):
+            return
+        if self._job_active() and self.job.output_path not in self.watcher.files():
+            if self.reader.offset == 0 and self.reader.first_offset == 0:
+                self.text_edit.clear()  # Drop the "does not exist" notice
+            self._watch()
+        self._read_new_data()
+        if not self._job_active() and not self.reader.has_more():
+            self._stop_following()
+
+    def _read_new_data(self):
+        try:
+            text, truncated, line_starts = self.reader.read_new()
+        except OSError as e:
+            self.position_label.setText(f"Could not read output file: {e}")
+            return
+        if truncated:
+            self.text_edit.clear()
+            self._line_starts.clear()
+        if text:
+            self._append(text)
+            self._line_starts.extend(line_starts)
+            self._sync_first_offset()
+        if self.reader.has_more():
+            # More than one read's worth arrived; continue without blocking the UI
+            QTimer.singleShot(0, self._read_new_data)
+        self._schedule_progress()
+        self._update_position_label()
+
+    def _schedule_progress(self):
+        # At most one catch-up chain, however often new data arrives
+        if not self._progress_pending:
+            self._progress_pending = True
+            QTimer.singleShot(0, self._update_progress)
+
+    def _update_progress(self):
+        self._progress_pending = False
+        self.parser.parse_new()
+        self.progress_label.setText(self.parser.summary())
+        self.convergence_panel.refresh()
+        if self.parser.has_more():
+            # Catching up on a large existing file happens a chunk at a time
+            self._schedule_progress()
+
+    def _at_bottom(self):
+        scrollbar = self.text_edit.verticalScrollBar()
+        return scrollbar.value() >= scrollbar.maximum() - 2
+
+    def _on_scrolled(self, *_):
+        if self._at_bottom():
+            self._restore_block_limit()
+
+    def _restore_block_limit(self):
+        """Bound the view again once the user follows the tail after loading earlier output."""
+        if self.text_edit.maximumBlockCount() == MAX_BLOCK_COUNT:
+            return
+        # Trims the loaded history from the top of the document
+        self.text_edit.setMaximumBlockCount(MAX_BLOCK_COUNT)
+        self._sync_first_offset()
+        self._update_position_label()
+
+    def _append(self, text):
+        scrollbar = self.text_edit.verticalScrollBar()
+        at_bottom = self._at_bottom()
+        if at_bottom:
+            self._restore_block_limit()
+        cursor = QTextCursor(self.text_edit.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def _load_earlier(self):
+        try:
+            text, line_starts = self.reader.read_earlier()
+        except OSError as e:
+            self.position_label.setText(f"Could not read output file: {e}")
+            return
+        if not text:
+            return
+        self._line_starts.extendleft(reversed(line_starts))
+        # Make room so the inserted lines are not trimmed right away
+        document = self.text_edit.document()
+        self.text_edit.setMaximumBlockCount(document.blockCount() + text.count('\n') + 1)
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.Start)
+        cursor.insertText(text)
+        self._update_position_label()
+
+    def _sync_first_offset(self):
+        """Account for lines the block limit trimmed from the top of the view."""
+        block_count = self.text_edit.document().blockCount()
+        while len(self._line_starts) + 1 > block_count:
+            self.reader.first_offset = self._line_starts.popleft()
+
+    def _update_position_label(self):
+        self.load_earlier_button.setEnabled(self.reader.first_offset > 0)
+        shown_from = self.reader.first_offset
+        if shown_from > 0:
+            self.position_label.setText(f"Showing output from byte {shown_from:,} of {self.reader.offset:,}")
+        else:
+            self.position_label.setText(f"{self.reader.offset:,} bytes")
+
+    def _open_navigator(self):
+        if self._navigator is None:
+            self._navigator = OutputNavigatorDialog(self.job, self)
+        self._navigator.show()
+        self._navigator.raise_()
+
+    def _stop_following(self, *_):
+        self.poll_timer.stop()
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+
+
+class OutputNavigatorDialog(QDialog):
+    """Jump to the sections of a job's output without loading the rest of it."""
+
+    # A running job's output is indexed again this often
+    REFRESH_MS = 2000
+
+    def __init__(self, job, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.setWindowFlag(Qt.WindowType.Window)
+        self.setWindowTitle(f"Output Sections: {os.path.basename(job.output_path)}")
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.kind_combo = QComboBox()
+        self.kind_combo.addItem("All sections", None)
+        for kind, label in SECTION_LABELS.items():
+            self.kind_combo.addItem(label, kind)
+        self.kind_combo.currentIndexChanged.connect(self._fill_list)
+        self.status_label = QLabel()
+        controls.addWidget(QLabel("Show:"))
+        controls.addWidget(self.kind_combo)
+        controls.addStretch()
+        controls.addWidget(self.status_label)
+        layout.addLayout(controls)
+
+        self.section_list = QListWidget()
+        self.section_list.currentItemChanged.connect(self._show_section)
+        self.text_edit = QPlainTextEdit()
+        self.text_edit.setReadOnly(True)
+        self.text_edit.setUndoRedoEnabled(False)
+        self.text_edit.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.text_edit.setFont(QFont("Courier New", 10))
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.section_list)
+        splitter.addWidget(self.text_edit)
+        splitter.setStretchFactor(0, 1)
+        splitter.setStretchFactor(1, 3)
+        layout.addWidget(splitter)
+
+        self.index = OutputIndex(job.output_path)
+        self._indexing = False
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_MS)
+        self.refresh_timer.timeout.connect(self._index_more)
+        self.finished.connect(self.refresh_timer.stop)
+        self._fill_list()
+        self._index_more()
+        if self.job.status in (JobStatus.RUNNING, JobStatus.QUEUED):
+            self.refresh_timer.start()
+        self.resize(1100, 650)
+
+    def _index_more(self):
+        """Index the next chunk of the output; continues from the event loop until it is done."""
+        if self._indexing:
+            return
+        indexed_to = self.index.indexed_to
+        try:
+            new_sections = self.index.update(max_bytes=CHUNK_BYTES)
+        except OSError as e:
+            self.status_label.setText(f"Could not read output file: {e}")
+            return
+        if new_sections or self.index.indexed_to < indexed_to:
+            self._fill_list()
+        # An incomplete last line stays unindexed until ORCA finishes it
+        self._indexing = self.index.indexed_to > indexed_to and self.index.has_more()
+        if self._indexing:
+            QTimer.singleShot(0, self._continue_indexing)
+        self._update_status()
+
+    def _continue_indexing(self):
+        self._indexing = False
+        self._index_more()
+
+    def _update_status(self):
+        size = self.index.size() or 0
+        text = f"{len(self.index)} sections"
+        if self._indexing and size:
+            text += f", indexing {100 * self.index.indexed_to // size}%..."
+        self.status_label.setText(text)
+
+    def _fill_list(self, *_):
+        kind = self.kind_combo.currentData()
+        current = self.section_list.currentItem()
+        current_offset = current.data(Qt.ItemDataRole.UserRole + 1) if current else None
+        self.section_list.blockSignals(True)
+        self.section_list.clear()
+        for number, section in enumerate(self.index.sections):
+            if kind is not None and section.kind != kind:
+                continue
+            item = QListWidgetItem(section.title)
+            item.setData(Qt.ItemDataRole.UserRole, number)
+            item.setData(Qt.ItemDataRole.UserRole + 1, section.offset)
+            item.setToolTip(f"{SECTION_LABELS.get(section.kind, section.kind)} at byte {section.offset:,}")
+            self.section_list.addItem(item)
+            if section.offset == current_offset:
+                self.section_list.setCurrentItem(item)
+        self.section_list.blockSignals(False)
+
+    def _show_section(self, item, *_):
+        if item is None:
+            return
+        number = item.data(Qt.ItemDataRole.UserRole)
+        try:
+            text, truncated = self.index.read_section(number)
+        except (OSError, IndexError) as e:
+            logger.warning(f"Could not read section {number} of {self.job.output_path}: {e}")
+            self.text_edit.setPlainText(f"Could not read this section: {e}")
+            return
+        if truncated:
+            _, end = self.index.section_range(number)
+            text += f"\n[... section continues to byte {end:,}]"
+        self.text_edit.setPlainText(text)
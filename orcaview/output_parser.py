@@ -0,0 +1,323 @@
+"""
+Incremental parser for ORCA output files.
+
+OrcaOutputParser remembers the byte offset it has consumed, so each call to
+parse_new() reads only what ORCA appended since the previous call and turns
+it into structured events (SCF iterations, final energies, optimization
+cycles and their convergence table, timings, warnings and errors). The
+parser also keeps a running summary that views can display as progress,
+and a ConvergenceHistory of the SCF energy changes and the geometry
+convergence criteria for plotting. Its series are thinned out as they
+grow, so a plot of a 500-cycle optimization draws as many points as one
+of a short run.
+"""
+import os
+import re
+from collections import deque
+
+# Event kinds
+SCF_ITERATION = 'scf_iteration'
+SCF_CONVERGED = 'scf_converged'
+SCF_NOT_CONVERGED = 'scf_not_converged'
+FINAL_ENERGY = 'final_energy'
+OPT_CYCLE = 'opt_cycle'
+GEOMETRY_CONVERGENCE = 'geometry_convergence'
+OPT_CONVERGED = 'opt_converged'
+TIMING = 'timing'
+WARNING = 'warning'
+ERROR = 'error'
+TERMINATED = 'terminated'
+
+# Largest chunk consumed per parse_new() call. Views call it on the GUI
+# thread, where parsing 256 kB takes a few tens of milliseconds; a large
+# existing file is caught up on over several calls.
+MAX_CHUNK_BYTES = 256 * 1024
+# Warnings and errors kept as text; all of them are counted
+MAX_KEPT_MESSAGES = 20
+
+_SCF_HEADER_RE = re.compile(r'^\s*ITER\s+Energy\s+Delta-E')
+_SCF_LINE_RE = re.compile(r'^\s*(\d+)\s+(-?\d+\.\d+)\s+(-?\d+\.\d+(?:[eE][-+]?\d+)?)\b')
+_SCF_CONVERGED_RE = re.compile(r'SCF CONVERGED AFTER\s+(\d+)\s+CYCLES')
+_SCF_NOT_CONVERGED_RE = re.compile(r'SCF NOT CONVERGED|The SCF is NOT CONVERGED', re.IGNORECASE)
+_FINAL_ENERGY_RE = re.compile(r'FINAL SINGLE POINT ENERGY\s+(-?\d+\.\d+)')
+_OPT_CYCLE_RE = re.compile(r'GEOMETRY OPTIMIZATION CYCLE\s+(\d+)')
+_CONVERGENCE_ITEM_RE = re.compile(
+    r'^\s*(Energy change|RMS gradient|MAX gradient|RMS step|MAX step)\s+'
+    r'(-?\d+\.\d+(?:[eE][-+]?\d+)?)\s+(-?\d+\.\d+(?:[eE][-+]?\d+)?)\s+(YES|NO)\b'
+)
+_OPT_CONVERGED_RE = re.compile(r'THE OPTIMIZATION HAS CONVERGED')
+_TOTAL_RUN_TIME_RE = re.compile(
+    r'TOTAL RUN TIME:\s+(\d+)\s+days\s+(\d+)\s+hours\s+(\d+)\s+minutes\s+(\d+)\s+seconds\s+(\d+)\s+msec'
+)
+_WARNING_RE = re.compile(r'^\s*WARNING\b', re.IGNORECASE)
+_ERROR_RE = re.compile(r'\bError\b:|error termination|ABORTING THE RUN|^\s*ERROR\b')
+_TERMINATED_RE = re.compile(r'ORCA TERMINATED NORMALLY')
+
+# Points kept per convergence series; longer series are thinned out
+MAX_SERIES_POINTS = 512
+
+# The criteria of ORCA's geometry convergence table, in printed order
+CONVERGENCE_CRITERIA = ('Energy change', 'RMS gradient', 'MAX gradient', 'RMS step', 'MAX step')
+
+
+class DecimatedSeries:
+    """
+    (x, y) points of a series that grows without bound, in bounded memory.
+
+    Once capacity points are stored every second point is dropped and only
+    every second new one is kept, so the kept points stay spread evenly
+    over the whole series. points() always ends with the latest point.
+    """
+
+    def __init__(self, capacity=MAX_SERIES_POINTS):
+        self.capacity = capacity
+        self.count = 0
+        self.last = None
+        self._points = []
+        self._stride = 1
+        self._skipped = 0
+
+    def append(self, x, y):
+        self.count += 1
+        self.last = (x, y)
+        self._skipped += 1
+        if self._skipped < self._stride:
+            return
+        self._skipped = 0
+        self._points.append(self.last)
+        if len(self._points) >= self.capacity:
+            self._points = self._points[::2]
+            self._stride *= 2
+
+    def points(self):
+        if self.last is not None and (not self._points or self._points[-1] is not self.last):
+            return self._points + [self.last]
+        return list(self._points)
+
+
+class ConvergenceHistory:
+    """
+    Series to plot how a run converges.
+
+    scf holds (SCF iteration counted over the whole run, |delta E|), so the
+    SCFs of successive optimization cycles follow each other; criteria holds
+    (optimization cycle, |value|) per CONVERGENCE_CRITERIA name, and
+    tolerances the latest threshold of each. version changes with every
+    point added, so views redraw only when there is something new.
+    """
+
+    def __init__(self):
+        self.scf = DecimatedSeries()
+        self.criteria = {name: DecimatedSeries() for name in CONVERGENCE_CRITERIA}
+        self.tolerances = {}
+        self.scf_iterations = 0
+        self.version = 0
+
+    def add_scf_iteration(self, delta_e):
+        self.scf_iterations += 1
+        self.scf.append(self.scf_iterations, abs(delta_e))
+        self.version += 1
+
+    def add_cycle(self, cycle, criteria):
+        for name, item in criteria.items():
+            series = self.criteria.get(name)
+            if series is not None:
+                series.append(cycle, abs(item['value']))
+                self.tolerances[name] = abs(item['tolerance'])
+        self.version += 1
+
+
+class OutputEvent:
+    """One structured observation from the output file."""
+
+    __slots__ = ('kind', 'data', 'offset')
+
+    def __init__(self, kind, data, offset):
+        self.kind = kind
+        self.data = data
+        self.offset = offset
+
+    def __repr__(self):
+        return f"OutputEvent({self.kind!r}, {self.data!r}, offset={self.offset})"
+
+
+class OrcaOutputParser:
+    """Resumable, line-oriented parser over a growing ORCA output file."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.offset = 0
+        self._partial = b''
+        self._in_scf = False
+        self._convergence = {}
+        self.reset_summary()
+
+    def reset_summary(self):
+        self.scf_iteration = None
+        self.scf_energy = None
+        self.scf_delta_e = None
+        self.scf_cycles = 0
+        self.opt_cycle = None
+        self.last_convergence = None
+        self.final_energy = None
+        self.opt_converged = False
+        self.warnings = deque(maxlen=MAX_KEPT_MESSAGES)
+        self.errors = deque(maxlen=MAX_KEPT_MESSAGES)
+        self.warning_count = 0
+        self.error_count = 0
+        self.run_time_seconds = None
+        self.terminated_normally = False
+        self.convergence = ConvergenceHistory()
+
+    def parse_new(self, max_bytes=MAX_CHUNK_BYTES):
+        """Read the bytes appended to self.path since the last call and return their events."""
+        try:
+            size = os.path.getsize(self.path)
+        except (OSError, TypeError):
+            return []
+        if size < self.offset:
+            # The file was rewritten (job restarted); start over
+            self.offset = 0
+            self._partial = b''
+            self._in_scf = False
+            self.reset_summary()
+        if size == self.offset:
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(max_bytes)
+        return self.feed(data)
+
+    def has_more(self):
+        try:
+            return os.path.getsize(self.path) > self.offset
+        except (OSError, TypeError):
+            return False
+
+    def feed(self, data):
+        """Consume raw bytes (which may end mid-line) and return the events found."""
+        events = []
+        buffer = self._partial + data
+        line_offset = self.offset - len(self._partial)
+        self.offset += len(data)
+        lines = buffer.split(b'\n')
+        self._partial = lines.pop()
+        for raw_line in lines:
+            line = raw_line.decode('utf-8', errors='replace').rstrip('\r')
+            self._parse_line(line, line_offset, events)
+            line_offset += len(raw_line) + 1
+        return events
+
+    def _parse_line(self, line, offset, events):
+        def emit(kind, data=None):
+            events.append(OutputEvent(kind, data, offset))
+
+        if self._in_scf:
+            match = _SCF_LINE_RE.match(line)
+            if match:
+                self.scf_iteration = int(match.group(1))
+                self.scf_energy = float(match.group(2))
+                self.scf_delta_e = float(match.group(3))
+                self.convergence.add_scf_iteration(self.scf_delta_e)
+                emit(SCF_ITERATION, {
+                    'iteration': self.scf_iteration,
+                    'energy': self.scf_energy,
+                    'delta_e': self.scf_delta_e,
+                })
+                return
+        if _SCF_HEADER_RE.match(line):
+            self._in_scf = True
+            return
+        # Cheap substring guards keep the per-line cost low on huge outputs
+        if 'SCF' in line:
+            match = _SCF_CONVERGED_RE.search(line)
+            if match:
+                self._in_scf = False
+                self.scf_cycles = int(match.group(1))
+                emit(SCF_CONVERGED, {'cycles': self.scf_cycles})
+                return
+            if _SCF_NOT_CONVERGED_RE.search(line):
+                self._in_scf = False
+                emit(SCF_NOT_CONVERGED, {'line': line.strip()})
+                return
+        if 'FINAL SINGLE POINT ENERGY' in line:
+            match = _FINAL_ENERGY_RE.search(line)
+            if match:
+                self._in_scf = False
+                self.final_energy = float(match.group(1))
+                emit(FINAL_ENERGY, {'energy': self.final_energy})
+            return
+        if 'OPTIMIZATION CYCLE' in line:
+            match = _OPT_CYCLE_RE.search(line)
+            if match:
+                self.opt_cycle = int(match.group(1))
+                self._convergence = {}
+                emit(OPT_CYCLE, {'cycle': self.opt_cycle})
+            return
+        match = _CONVERGENCE_ITEM_RE.match(line)
+        if match:
+            self._convergence[match.group(1)] = {
+                'value': float(match.group(2)),
+                'tolerance': float(match.group(3)),
+                'converged': match.group(4) == 'YES',
+            }
+            return
+        if self._convergence and line.strip().startswith('....'):
+            # The dotted rule closes the convergence table
+            self.last_convergence = {'cycle': self.opt_cycle, 'criteria': self._convergence}
+            self.convergence.add_cycle(self.opt_cycle or 0, self._convergence)
+            emit(GEOMETRY_CONVERGENCE, self.last_convergence)
+            self._convergence = {}
+            return
+        if 'OPTIMIZATION HAS CONVERGED' in line and _OPT_CONVERGED_RE.search(line):
+            self.opt_converged = True
+            emit(OPT_CONVERGED, {'cycle': self.opt_cycle})
+            return
+        if 'TOTAL RUN TIME' in line:
+            match = _TOTAL_RUN_TIME_RE.search(line)
+            if match:
+                days, hours, minutes, seconds, msec = (int(value) for value in match.groups())
+                self.run_time_seconds = ((days * 24 + hours) * 60 + minutes) * 60 + seconds + msec / 1000.0
+                emit(TIMING, {'total_seconds': self.run_time_seconds})
+            return
+        if 'TERMINATED NORMALLY' in line and _TERMINATED_RE.search(line):
+            self.terminated_normally = True
+            emit(TERMINATED, {})
+            return
+        if _WARNING_RE.match(line):
+            self.warnings.append(line.strip())
+            self.warning_count += 1
+            emit(WARNING, {'text': line.strip()})
+            return
+        if _ERROR_RE.search(line):
+            self.errors.append(line.strip())
+            self.error_count += 1
+            emit(ERROR, {'text': line.strip()})
+
+    def summary(self):
+        """One-line progress description for the queue and monitor views."""
+        if self.terminated_normally:
+            if self.final_energy is not None:
+                return f"Terminated normally, E = {self.final_energy:.8f} Eh"
+            return "Terminated normally"
+        parts = []
+        if self.errors:
+            parts.append(f"Error: {self.errors[-1][:60]}")
+        if self.opt_cycle is not None:
+            parts.append(f"Opt cycle {self.opt_cycle}" + (" (converged)" if self.opt_converged else ""))
+        if self._in_scf and self.scf_iteration is not None:
+            parts.append(f"SCF iter {self.scf_iteration}, dE = {self.scf_delta_e:.2e}")
+        energy = self.final_energy if self.final_energy is not None else self.scf_energy
+        if energy is not None:
+            parts.append(f"E = {energy:.8f} Eh")
+        if self.warning_count:
+            parts.append(f"{self.warning_count} warning(s)")
+        return " | ".join(parts)
+
+
+def parser_for_job(job):
+    """Return the job's shared output parser, creating it on first use."""
+    parser = job.output_parser
+    if parser is None or parser.path != job.output_path:
+        parser = job.output_parser = OrcaOutputParser(job.output_path)
+    return parser
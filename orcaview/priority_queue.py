@@ -0,0 +1,198 @@
+"""
+Priority queue of waiting jobs.
+
+Jobs are ordered by (-priority, rank, sequence number) in a binary heap:
+
+- priority: set by the user; higher runs first, default 0.
+- rank: the job's virtual start time under start-time fair queuing. Each
+  project (see OrcaJob.project_key) advances its own virtual clock by the
+  cores of every job it queues, and a job starts at the later of its
+  project's clock and the clock of the last dispatched job. Projects with
+  jobs of equal priority therefore take turns in proportion to the cores
+  they ask for, and a project queuing thousands of sweep jobs does not
+  starve another project that adds one job later. Within one project the
+  order stays first in, first out.
+- sequence number: breaks the remaining ties in insertion order.
+
+With shortest_first the rank is the job's sjf_rank instead: its submission
+time plus its predicted run time (see runtime_model.py). Jobs submitted
+together then run shortest first, and a long job is passed by later short
+jobs only for as long as its own predicted run time, so it cannot starve.
+Switching between the two orders re-heapifies the queue in O(n).
+
+Push, removal and reprioritisation are O(log n). Removal marks the heap
+entry dead instead of searching for it; dead entries are dropped on the
+next push when they reach the top or make up most of the heap. Iteration
+yields the jobs in dispatch order lazily, so a dispatcher that stops early
+does not pay for sorting the whole queue. Jobs may be removed while
+iterating, but not pushed.
+"""
+import heapq
+import itertools
+
+# Compact the heap once dead entries outnumber live ones (and there are this many)
+_COMPACT_MIN_DEAD = 64
+
+_PRIORITY, _RANK, _SEQ, _UID, _JOB = range(5)
+
+
+class JobPriorityQueue:
+    """The queued jobs of a JobQueueManager, in dispatch order."""
+
+    def __init__(self, shortest_first=False):
+        # Rank jobs by sjf_rank instead of the fair-share queue_rank
+        self.shortest_first = shortest_first
+        # [-priority, rank, seq, uid, job]; job is None for dead entries. seq
+        # orders equal ranks, uid is unique so jobs themselves are never compared
+        self._heap = []
+        self._entries = {}  # job id -> live heap entry
+        self._counter = itertools.count()
+        self._dead = 0
+        # Fair share: virtual time of the last dispatched job and the
+        # virtual finish time of each project's last queued job
+        self._virtual_time = 0.0
+        self._project_finish = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def __contains__(self, job):
+        return job.id in self._entries
+
+    def __iter__(self):
+        """Yield the queued jobs in dispatch order (highest priority first)."""
+        heap = self._heap
+        if not heap:
+            return
+        # Walk the heap tree best-first; the heap list itself is not modified
+        frontier = [(heap[0][:_JOB], 0)]
+        while frontier:
+            _, index = heapq.heappop(frontier)
+            entry = heap[index]
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child][:_JOB], child))
+            if entry[_JOB] is not None:
+                yield entry[_JOB]
+
+    def jobs(self):
+        """The queued jobs in no particular order, without the cost of sorting."""
+        return [entry[_JOB] for entry in self._entries.values()]
+
+    def push(self, job):
+        """
+        Add a job behind the jobs of the same priority and project.
+
+        A job that already has a queue_rank (restored from the job store)
+        keeps it. In shortest-first order the caller sets the job's sjf_rank.
+        """
+        if job.id in self._entries:
+            raise ValueError(f"Job {job.input_path} is already queued")
+        project = job.project_key
+        if job.queue_rank is None:
+            job.queue_rank = max(self._virtual_time, self._project_finish.get(project, 0.0))
+        finish = job.queue_rank + max(job.nprocs, 1)
+        self._project_finish[project] = max(self._project_finish.get(project, 0.0), finish)
+        self._add_entry(job)
+
+    def remove(self, job):
+        """Remove a queued job; returns False if it is not queued."""
+        entry = self._entries.pop(job.id, None)
+        if entry is None:
+            return False
+        entry[_JOB] = None
+        self._dead += 1
+        return True
+
+    def take(self, job):
+        """Remove a job that is being dispatched and advance the fair-share clock to it."""
+        if self.remove(job):
+            self._virtual_time = max(self._virtual_time, job.queue_rank)
+            return True
+        return False
+
+    def reprioritize(self, job, priority):
+        """Change a queued job's priority, keeping its place among jobs of that priority."""
+        if job.id not in self._entries:
+            return False
+        seq = self._entries[job.id][_SEQ]
+        self.remove(job)
+        job.priority = priority
+        self._add_entry(job, seq)
+        return True
+
+    def move(self, job, offset):
+        """
+        Move a queued job one place up (offset -1) or down (offset 1) in dispatch order.
+
+        The job takes the priority of the neighbour it passes and a place
+        between that neighbour and the next job, so exactly two jobs swap
+        places. Returns False when the job cannot move that way.
+        """
+        if job not in self or offset not in (-1, 1):
+            return False
+        order = list(self)
+        position = order.index(job)
+        target = position + offset
+        if not 0 <= target < len(order):
+            return False
+        neighbour = order[target]
+        beyond = target + offset
+        following = order[beyond] if 0 <= beyond < len(order) else None
+        neighbour_seq = self._entries[neighbour.id][_SEQ]
+        neighbour_rank = self._rank(neighbour)
+        if following is not None and following.priority == neighbour.priority:
+            following_seq = self._entries[following.id][_SEQ]
+            following_rank = self._rank(following)
+            if following_rank != neighbour_rank:
+                rank, seq = (neighbour_rank + following_rank) / 2, neighbour_seq
+            else:
+                rank, seq = neighbour_rank, (neighbour_seq + following_seq) / 2
+        else:
+            rank, seq = neighbour_rank + offset, neighbour_seq
+        self.remove(job)
+        job.priority = neighbour.priority
+        if self.shortest_first:
+            job.sjf_rank = rank
+        else:
+            job.queue_rank = rank
+        self._add_entry(job, seq)
+        return True
+
+    def set_shortest_first(self, enabled):
+        """Switch between fair-share and shortest-predicted-first order."""
+        if enabled == self.shortest_first:
+            return
+        self.shortest_first = enabled
+        self._heap = [entry for entry in self._heap if entry[_JOB] is not None]
+        for entry in self._heap:
+            entry[_RANK] = self._rank(entry[_JOB])
+        heapq.heapify(self._heap)
+        self._dead = 0
+
+    def _rank(self, job):
+        if self.shortest_first and job.sjf_rank is not None:
+            return job.sjf_rank
+        return job.queue_rank
+
+    def _add_entry(self, job, seq=None):
+        self._drop_dead_top()
+        uid = next(self._counter)
+        entry = [-job.priority, self._rank(job), uid if seq is None else seq, uid, job]
+        self._entries[job.id] = entry
+        heapq.heappush(self._heap, entry)
+        if self._dead >= _COMPACT_MIN_DEAD and self._dead > len(self._entries):
+            self._compact()
+
+    def _drop_dead_top(self):
+        while self._heap and self._heap[0][_JOB] is None:
+            heapq.heappop(self._heap)
+            self._dead -= 1
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if entry[_JOB] is not None]
+        heapq.heapify(self._heap)
+        self._dead = 0
@@ -0,0 +1,309 @@
+"""
+Resource telemetry of running ORCA jobs, sampled from /proc.
+
+ORCA starts mpirun, which starts the orca_* programs of every rank, so the
+Popen of a job only knows the top-level process. TelemetrySampler reads
+/proc/<pid>/stat of every process once per interval, follows the parent
+links down from each job's process to find its whole tree, and sums up CPU
+time, resident memory and threads over the tree; the bytes read from and
+written to storage come from /proc/<pid>/io of the tree's processes. One
+pass over /proc serves all running jobs.
+
+CPU time and I/O are accumulated per process between samples, so what
+exited children used up to their last sample is kept. Where /proc does
+not exist (Windows, macOS) nothing is sampled.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from .logger import logger
+
+PROC_ROOT = '/proc'
+
+# Default seconds between two samples
+DEFAULT_INTERVAL = 5
+
+_CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def read_process_table(proc_root=PROC_ROOT):
+    """
+    Return {pid: (ppid, start_time, cpu_ticks, rss_bytes, threads)} of all processes.
+
+    Processes that exit while /proc is being read are skipped.
+    """
+    table = {}
+    try:
+        entries = os.scandir(proc_root)
+    except OSError:
+        return table
+    with entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(os.path.join(entry.path, 'stat'), 'rb') as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            # The command name may contain spaces and parentheses; fields follow the last ')'
+            fields = stat[stat.rfind(b')') + 2:].split()
+            try:
+                table[int(entry.name)] = (
+                    int(fields[1]),  # ppid
+                    int(fields[19]),  # start time, tells a reused pid apart
+                    int(fields[11]) + int(fields[12]),  # utime + stime
+                    int(fields[21]) * _PAGE_SIZE,  # rss
+                    int(fields[17]),  # threads
+                )
+            except (IndexError, ValueError):
+                continue
+    return table
+
+
+def read_io(pid, proc_root=PROC_ROOT):
+    """Return (read_bytes, write_bytes) of a process from /proc/<pid>/io, or None if unreadable."""
+    values = {}
+    try:
+        with open(os.path.join(proc_root, str(pid), 'io'), 'r') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                values[name] = value
+        return int(values['read_bytes']), int(values['write_bytes'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def process_tree(root_pid, children):
+    """Return root_pid and all its descendants, given {ppid: [pid, ...]}."""
+    tree = [root_pid]
+    for pid in tree:
+        tree.extend(children.get(pid, ()))
+    return tree
+
+
+def format_bytes(value):
+    for unit in ('B', 'kB', 'MB', 'GB'):
+        if value < 1024 or unit == 'GB':
+            return f"{value:.0f} {unit}" if unit == 'B' else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+class JobTelemetry:
+    """
+    Time series and peak values of one job's process tree.
+
+    samples holds (time, cpu_percent, rss_bytes, read_bytes, write_bytes,
+    threads) tuples, read and write bytes being totals since the job
+    started. Once MAX_SAMPLES are stored every second sample is dropped
+    and only every second new one is kept, so a long job keeps a series
+    of its whole run in bounded memory.
+    """
+
+    MAX_SAMPLES = 1024
+
+    def __init__(self, nprocs=1):
+        self.nprocs = nprocs
+        self.samples = deque()
+        self.cpu_percent = None
+        self.rss_bytes = None
+        self.threads = None
+        self.processes = None
+        self.read_bytes = 0
+        self.write_bytes = 0
+        self.peak_cpu_percent = 0.0
+        self.peak_rss_bytes = 0
+        self.peak_threads = 0
+        self.cpu_seconds = 0.0
+        self.started = None
+        self._last_time = None
+        # (pid, start time) -> (cpu ticks, read bytes, write bytes) at the last sample
+        self._last = {}
+        self._stride = 1
+        self._skipped = 0
+
+    def add(self, when, processes):
+        """Record one sample; processes is [(pid, start_time, cpu_ticks, rss_bytes, threads, io)]."""
+        ticks = 0
+        current = {}
+        rss = threads = 0
+        for pid, start_time, cpu_ticks, rss_bytes, thread_count, io in processes:
+            key = (pid, start_time)
+            last_ticks, last_read, last_write = self._last.get(key, (0, 0, 0))
+            ticks += max(cpu_ticks - last_ticks, 0)
+            read, write = io if io is not None else (last_read, last_write)
+            self.read_bytes += max(read - last_read, 0)
+            self.write_bytes += max(write - last_write, 0)
+            current[key] = (cpu_ticks, read, write)
+            rss += rss_bytes
+            threads += thread_count
+        self._last = current
+        self.cpu_seconds += ticks / _CLOCK_TICKS
+        if self._last_time is None:
+            self.started = when
+        elif when > self._last_time:
+            self.cpu_percent = 100.0 * ticks / _CLOCK_TICKS / (when - self._last_time)
+            self.peak_cpu_percent = max(self.peak_cpu_percent, self.cpu_percent)
+        self._last_time = when
+        self.rss_bytes = rss
+        self.threads = threads
+        self.processes = len(processes)
+        self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+        self.peak_threads = max(self.peak_threads, threads)
+        self._append((when, self.cpu_percent or 0.0, rss, self.read_bytes, self.write_bytes, threads))
+
+    def _append(self, sample):
+        self._skipped += 1
+        if self._skipped < self._stride:
+            return
+        self._skipped = 0
+        self.samples.append(sample)
+        if len(self.samples) >= self.MAX_SAMPLES:
+            self.samples = deque(list(self.samples)[::2])
+            self._stride *= 2
+
+    def average_cpu_percent(self):
+        if self.started is None or self._last_time is None or self._last_time <= self.started:
+            return None
+        return 100.0 * self.cpu_seconds / (self._last_time - self.started)
+
+    def summary(self, running=True):
+        """One line for the queue table: current values while running, peaks afterwards."""
+        if running and self.rss_bytes is not None:
+            cpu = f"{self.cpu_percent:.0f}%" if self.cpu_percent is not None else "-"
+            return f"CPU {cpu}, RSS {format_bytes(self.rss_bytes)}"
+        if self.peak_rss_bytes:
+            return f"Peak CPU {self.peak_cpu_percent:.0f}%, RSS {format_bytes(self.peak_rss_bytes)}"
+        return ""
+
+    def details(self, memory_bytes=None, running=True):
+        """Lines for the tooltip: current and peak values, and how well the request was sized."""
+        lines = []
+        if running and self.rss_bytes is not None and self.cpu_percent is not None:
+            lines.append(f"Now: CPU {self.cpu_percent:.0f}%, RSS {format_bytes(self.rss_bytes)}, "
+                         f"{self.threads} threads in {self.processes} processes")
+        lines.append(f"Peak: CPU {self.peak_cpu_percent:.0f}%, RSS {format_bytes(self.peak_rss_bytes)}, "
+                     f"{self.peak_threads} threads")
+        lines.append(f"Storage I/O: {format_bytes(self.read_bytes)} read, {format_bytes(self.write_bytes)} written")
+        average = self.average_cpu_percent()
+        if average is not None:
+            lines.append(f"CPU efficiency: {average / max(self.nprocs, 1):.0f}% of {self.nprocs} requested cores")
+        if memory_bytes and self.peak_rss_bytes:
+            lines.append(f"Peak RSS is {100.0 * self.peak_rss_bytes / memory_bytes:.0f}% "
+                         f"of %maxcore × nprocs ({format_bytes(memory_bytes)})")
+        return lines
+
+    def to_dict(self):
+        """The values worth keeping once the job has finished (the series is not stored)."""
+        return {
+            'nprocs': self.nprocs,
+            'peak_cpu_percent': self.peak_cpu_percent,
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'peak_threads': self.peak_threads,
+            'read_bytes': self.read_bytes,
+            'write_bytes': self.write_bytes,
+            'cpu_seconds': self.cpu_seconds,
+            'started': self.started,
+            'last_time': self._last_time,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        telemetry = cls(data.get('nprocs', 1))
+        telemetry.peak_cpu_percent = data.get('peak_cpu_percent', 0.0)
+        telemetry.peak_rss_bytes = data.get('peak_rss_bytes', 0)
+        telemetry.peak_threads = data.get('peak_threads', 0)
+        telemetry.read_bytes = data.get('read_bytes', 0)
+        telemetry.write_bytes = data.get('write_bytes', 0)
+        telemetry.cpu_seconds = data.get('cpu_seconds', 0.0)
+        telemetry.started = data.get('started')
+        telemetry._last_time = data.get('last_time')
+        return telemetry
+
+
+class TelemetrySampler:
+    """Samples the process trees of running local jobs from one background thread."""
+
+    def __init__(self, interval=DEFAULT_INTERVAL, proc_root=PROC_ROOT):
+        # Seconds between samples; 0 or None turns sampling off
+        self.interval = interval
+        self.proc_root = proc_root
+        self.available = os.path.isdir(os.path.join(proc_root, 'self'))
+        self._jobs = {}  # job id -> (job, root pid)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        if not self.available:
+            logger.info(f"{proc_root} not available; running jobs are not sampled for resource telemetry")
+
+    @property
+    def enabled(self):
+        return self.available and bool(self.interval)
+
+    def set_interval(self, interval):
+        with self._lock:
+            self.interval = interval
+            self._start_thread()
+        self._wakeup.set()
+
+    def track(self, job, pid):
+        """Sample the process tree of job, rooted at pid, until untrack(job)."""
+        if not self.available:
+            return
+        if job.telemetry is None:
+            job.telemetry = JobTelemetry(job.nprocs)
+        with self._lock:
+            self._jobs[job.id] = (job, pid)
+            self._start_thread()
+        self._wakeup.set()  # First sample right away
+
+    def untrack(self, job):
+        """Stop sampling job; its telemetry keeps the values of the last sample."""
+        with self._lock:
+            self._jobs.pop(job.id, None)
+
+    def _start_thread(self):
+        """Start the sampling thread if there is something to sample (caller holds _lock)."""
+        if self._jobs and self.enabled and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+            self._thread.start()
+
+    def _sample_loop(self):
+        while True:
+            with self._lock:
+                tracked = list(self._jobs.values())
+                if not tracked or not self.enabled:
+                    self._thread = None
+                    return
+                interval = self.interval
+            try:
+                self.sample_once(tracked)
+            except Exception as e:
+                logger.error(f"Resource sampling failed: {e}")
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+
+    def sample_once(self, tracked=None):
+        """Take one sample of every tracked job (or of the given [(job, pid)]) from one pass over /proc."""
+        if tracked is None:
+            with self._lock:
+                tracked = list(self._jobs.values())
+        if not tracked:
+            return
+        table = read_process_table(self.proc_root)
+        when = time.time()
+        children = {}
+        for pid, (ppid, *_) in table.items():
+            children.setdefault(ppid, []).append(pid)
+        for job, root in tracked:
+            if job.telemetry is None:
+                continue
+            processes = []
+            for pid in process_tree(root, children) if root in table else ():
+                _, start_time, cpu_ticks, rss_bytes, threads = table[pid]
+                processes.append((pid, start_time, cpu_ticks, rss_bytes, threads, read_io(pid, self.proc_root)))
+            if processes:
+                job.telemetry.add(when, processes)
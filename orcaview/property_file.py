@@ -0,0 +1,240 @@
+"""
+Reader for the structured *.property.txt file ORCA writes next to its output.
+
+The file is a sequence of blocks
+
+    $SCF_Energy
+       &GeometryIndex 1
+       &ListStatus       OUT
+       &SCF_ENERGY [&Type "Double"]      -2.3171300983234500e+02
+    $End
+
+each tagged with the geometry it belongs to (0 for the job as a whole, 1,
+2, ... for the steps of an optimization or scan). Array properties give
+their shape as &Dim(rows,columns) and continue on the following lines,
+either as "element x y z" rows (coordinates) or in ORCA's matrix layout:
+a line of column indices, a blank line and rows that start with the row
+index.
+
+results_from_blocks() reduces the blocks to one row per geometry with the
+energies, dipole moment and thermochemistry that the results store keeps.
+"""
+import math
+import os
+import re
+
+PROPERTY_SUFFIX = '.property.txt'
+
+_PROPERTY_RE = re.compile(r'^&(\w+)\s*(?:\[([^\]]*)\])?\s*(.*)$')
+_TYPE_RE = re.compile(r'&Type\s*"([^"]*)"')
+_DIM_RE = re.compile(r'&Dim\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)')
+_UNITS_RE = re.compile(r'&Units\s*"([^"]*)"')
+
+# Result columns and the (upper-case) property names they are read from; ORCA
+# versions differ in spelling, the first name present in a block wins
+SCF_ENERGY_NAMES = ('SCF_ENERGY',)
+FINAL_ENERGY_NAMES = ('FINALENERGY', 'FINALEN')
+DIPOLE_NAMES = ('DIPOLETOTAL', 'DIPOLE')
+DIPOLE_MAGNITUDE_NAMES = ('DIPOLEMAGNITUDE',)
+THERMOCHEMISTRY_NAMES = {
+    'temperature': ('TEMPERATURE',),
+    'zpe': ('ZPE',),
+    'inner_energy': ('INNERENERGYU', 'INNERENERGY'),
+    'enthalpy': ('ENTHALPYH', 'ENTHALPY'),
+    'entropy': ('ENTROPYS', 'ENTROPY'),
+    'free_energy': ('FREEENERGYG', 'FREEENERGY', 'GIBBSFREEENERGY'),
+}
+
+
+def property_path(input_path):
+    """The property file ORCA writes for input_path."""
+    return os.path.splitext(os.path.abspath(input_path))[0] + PROPERTY_SUFFIX
+
+
+class PropertyBlock:
+    """One $Name ... $End block: its name, geometry index and {property name: value}."""
+
+    def __init__(self, name):
+        self.name = name
+        self.geometry_index = 0
+        self.properties = {}
+        self.units = {}
+
+    def get(self, names):
+        """The value of the first of names (upper case) present in the block, or None."""
+        for name in names:
+            if name in self.properties:
+                return self.properties[name]
+        return None
+
+    def __repr__(self):
+        return f"PropertyBlock({self.name!r}, geometry {self.geometry_index}, {len(self.properties)} properties)"
+
+
+def _scalar(value_type, text):
+    text = text.strip()
+    if value_type == 'String' or text.startswith('"'):
+        return text.strip('"')
+    if value_type == 'Boolean':
+        return text.lower() == 'true'
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _number(token):
+    try:
+        return float(token)
+    except ValueError:
+        return token
+
+
+def _read_array(lines, index, rows, columns, value_type):
+    """Read an array property starting at lines[index]; return (values as a list of rows, next index)."""
+    if value_type == 'Coordinates':
+        table = []
+        while len(table) < rows and index < len(lines):
+            tokens = lines[index].split()
+            if not tokens or tokens[0].startswith(('&', '$')):
+                break
+            table.append([tokens[0]] + [_number(token) for token in tokens[1:]])
+            index += 1
+        return table, index
+    table = [[None] * columns for _ in range(rows)]
+    # Columns come in groups: a line of column indices, then one line per row
+    read_columns = 0
+    while read_columns < columns and index < len(lines):
+        tokens = lines[index].split()
+        if not tokens or not all(token.isdigit() for token in tokens):
+            break
+        group = [int(token) for token in tokens]
+        index += 1
+        # ORCA leaves a blank line between the column indices and the rows
+        while index < len(lines) and not lines[index].strip():
+            index += 1
+        for _ in range(rows):
+            tokens = lines[index].split() if index < len(lines) else None
+            if not tokens or not tokens[0].isdigit():
+                break
+            index += 1
+            row = int(tokens[0])
+            for column, token in zip(group, tokens[1:]):
+                if row < rows and column < columns:
+                    table[row][column] = _number(token)
+        read_columns += len(group)
+    return table, index
+
+
+def parse_property_text(text):
+    """Return the PropertyBlocks of the contents of a property file, in file order."""
+    blocks = []
+    block = None
+    lines = text.splitlines()
+    index = 0
+    while index < len(lines):
+        line = lines[index].strip()
+        index += 1
+        if line.startswith('$'):
+            name = line[1:].strip()
+            if name.lower() == 'end':
+                block = None
+            else:
+                block = PropertyBlock(name)
+                blocks.append(block)
+            continue
+        if block is None or not line.startswith('&'):
+            continue
+        match = _PROPERTY_RE.match(line)
+        if not match:
+            continue
+        name, attributes, rest = match.group(1), match.group(2) or '', match.group(3)
+        value_type = _TYPE_RE.search(attributes)
+        value_type = value_type.group(1) if value_type else None
+        units = _UNITS_RE.search(attributes)
+        dim = _DIM_RE.search(attributes)
+        if dim:
+            value, index = _read_array(lines, index, int(dim.group(1)), int(dim.group(2)), value_type)
+        else:
+            value = _scalar(value_type, rest)
+        if name == 'GeometryIndex' and isinstance(value, int):
+            block.geometry_index = value
+        block.properties[name.upper()] = value
+        if units:
+            block.units[name.upper()] = units.group(1)
+    return blocks
+
+
+def parse_property_file(path):
+    """Return the PropertyBlocks of a property file."""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return parse_property_text(f.read())
+
+
+def _float(value):
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+
+
+def results_from_blocks(blocks):
+    """
+    Reduce property blocks to (status, version, rows).
+
+    status and version come from $Calculation_Status. rows holds one dict per
+    geometry, ordered by geometry index, with the geometry_index, atoms,
+    scf_energy, final_energy, dipole_x/y/z, dipole_magnitude and the
+    THERMOCHEMISTRY_NAMES columns; values a geometry lacks are NaN (-1 for
+    atoms). Where several blocks give the same value for a geometry (the
+    dipole of the SCF and of a correlated density, say) the last one wins.
+    """
+    status = version = ''
+    geometries = {}
+    for block in blocks:
+        upper_name = block.name.upper()
+        if upper_name == 'CALCULATION_STATUS':
+            status = str(block.properties.get('STATUS', status))
+            version = str(block.properties.get('VERSION', version))
+            continue
+        if block.geometry_index <= 0:
+            continue
+        row = geometries.get(block.geometry_index)
+        if row is None:
+            row = geometries[block.geometry_index] = {
+                'geometry_index': block.geometry_index, 'atoms': -1,
+                'scf_energy': math.nan, 'final_energy': math.nan,
+                'dipole_x': math.nan, 'dipole_y': math.nan, 'dipole_z': math.nan, 'dipole_magnitude': math.nan,
+            }
+            row.update({column: math.nan for column in THERMOCHEMISTRY_NAMES})
+        if upper_name == 'GEOMETRY':
+            atoms = block.get(('NATOMS',))
+            if isinstance(atoms, int):
+                row['atoms'] = atoms
+        elif upper_name.endswith('DIPOLE_MOMENT'):
+            dipole = block.get(DIPOLE_NAMES)
+            if isinstance(dipole, list) and len(dipole) == 3:
+                row['dipole_x'], row['dipole_y'], row['dipole_z'] = (_float(value[0]) for value in dipole)
+            magnitude = block.get(DIPOLE_MAGNITUDE_NAMES)
+            if magnitude is not None:
+                row['dipole_magnitude'] = _float(magnitude)
+        elif upper_name.startswith('THERMOCHEMISTRY'):
+            for column, names in THERMOCHEMISTRY_NAMES.items():
+                value = block.get(names)
+                if value is not None:
+                    row[column] = _float(value)
+        else:
+            scf_energy = block.get(SCF_ENERGY_NAMES)
+            if scf_energy is not None:
+                row['scf_energy'] = _float(scf_energy)
+            final_energy = block.get(FINAL_ENERGY_NAMES)
+            if final_energy is not None:
+                row['final_energy'] = _float(final_energy)
+    rows = [geometries[index] for index in sorted(geometries)]
+    for row in rows:
+        if math.isnan(row['final_energy']):
+            row['final_energy'] = row['scf_energy']
+        if math.isnan(row['dipole_magnitude']) and not math.isnan(row['dipole_x']):
+            row['dipole_magnitude'] = math.sqrt(row['dipole_x'] ** 2 + row['dipole_y'] ** 2 + row['dipole_z'] ** 2)
+    return status, version, rows
@@ -0,0 +1,228 @@
+"""
+Content-addressed cache of finished ORCA results.
+
+Every job gets a fingerprint of what determines its result: the simple
+input keywords, the input blocks and the coordinates rounded to a fixed
+tolerance. Settings that only affect how a job runs (%pal, %maxcore,
+MORead/%moinp) are left out, as is formatting such as keyword order, case
+and whitespace. Successful results are stored under
+~/.orcaview/result_cache/<fp[:2]>/<fp>/; a job with a known fingerprint is
+completed by copying the stored output instead of running ORCA again.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+from .input_parser import strip_comments
+from .logger import logger
+from .scratch import COPY_BACK_SUFFIXES
+
+CACHE_DIR = Path.home() / '.orcaview' / 'result_cache'
+
+# Coordinates are compared after rounding to this many decimals (Angstrom)
+COORDINATE_DECIMALS = 4
+
+# Keywords and blocks that do not change the result
+_IGNORED_KEYWORD_RE = re.compile(r'^(PAL\d+|MOREAD|AUTOSTART|NOAUTOSTART|MINIPRINT|SMALLPRINT|NORMALPRINT|LARGEPRINT)$')
+_IGNORED_BLOCKS = {'pal', 'maxcore', 'moinp'}
+
+_COORDINATE_HEADER_RE = re.compile(r'^\s*\*\s*(xyz|int|internal|gzmt)\s+(-?\d+)\s+(\d+)\s*$', re.IGNORECASE)
+_COORDINATE_FILE_RE = re.compile(r'^\s*\*\s*(xyzfile|gzmtfile)\s+(-?\d+)\s+(\d+)\s+(\S+)', re.IGNORECASE)
+
+OUTPUT_NAME = 'result.out'
+META_NAME = 'meta.json'
+
+
+def _round(value):
+    rounded = round(float(value), COORDINATE_DECIMALS)
+    return f"{rounded + 0.0:.{COORDINATE_DECIMALS}f}"  # + 0.0 turns -0.0 into 0.0
+
+
+def _canonical_coordinate_line(line):
+    tokens = line.split()
+    if not tokens:
+        return None
+    values = []
+    for token in tokens[1:]:
+        try:
+            values.append(_round(token))
+        except ValueError:
+            values.append(token.lower())
+    return ' '.join([tokens[0].capitalize()] + values)
+
+
+def _xyz_file_lines(path):
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        lines = f.read().splitlines()
+    count = int(lines[0].split()[0])
+    return [_canonical_coordinate_line(line) for line in lines[2:2 + count]]
+
+
+def canonical_input(text, base_dir=None):
+    """
+    Return the canonical form of an ORCA input as a JSON-serializable dict.
+
+    base_dir is used to resolve '* xyzfile' references; their coordinates
+    are included instead of the file name.
+    """
+    keywords = set()
+    blocks = {}
+    coordinates = None
+    # Anything not understood is kept verbatim, so differing inputs never collide
+    other = []
+    lines = strip_comments(text).splitlines()
+    index = 0
+    while index < len(lines):
+        line = lines[index].strip()
+        index += 1
+        if not line:
+            continue
+        if line.startswith('!'):
+            for token in line[1:].split():
+                token = token.upper()
+                if not _IGNORED_KEYWORD_RE.match(token):
+                    keywords.add(token)
+        elif line.startswith('%'):
+            name, _, rest = line[1:].partition(' ')
+            name = name.lower()
+            content = [rest.strip()] if rest.strip() else []
+            if name == 'maxcore':
+                if not content:
+                    # The value may be on the next line
+                    while index < len(lines) and not lines[index].strip():
+                        index += 1
+                    index += 1
+            elif not re.search(r'\bend\s*$', line, re.IGNORECASE):
+                # Multi-line block: collect until its closing 'end'
+                while index < len(lines):
+                    block_line = lines[index].strip()
+                    index += 1
+                    if block_line.lower() == 'end':
+                        break
+                    if block_line:
+                        content.append(block_line)
+            if name not in _IGNORED_BLOCKS:
+                normalized = [' '.join(part.lower().split()) for part in content]
+                blocks[name] = blocks.get(name, []) + normalized
+        elif _COORDINATE_HEADER_RE.match(line):
+            match = _COORDINATE_HEADER_RE.match(line)
+            atoms = []
+            while index < len(lines):
+                coordinate_line = lines[index].strip()
+                index += 1
+                if coordinate_line.startswith('*'):
+                    break
+                canonical = _canonical_coordinate_line(coordinate_line)
+                if canonical:
+                    atoms.append(canonical)
+            coordinates = {'type': match.group(1).lower(), 'charge': int(match.group(2)),
+                           'multiplicity': int(match.group(3)), 'atoms': atoms}
+        elif _COORDINATE_FILE_RE.match(line):
+            match = _COORDINATE_FILE_RE.match(line)
+            name = match.group(4).strip('"')
+            path = os.path.join(base_dir or '', name)
+            try:
+                atoms = _xyz_file_lines(path)
+            except (OSError, ValueError, IndexError):
+                atoms = [f"unreadable:{name}"]
+            coordinates = {'type': 'xyz', 'charge': int(match.group(2)),
+                           'multiplicity': int(match.group(3)), 'atoms': atoms}
+        else:
+            other.append(' '.join(line.lower().split()))
+    return {
+        'keywords': sorted(keywords),
+        'blocks': {name: blocks[name] for name in sorted(blocks)},
+        'coordinates': coordinates,
+        'other': other,
+    }
+
+
+def fingerprint_input(text, base_dir=None):
+    """SHA-256 hex digest of the canonical form of an input."""
+    canonical = json.dumps(canonical_input(text, base_dir), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def fingerprint_file(input_path):
+    with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+        text = f.read()
+    return fingerprint_input(text, os.path.dirname(os.path.abspath(input_path)))
+
+
+class ResultCache:
+    """On-disk store of successful results keyed by input fingerprint."""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _entry_dir(self, fingerprint):
+        return self.cache_dir / fingerprint[:2] / fingerprint
+
+    def lookup(self, fingerprint):
+        """Return the metadata of a cached result, or None."""
+        entry = self._entry_dir(fingerprint)
+        try:
+            with open(entry / META_NAME, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not (entry / OUTPUT_NAME).is_file():
+            return None
+        return meta
+
+    def store(self, fingerprint, job, replace=False):
+        """Store a finished job's output and artefacts under its fingerprint."""
+        entry = self._entry_dir(fingerprint)
+        if entry.exists():
+            if not replace:
+                return
+            shutil.rmtree(entry, ignore_errors=True)
+        tmp_entry = entry.with_name(f"{fingerprint}.tmp{os.getpid()}")
+        try:
+            tmp_entry.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(job.output_path, tmp_entry / OUTPUT_NAME)
+            artefacts = []
+            stem = os.path.splitext(os.path.abspath(job.input_path))[0]
+            for suffix in COPY_BACK_SUFFIXES:
+                source = stem + suffix
+                if suffix != '.out' and os.path.isfile(source):
+                    shutil.copy2(source, tmp_entry / ('result' + suffix))
+                    artefacts.append(suffix)
+            meta = {
+                'fingerprint': fingerprint,
+                'input_path': job.input_path,
+                'output_path': job.output_path,
+                'finished_time': job.finished_time,
+                'outcome': job.outcome.to_dict() if job.outcome else None,
+                'artefacts': artefacts,
+                'stored_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            with open(tmp_entry / META_NAME, 'w') as f:
+                json.dump(meta, f, indent=2)
+            # Publish the entry atomically; a concurrent writer of the same result wins harmlessly
+            os.replace(tmp_entry, entry)
+            logger.info(f"Cached result of {job.input_path} as {fingerprint[:12]}")
+        except OSError as e:
+            logger.warning(f"Could not cache result of {job.input_path}: {e}")
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+
+    def restore(self, fingerprint, job):
+        """Copy a cached result to the job's output path and next to its input. Returns the metadata."""
+        meta = self.lookup(fingerprint)
+        if meta is None:
+            return None
+        entry = self._entry_dir(fingerprint)
+        output_dir = os.path.dirname(os.path.abspath(job.output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        shutil.copy2(entry / OUTPUT_NAME, job.output_path)
+        stem = os.path.splitext(os.path.abspath(job.input_path))[0]
+        for suffix in meta.get('artefacts', []):
+            try:
+                shutil.copy2(entry / ('result' + suffix), stem + suffix)
+            except OSError as e:
+                logger.warning(f"Could not restore cached {suffix} for {job.input_path}: {e}")
+        return meta
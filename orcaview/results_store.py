@@ -0,0 +1,221 @@
+"""
+Columnar store of the results of finished jobs, read from their property files.
+
+Every finished job contributes one row per geometry (see
+property_file.results_from_blocks) with its energies, dipole moment,
+thermochemistry and status. Rows are appended as small segment files
+under ~/.orcaview/results/, each an .npz with one NumPy array per column;
+once there are more than MAX_SEGMENTS of them they are merged into one.
+ResultsStore.table() loads all segments into a ResultsTable of column
+arrays, so aggregate queries over thousands of jobs are NumPy operations
+on arrays in memory instead of parsing text again.
+
+A job that is recorded again (it was rerun) replaces its earlier rows: of
+the rows with the same job id only those of the newest segment are kept.
+"""
+import itertools
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .logger import logger
+from .property_file import THERMOCHEMISTRY_NAMES, parse_property_file, property_path, results_from_blocks
+
+RESULTS_DIR = Path.home() / '.orcaview' / 'results'
+
+# More segments than this are merged into one on the next append
+MAX_SEGMENTS = 32
+
+# Column name -> dtype; strings are stored as fixed-width unicode
+COLUMNS = {
+    'job_id': np.str_,
+    'input_path': np.str_,
+    'job_status': np.str_,  # ORCAView's status (Done, Error, ...)
+    'orca_status': np.str_,  # The status ORCA wrote to $Calculation_Status
+    'orca_version': np.str_,
+    'finished': np.float64,  # Seconds since the epoch, NaN if unknown
+    'geometry_index': np.int32,
+    'atoms': np.int32,
+    'scf_energy': np.float64,
+    'final_energy': np.float64,
+    'dipole_x': np.float64,
+    'dipole_y': np.float64,
+    'dipole_z': np.float64,
+    'dipole_magnitude': np.float64,
+}
+COLUMNS.update({column: np.float64 for column in THERMOCHEMISTRY_NAMES})
+
+_SEGMENT_SUFFIX = '.npz'
+
+
+def _empty_columns():
+    return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+
+def _latest_mask(keys, order):
+    """Mask of the rows whose order is the largest among the rows with the same key."""
+    if not len(keys):
+        return np.zeros(0, dtype=bool)
+    _, inverse = np.unique(keys, return_inverse=True)
+    latest = np.full(inverse.max() + 1, np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(latest, inverse, order)
+    return order == latest[inverse]
+
+
+class ResultsTable:
+    """
+    The stored results as NumPy column arrays of equal length.
+
+    table['final_energy'] is a column; where() selects rows by a boolean
+    mask, e.g. table.where(table['job_status'] == 'Done').
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns['job_id'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def where(self, mask):
+        return ResultsTable({name: values[mask] for name, values in self.columns.items()})
+
+    def final_geometries(self):
+        """One row per job: its last geometry (the optimized structure, the last scan point)."""
+        return self.where(_latest_mask(self.columns['job_id'], self.columns['geometry_index'].astype(np.int64)))
+
+    def job(self, job_id):
+        return self.where(self.columns['job_id'] == job_id)
+
+
+class ResultsStore:
+    """Append-only segments of result rows, loaded into one ResultsTable on demand."""
+
+    def __init__(self, store_dir=RESULTS_DIR):
+        self.store_dir = Path(store_dir)
+        self._lock = threading.Lock()
+        # Segment names the cached table was loaded from; another process may add segments
+        self._loaded_segments = None
+        self._table = None
+        self._sequence = itertools.count()
+
+    def _segments(self):
+        try:
+            return sorted(name for name in os.listdir(self.store_dir) if name.endswith(_SEGMENT_SUFFIX))
+        except OSError:
+            return []
+
+    def add_job(self, job):
+        """Record the results in a finished job's property file; jobs without one are skipped."""
+        path = property_path(job.input_path)
+        if not os.path.isfile(path):
+            return 0
+        try:
+            status, version, rows = results_from_blocks(parse_property_file(path))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read the results of {job.input_path} from {path}: {e}")
+            return 0
+        try:
+            finished = time.mktime(time.strptime(job.finished_time, '%Y-%m-%d %H:%M:%S'))
+        except (TypeError, ValueError):
+            finished = np.nan
+        status_value = getattr(job.status, 'value', job.status)
+        return self.add(job.id, job.input_path, str(status_value or ''), status, version, finished, rows)
+
+    def add(self, job_id, input_path, job_status, orca_status, orca_version, finished, rows):
+        """Append a job's rows (dicts from results_from_blocks) as a new segment; returns the row count."""
+        return self.add_many([(job_id, input_path, job_status, orca_status, orca_version, finished, rows)])
+
+    def add_many(self, entries):
+        """Append the rows of several jobs, each an argument tuple of add(), as one segment."""
+        parts = [self._job_columns(*entry) for entry in entries if entry[-1]]
+        if not parts:
+            return 0
+        columns = {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+        with self._lock:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            self._write_segment(columns)
+            if len(self._segments()) > MAX_SEGMENTS:
+                self._compact()
+        return len(columns['job_id'])
+
+    @staticmethod
+    def _job_columns(job_id, input_path, job_status, orca_status, orca_version, finished, rows):
+        count = len(rows)
+        columns = {
+            'job_id': np.full(count, job_id),
+            'input_path': np.full(count, input_path),
+            'job_status': np.full(count, job_status),
+            'orca_status': np.full(count, orca_status),
+            'orca_version': np.full(count, orca_version),
+            'finished': np.full(count, finished, dtype=np.float64),
+        }
+        for name, dtype in COLUMNS.items():
+            if name not in columns:
+                columns[name] = np.array([row[name] for row in rows], dtype=dtype)
+        return columns
+
+    def _write_segment(self, columns):
+        # Names sort by creation time; the pid keeps two processes' segments apart
+        # and the sequence number segments written within one clock tick
+        name = f"{time.time_ns():020d}-{os.getpid()}-{next(self._sequence):08d}"
+        tmp_path = self.store_dir / f"{name}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **columns)
+        os.replace(tmp_path, self.store_dir / (name + _SEGMENT_SUFFIX))
+        return name + _SEGMENT_SUFFIX
+
+    def _load(self, segments):
+        """Concatenate segments, keeping only the newest rows of each job."""
+        parts, order = [], []
+        for number, name in enumerate(segments):
+            try:
+                with np.load(self.store_dir / name, allow_pickle=False) as data:
+                    part = {column: data[column] if column in data.files else None for column in COLUMNS}
+            except (OSError, ValueError) as e:
+                # A concurrent compaction may have merged it away; its rows are in the merged segment
+                logger.debug(f"Skipping results segment {name}: {e}")
+                continue
+            length = len(part['job_id'])
+            for column, dtype in COLUMNS.items():
+                if part[column] is None:
+                    # Written before the column existed
+                    part[column] = np.full(length, '' if dtype is np.str_ else -1 if dtype is np.int32 else np.nan,
+                                           dtype=dtype)
+            parts.append(part)
+            order.append(np.full(length, number, dtype=np.int64))
+        if not parts:
+            return _empty_columns()
+        columns = {column: np.concatenate([part[column] for part in parts]) for column in COLUMNS}
+        mask = _latest_mask(columns['job_id'], np.concatenate(order))
+        if not mask.all():
+            columns = {column: values[mask] for column, values in columns.items()}
+        return columns
+
+    def _compact(self):
+        """Merge all segments into one (caller holds _lock)."""
+        segments = self._segments()
+        columns = self._load(segments)
+        merged = self._write_segment(columns)
+        for name in segments:
+            try:
+                os.remove(self.store_dir / name)
+            except OSError:
+                pass
+        self._table = ResultsTable(columns)
+        self._loaded_segments = [merged]
+        logger.info(f"Merged {len(segments)} results segments ({len(self._table)} rows)")
+
+    def table(self):
+        """All stored results as a ResultsTable; reloaded only when segments were added since."""
+        with self._lock:
+            segments = self._segments()
+            if self._table is None or segments != self._loaded_segments:
+                self._table = ResultsTable(self._load(segments))
+                self._loaded_segments = segments
+            return self._table
@@ -0,0 +1,198 @@
+"""
+Run time prediction for queued jobs, learned from finished ones.
+
+Each job is described by features read from its input: the method, the
+basis set, the job type, the number of atoms and electrons and the number
+of processes. RuntimeModel fits the logarithm of the wall time as a linear
+function of
+
+- log(electrons), log(atoms) and log(nprocs), which captures the power-law
+  scaling of the cost with system size and the parallel speed-up, and
+- one offset per method, basis set and job type seen so far.
+
+The fit is a ridge regression over the normal equations, which are
+accumulated one finished job at a time, so learning from a new job and
+refitting cost the same however many jobs have finished. Features the
+model has not seen yet contribute nothing; until MIN_OBSERVATIONS jobs
+have finished there is no prediction at all.
+"""
+import math
+import os
+import threading
+
+from . import config
+from .input_parser import keyword_lines, parse_molecule, read_xyz_elements
+from .logger import logger
+
+_ELEMENTS = (
+    'H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn Ga Ge As Se Br Kr '
+    'Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb '
+    'Lu Hf Ta W Re Os Ir Pt Au Hg Tl Pb Bi Po At Rn Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm Md No Lr '
+    'Rf Db Sg Bh Hs Mt Ds Rg Cn Nh Fl Mc Lv Ts Og'
+).split()
+ATOMIC_NUMBERS = {symbol: number for number, symbol in enumerate(_ELEMENTS, start=1)}
+
+_METHODS = {name.upper() for names in config.DFT_FUNCTIONALS.values() for name in names}
+_METHODS |= {name.upper() for name in config.SEMIEMPIRICAL_METHODS.values()}
+_METHODS |= {name.upper() for name in config.XTB_METHODS.values()}
+_METHODS |= {'HF', 'RHF', 'UHF', 'ROHF', 'XTB', 'XTB0', 'XTB1', 'XTB2', 'MP2', 'RI-MP2', 'DLPNO-MP2', 'CCSD',
+             'CCSD(T)', 'DLPNO-CCSD', 'DLPNO-CCSD(T)', 'DLPNO-CCSD(T1)', 'CASSCF', 'NEVPT2', 'HF-3C'}
+_BASIS_SETS = {name.upper() for names in config.BASIS_SETS.values() for name in names}
+
+# Job-type keywords; an input with several is typed by the first match
+_JOB_TYPES = (
+    ('GOAT', {'GOAT'}),
+    ('NEB', {'NEB', 'NEB-TS', 'NEB-CI', 'ZOOM-NEB', 'ZOOM-NEB-TS'}),
+    ('IRC', {'IRC'}),
+    ('MD', {'MD'}),
+    ('OptTS', {'OPTTS'}),
+)
+_OPT_KEYWORDS = {'OPT', 'COPT', 'ZOPT', 'GDIISOPT', 'LOOSEOPT', 'TIGHTOPT', 'VERYTIGHTOPT'}
+_FREQ_KEYWORDS = {'FREQ', 'NUMFREQ', 'ANFREQ'}
+
+
+def _job_type(tokens):
+    for name, keywords in _JOB_TYPES:
+        if tokens & keywords:
+            return name
+    opt, freq = bool(tokens & _OPT_KEYWORDS), bool(tokens & _FREQ_KEYWORDS)
+    if opt:
+        return 'Opt+Freq' if freq else 'Opt'
+    return 'Freq' if freq else 'SP'
+
+
+def runtime_features(text, input_path=None):
+    """
+    Return the features of an ORCA input that drive its run time, or None without coordinates.
+
+    The result is a plain dict (stored with the job): method, basis, job_type,
+    atoms and electrons. Coordinates in an '* xyzfile' are read relative to
+    input_path's directory.
+    """
+    molecule = parse_molecule(text)
+    if molecule is None:
+        return None
+    charge, _, elements, xyz_file = molecule
+    if elements is None:
+        if input_path is None:
+            return None
+        try:
+            elements = read_xyz_elements(os.path.join(os.path.dirname(os.path.abspath(input_path)), xyz_file))
+        except (OSError, ValueError, IndexError):
+            return None
+    if not elements:
+        return None
+    tokens = {token.upper() for token in keyword_lines(text)}
+    method = next((token for token in sorted(tokens) if token in _METHODS), None)
+    basis = next((token for token in sorted(tokens) if token in _BASIS_SETS), None)
+    return {
+        'method': method,
+        'basis': basis,
+        'job_type': _job_type(tokens),
+        'atoms': len(elements),
+        'electrons': max(sum(ATOMIC_NUMBERS.get(element, 0) for element in elements) - charge, 1),
+    }
+
+
+def _vector(features, nprocs):
+    """The model's inputs as {name: value}, categorical features as one-hot names."""
+    vector = {
+        'bias': 1.0,
+        'log_electrons': math.log(max(features.get('electrons') or 1, 1)),
+        'log_atoms': math.log(max(features.get('atoms') or 1, 1)),
+        'log_nprocs': math.log(max(nprocs or 1, 1)),
+    }
+    for name in ('method', 'basis', 'job_type'):
+        if features.get(name):
+            vector[f'{name}:{features[name]}'] = 1.0
+    return vector
+
+
+def _solve(matrix, rhs):
+    """Solve matrix @ x = rhs by Gaussian elimination with partial pivoting; None if singular."""
+    size = len(rhs)
+    rows = [list(matrix[i]) + [rhs[i]] for i in range(size)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda r: abs(rows[r][column]))
+        if abs(rows[pivot][column]) < 1e-12:
+            return None
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        pivot_row = rows[column]
+        for r in range(column + 1, size):
+            factor = rows[r][column] / pivot_row[column]
+            if factor:
+                row = rows[r]
+                for c in range(column, size + 1):
+                    row[c] -= factor * pivot_row[c]
+    solution = [0.0] * size
+    for r in range(size - 1, -1, -1):
+        total = rows[r][size] - sum(rows[r][c] * solution[c] for c in range(r + 1, size))
+        solution[r] = total / rows[r][r]
+    return solution
+
+
+class RuntimeModel:
+    """Predicts a job's wall time in seconds from its runtime_features and nprocs."""
+
+    MIN_OBSERVATIONS = 3
+    # Ridge penalty: the offsets of rarely seen methods, basis sets and job
+    # types shrink towards 0 until enough jobs back them up
+    RIDGE = 1.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._xtx = {}  # (name, name) -> sum of products
+        self._xty = {}  # name -> sum of value x log(seconds)
+        self.observations = 0
+        self._weights = None
+        # Incremented whenever the fit changes, so cached predictions can be refreshed
+        self.version = 0
+
+    def observe(self, features, nprocs, seconds):
+        """Learn from a finished job that ran for seconds."""
+        if not features or seconds is None or seconds <= 0:
+            return
+        vector = _vector(features, nprocs)
+        target = math.log(max(seconds, 1.0))
+        with self._lock:
+            for name, value in vector.items():
+                self._xty[name] = self._xty.get(name, 0.0) + value * target
+                for other, other_value in vector.items():
+                    key = (name, other)
+                    self._xtx[key] = self._xtx.get(key, 0.0) + value * other_value
+            self.observations += 1
+            self._weights = None
+            self.version += 1
+
+    def predict(self, features, nprocs):
+        """Return the predicted wall time in seconds, or None when the model cannot tell yet."""
+        if not features:
+            return None
+        with self._lock:
+            if self.observations < self.MIN_OBSERVATIONS:
+                return None
+            if self._weights is None:
+                self._weights = self._fit()
+            weights = self._weights
+        if not weights:
+            return None
+        vector = _vector(features, nprocs)
+        log_seconds = sum(weights.get(name, 0.0) * value for name, value in vector.items())
+        # Never trust an extrapolation beyond a month
+        return math.exp(min(log_seconds, math.log(30 * 86400)))
+
+    def _fit(self):
+        """Solve the ridge normal equations (caller holds the lock); {} if they cannot be solved."""
+        names = sorted(self._xty)
+        index = {name: i for i, name in enumerate(names)}
+        matrix = [[0.0] * len(names) for _ in names]
+        for (name, other), value in self._xtx.items():
+            matrix[index[name]][index[other]] = value
+        for name in names:
+            if name != 'bias':
+                matrix[index[name]][index[name]] += self.RIDGE
+        solution = _solve(matrix, [self._xty[name] for name in names])
+        if solution is None:
+            logger.warning("Run time model could not be fitted")
+            return {}
+        return dict(zip(names, solution))
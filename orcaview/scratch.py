@@ -0,0 +1,122 @@
+"""
+Per-job scratch directories for running ORCA on fast local storage.
+
+ORCA writes many large temporary files (integrals, DIIS vectors, grids)
+next to its input. When a scratch root is configured, each job runs in its
+own directory under that root (tmpfs, local NVMe, ...): the input and the
+files it references are copied in, ORCA runs there, and afterwards only the
+useful artefacts are copied back next to the input before the scratch
+directory is purged.
+"""
+import os
+import re
+import shutil
+
+from .logger import logger
+
+# Artefacts worth keeping; everything else in the scratch directory is purged
+COPY_BACK_SUFFIXES = ('.out', '.gbw', '.property.txt', '_trj.xyz', '.hess', '.xyz')
+
+# Auxiliary files an input may reference by name (%moinp, xyzfile, NEB end points, ...)
+_REFERENCED_FILE_RE = re.compile(r'"([^"]+)"|(\S+\.(?:gbw|xyz|hess|inp|allxyz|pc|bas))\b', re.IGNORECASE)
+
+
+def directory_usage(path):
+    """Total size in bytes of the regular files below path."""
+    total = 0
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                total += directory_usage(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue  # ORCA deletes temporary files while we look
+    return total
+
+
+class ScratchDirectory:
+    """The scratch directory of one job and its staging/copy-back steps."""
+
+    def __init__(self, root, job):
+        self.job = job
+        self.path = os.path.join(root, f"orcaview-{job.id[:12]}")
+        self.source_dir = os.path.dirname(os.path.abspath(job.input_path))
+        self.input_file = os.path.join(self.path, os.path.basename(job.input_path))
+        self.peak_bytes = 0
+
+    def stage(self):
+        """Create the directory and copy the input and the files it references into it."""
+        os.makedirs(self.path, exist_ok=True)
+        shutil.copy2(os.path.abspath(self.job.input_path), self.input_file)
+        for name in self._referenced_files():
+            source = os.path.join(self.source_dir, name)
+            target = os.path.join(self.path, name)
+            if os.path.abspath(source) == os.path.abspath(self.job.input_path):
+                continue
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(source, target)
+            except OSError as e:
+                logger.warning(f"Could not stage {source} into scratch: {e}")
+        logger.info(f"Staged {self.job.input_path} into scratch directory {self.path}")
+        return self.input_file
+
+    def _referenced_files(self):
+        """Relative paths named in the input that exist next to it."""
+        try:
+            with open(self.input_file, 'r', encoding='utf-8', errors='ignore') as f:
+                text = f.read()
+        except OSError:
+            return []
+        names = []
+        for match in _REFERENCED_FILE_RE.finditer(text):
+            name = match.group(1) or match.group(2)
+            if os.path.isabs(name) or '..' in name.replace('\\', '/').split('/'):
+                continue
+            if os.path.isfile(os.path.join(self.source_dir, name)) and name not in names:
+                names.append(name)
+        return names
+
+    def sample_usage(self):
+        """Measure the current size of the directory and remember the peak."""
+        usage = directory_usage(self.path)
+        self.peak_bytes = max(self.peak_bytes, usage)
+        return usage
+
+    def copy_back(self):
+        """Copy the useful artefacts next to the input; return the copied file names."""
+        output_path = os.path.abspath(self.job.output_path)
+        input_name = os.path.basename(self.input_file)
+        copied = []
+        try:
+            entries = list(os.scandir(self.path))
+        except OSError as e:
+            logger.error(f"Could not list scratch directory {self.path}: {e}")
+            return copied
+        for entry in entries:
+            name = entry.name
+            if name == input_name or not entry.is_file() or not name.endswith(COPY_BACK_SUFFIXES):
+                continue
+            target = os.path.join(self.source_dir, name)
+            if os.path.abspath(target) == output_path:
+                continue  # ORCA's stdout already goes straight to the output file
+            shutil.copy2(entry.path, target)
+            copied.append(name)
+        return copied
+
+    def finish(self):
+        """Copy artefacts back and purge the directory. The directory is kept if copying fails."""
+        self.sample_usage()
+        try:
+            copied = self.copy_back()
+        except OSError as e:
+            logger.error(f"Copy-back from {self.path} failed, keeping the scratch directory: {e}")
+            return False
+        logger.info(f"Copied back {', '.join(copied) or 'no files'} from {self.path}")
+        shutil.rmtree(self.path, ignore_errors=True)
+        return True
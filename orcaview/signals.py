@@ -9,3 +9,5 @@ class AppSignals(QObject):
     input_generated = pyqtSignal(str)
     job_submitted = pyqtSignal(str, str)
     view_3d_requested = pyqtSignal(object)
+    # Emitted from queue worker threads; connect with a queued connection
+    job_queue_updated = pyqtSignal()
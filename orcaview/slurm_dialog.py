@@ -0,0 +1,66 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QFormLayout, QLineEdit, QPlainTextEdit, QSpinBox, QDialogButtonBox, QLabel
+)
+
+from .executors import SlurmExecutor
+
+
+def slurm_executor_from_settings(settings):
+    """Build the Slurm executor from the values saved by SlurmSettingsDialog."""
+    return SlurmExecutor(
+        orca_path=settings.value("slurm_orca_path", ""),
+        partition=settings.value("slurm_partition", ""),
+        time_limit=settings.value("slurm_time_limit", ""),
+        account=settings.value("slurm_account", ""),
+        setup_commands=(settings.value("slurm_setup_commands", "") or "").splitlines(),
+        commands_dir=settings.value("slurm_commands_dir", ""),
+        poll_interval=int(settings.value("slurm_poll_interval", 30) or 30),
+    )
+
+
+class SlurmSettingsDialog(QDialog):
+    """Edit how jobs are submitted to a Slurm cluster."""
+
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Slurm Settings")
+        self.settings = settings
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Input directories must be visible on the cluster under the same path."))
+        form = QFormLayout()
+        self.partition_input = QLineEdit(settings.value("slurm_partition", ""))
+        form.addRow("Partition:", self.partition_input)
+        self.time_limit_input = QLineEdit(settings.value("slurm_time_limit", ""))
+        self.time_limit_input.setPlaceholderText("e.g. 1-00:00:00; empty uses the partition default")
+        form.addRow("Time limit:", self.time_limit_input)
+        self.account_input = QLineEdit(settings.value("slurm_account", ""))
+        form.addRow("Account:", self.account_input)
+        self.orca_path_input = QLineEdit(settings.value("slurm_orca_path", ""))
+        self.orca_path_input.setPlaceholderText("Empty uses the local ORCA path")
+        form.addRow("ORCA on the cluster:", self.orca_path_input)
+        self.setup_input = QPlainTextEdit(settings.value("slurm_setup_commands", ""))
+        self.setup_input.setPlaceholderText("module load orca/6.0.1")
+        form.addRow("Setup commands:", self.setup_input)
+        self.commands_dir_input = QLineEdit(settings.value("slurm_commands_dir", ""))
+        self.commands_dir_input.setPlaceholderText("Directory of sbatch/squeue/scancel; empty uses PATH")
+        form.addRow("Slurm commands:", self.commands_dir_input)
+        self.poll_interval_input = QSpinBox()
+        self.poll_interval_input.setRange(5, 3600)
+        self.poll_interval_input.setSuffix(" s")
+        self.poll_interval_input.setValue(int(settings.value("slurm_poll_interval", 30) or 30))
+        form.addRow("Poll interval:", self.poll_interval_input)
+        layout.addLayout(form)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def save(self):
+        """Write the entered values to the settings."""
+        self.settings.setValue("slurm_partition", self.partition_input.text().strip())
+        self.settings.setValue("slurm_time_limit", self.time_limit_input.text().strip())
+        self.settings.setValue("slurm_account", self.account_input.text().strip())
+        self.settings.setValue("slurm_orca_path", self.orca_path_input.text().strip())
+        self.settings.setValue("slurm_setup_commands", self.setup_input.toPlainText().strip())
+        self.settings.setValue("slurm_commands_dir", self.commands_dir_input.text().strip())
+        self.settings.setValue("slurm_poll_interval", self.poll_interval_input.value())
@@ -0,0 +1,58 @@
+"""
+3D structure generation with RDKit, shared by the GUI and the batch runner.
+"""
+import os
+
+from rdkit import Chem
+from rdkit.Chem import AllChem
+
+
+def molecule_from_smiles(smiles, num_conformers=50):
+    """
+    Embed a SMILES string in 3D and return the lowest-energy UFF conformer.
+
+    Raises ValueError for SMILES RDKit cannot parse.
+    """
+    mol = Chem.MolFromSmiles(smiles)
+    if mol is None:
+        raise ValueError("Invalid SMILES string")
+
+    mol = Chem.AddHs(mol)
+
+    # Set up multithreading parameters for conformer generation
+    num_cores = os.cpu_count() or 1
+    params = AllChem.ETKDG()
+    params.numThreads = num_cores
+
+    # Generate and optimize conformers using multithreading
+    AllChem.EmbedMultipleConfs(mol, numConfs=num_conformers, params=params)
+    results = AllChem.UFFOptimizeMoleculeConfs(mol, numThreads=num_cores)
+
+    # Find the conformer with the lowest energy
+    min_energy = float('inf')
+    min_energy_id = -1
+    for i, result in enumerate(results):
+        if not result[0] and result[1] < min_energy:
+            min_energy = result[1]
+            min_energy_id = i
+
+    # If all optimizations failed, fallback to the first conformer
+    if min_energy_id == -1:
+        min_energy_id = 0
+
+    # Create a new molecule containing only the lowest-energy conformer
+    final_mol = Chem.Mol(mol)
+    final_mol.RemoveAllConformers()
+    conf = mol.GetConformer(min_energy_id)
+    final_mol.AddConformer(conf, assignId=True)
+    return final_mol
+
+
+def coordinates_from_molecule(mol):
+    """Return [[atom, x, y, z], ...] for the first conformer of an RDKit molecule."""
+    conformer = mol.GetConformer()
+    coordinates = []
+    for atom in mol.GetAtoms():
+        position = conformer.GetAtomPosition(atom.GetIdx())
+        coordinates.append([atom.GetSymbol(), position.x, position.y, position.z])
+    return coordinates
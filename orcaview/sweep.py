@@ -0,0 +1,213 @@
+"""
+Parameter sweeps over functionals, basis sets and solvation settings.
+
+build_sweep() takes the cartesian product of the selected options, drops
+combinations that ORCA would reject or that duplicate another one (a -3c
+composite method ignores the basis set, for instance), and orders the rest
+by a rough cost estimate so cheap results arrive first. generate_sweep()
+writes one input per point with OrcaInputGenerator and returns the jobs,
+tagged with a common sweep id so the queue can track them together.
+"""
+import itertools
+import os
+import re
+import uuid
+
+from . import config
+from .input_generator import OrcaInputGenerator, compose_keywords
+from .job_queue import OrcaJob
+
+# Relative cost of one functional family (per basis function^3)
+FAMILY_COST = {
+    "Local (LDA)": 1.0,
+    "GGA": 1.0,
+    "Meta-GGA": 1.5,
+    "Global Hybrid": 3.0,
+    "Range-Separated Hybrid": 4.0,
+    "Global Double-Hybrid": 12.0,
+    "Range-Separated Double-Hybrid": 15.0,
+}
+
+# Solvation adds a modest constant factor
+SOLVATION_COST = 1.2
+
+# Characters of method names that are not safe in file names, spelled out so
+# that e.g. 6-31G, 6-31G* and 6-31G** do not end up in the same file
+_FILE_CHARACTERS = {'*': 's', '+': 'p', '(': '-', ')': '', ',': '-'}
+
+_FAMILY_OF_FUNCTIONAL = {
+    functional.upper(): family
+    for family, functionals in config.DFT_FUNCTIONALS.items()
+    for functional in functionals
+}
+
+_ZETA_RE = [
+    (re.compile(r'6Z', re.IGNORECASE), 6),
+    (re.compile(r'5Z|pc\w*-4', re.IGNORECASE), 5),
+    (re.compile(r'QZ|pc\w*-3', re.IGNORECASE), 4),
+    (re.compile(r'TZ|6-311|pc\w*-2|ANO-pVTZ', re.IGNORECASE), 3),
+    (re.compile(r'STO-3G|ANO-SZ|MB$|pc\w*-0|CRENBS', re.IGNORECASE), 1),
+]
+
+
+def is_composite(functional):
+    """True for -3c composite methods, which bring their own basis set."""
+    return functional.upper().endswith('-3C')
+
+
+def basis_cost(basis_set):
+    """Rough relative number of basis functions per atom for a basis set name."""
+    zeta = 2
+    for pattern, level in _ZETA_RE:
+        if pattern.search(basis_set):
+            zeta = level
+            break
+    size = zeta ** 2
+    if basis_set.lower().startswith(('aug-', 'ma-', 'd-aug', 'saug')) or '+' in basis_set or basis_set.endswith('D'):
+        size *= 1.4  # Diffuse functions
+    if 'PP' in basis_set or '2df' in basis_set or '3df' in basis_set:
+        size *= 1.3  # Extra polarization
+    return size
+
+
+class SweepPoint:
+    """One combination of a sweep."""
+
+    def __init__(self, functional, basis_set, solvation_model=None, solvent=None):
+        self.functional = functional
+        # None for composite methods, which ignore the basis set
+        self.basis_set = basis_set
+        self.solvation_model = solvation_model
+        self.solvent = solvent
+
+    def key(self):
+        return (self.functional.upper(), (self.basis_set or '').upper(),
+                (self.solvation_model or '').upper(), (self.solvent or '').lower())
+
+    def label(self):
+        parts = [self.functional]
+        if self.basis_set:
+            parts.append(self.basis_set)
+        if self.solvation_model:
+            parts.append(f"{self.solvation_model}({self.solvent})")
+        return ' / '.join(parts)
+
+    def file_label(self):
+        label = ''.join(_FILE_CHARACTERS.get(char, char) for char in self.label().replace(' / ', '_'))
+        return re.sub(r'[^A-Za-z0-9.-]+', '_', label).strip('_')
+
+    def estimated_cost(self):
+        family_cost = FAMILY_COST.get(_FAMILY_OF_FUNCTIONAL.get(self.functional.upper()), 3.0)
+        if self.basis_set is None:
+            # Composite methods use small dedicated basis sets
+            cost = family_cost * basis_cost('def2-SVP') ** 3
+        else:
+            cost = family_cost * basis_cost(self.basis_set) ** 3
+        if self.solvation_model:
+            cost *= SOLVATION_COST
+        return cost
+
+    def __repr__(self):
+        return f"SweepPoint({self.label()!r})"
+
+
+def validate_point(functional, basis_set, solvation_model, solvent, other_keywords=''):
+    """
+    Return the normalized SweepPoint, or None if the combination is invalid.
+
+    Rejected: placeholder entries, solvents the model does not know, and
+    relativistic (DKH/ZORA/SARC) basis sets without the matching
+    Hamiltonian among the extra keywords.
+    """
+    if not functional or functional.startswith('---'):
+        return None
+    if basis_set is not None and basis_set.startswith('---'):
+        return None
+    if is_composite(functional):
+        basis_set = None
+    elif not basis_set:
+        return None
+    if not solvation_model or solvation_model == 'None':
+        solvation_model, solvent = None, None
+    else:
+        solvents = config.SOLVENTS_BY_MODEL.get(solvation_model)
+        if not solvent or (solvents is not None and solvent not in solvents):
+            return None
+    if basis_set:
+        extra = other_keywords.upper().split()
+        upper = basis_set.upper()
+        if 'DKH' in upper and not any(keyword.startswith('DKH') for keyword in extra):
+            return None
+        if 'ZORA' in upper and 'ZORA' not in extra:
+            return None
+        if upper.startswith('SARC') and not any(keyword.startswith(('DKH', 'ZORA')) for keyword in extra):
+            return None
+    return SweepPoint(functional, basis_set, solvation_model, solvent)
+
+
+def build_sweep(functionals, basis_sets, solvations=(('None', None),), other_keywords=''):
+    """
+    Return the valid, distinct sweep points, cheapest first.
+
+    solvations is a sequence of (model, solvent) pairs; ('None', None)
+    stands for the gas phase.
+    """
+    points = {}
+    for functional, basis_set, (model, solvent) in itertools.product(functionals, basis_sets or [None], solvations):
+        point = validate_point(functional, basis_set, model, solvent, other_keywords)
+        if point is not None:
+            points.setdefault(point.key(), point)
+    return sorted(points.values(), key=lambda point: (point.estimated_cost(), point.label()))
+
+
+def generate_sweep(points, coordinates, output_dir, base_name, orca_path, job_type="Single Point",
+                   charge=0, multiplicity=1, nprocs=1, maxcore=None, other_keywords='', blocks=None,
+                   busy_inputs=()):
+    """
+    Write one input per sweep point and return (sweep_id, jobs) in the order of points.
+
+    Each job carries the sweep id and its point label, so the queue can
+    report on the sweep as a whole. Every point gets its own file, also on
+    case-insensitive file systems. Raises FileExistsError, before writing
+    anything, when an input would overwrite one of busy_inputs (the inputs
+    of queued or running jobs).
+    """
+    stems = []
+    used = set()
+    for point in points:
+        name = f"{base_name}_{point.file_label()}"
+        unique, counter = name, 2
+        while unique.lower() in used:
+            unique = f"{name}_{counter}"
+            counter += 1
+        used.add(unique.lower())
+        stems.append(os.path.join(output_dir, unique))
+    busy = {os.path.normcase(os.path.abspath(path)) for path in busy_inputs}
+    conflicts = [stem + '.inp' for stem in stems if os.path.normcase(os.path.abspath(stem + '.inp')) in busy]
+    if conflicts:
+        raise FileExistsError(f"{len(conflicts)} sweep inputs belong to queued or running jobs, "
+                              f"e.g. {conflicts[0]}; choose another base name or output directory")
+    os.makedirs(output_dir, exist_ok=True)
+    sweep_id = uuid.uuid4().hex[:12]
+    jobs = []
+    for point, stem in zip(points, stems):
+        generator = OrcaInputGenerator()
+        generator.set_keywords(compose_keywords(
+            job_type, "DFT", point.functional, point.basis_set or "",
+            solvation_model=point.solvation_model or "None", solvent=point.solvent or "",
+            other_keywords=other_keywords
+        ))
+        generator.set_charge_and_multiplicity(charge, multiplicity)
+        generator.set_coordinates(coordinates)
+        for block_name, block_content in (blocks or {}).items():
+            generator.add_block(block_name, block_content)
+        generator.add_block("pal", f"nprocs {nprocs}")
+        if maxcore:
+            generator.add_block("maxcore", str(maxcore))
+        with open(stem + '.inp', 'w') as f:
+            f.write(generator.generate_input())
+        job = OrcaJob(stem + '.inp', stem + '.out', orca_path)
+        job.sweep_id = sweep_id
+        job.sweep_label = point.label()
+        jobs.append(job)
+    return sweep_id, jobs
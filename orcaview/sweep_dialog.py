@@ -0,0 +1,123 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QListWidget, QAbstractItemView, QComboBox,
+    QCheckBox, QLabel, QLineEdit, QPushButton, QDialogButtonBox, QFileDialog, QGroupBox
+)
+
+from . import config
+from .sweep import build_sweep
+
+
+class SweepDialog(QDialog):
+    """Select functionals, basis sets and solvents for a parameter sweep."""
+
+    def __init__(self, other_keywords="", output_dir="", base_name="sweep", parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Parameter Sweep")
+        self.other_keywords = other_keywords
+        layout = QVBoxLayout(self)
+
+        lists_layout = QHBoxLayout()
+        self.functional_list = self._make_list(
+            [functional for functionals in config.DFT_FUNCTIONALS.values() for functional in functionals]
+        )
+        self.basis_list = self._make_list(
+            [basis for basis_sets in config.BASIS_SETS.values() for basis in basis_sets]
+        )
+        lists_layout.addWidget(self._group("Functionals", self.functional_list))
+        lists_layout.addWidget(self._group("Basis Sets", self.basis_list))
+
+        solvation_box = QGroupBox("Solvation")
+        solvation_layout = QVBoxLayout(solvation_box)
+        self.gas_phase_checkbox = QCheckBox("Include gas phase")
+        self.gas_phase_checkbox.setChecked(True)
+        self.solvation_model_combo = QComboBox()
+        self.solvation_model_combo.addItems([model for model in config.SOLVATION_MODELS["Other"] if model != "None"])
+        self.solvent_list = self._make_list([])
+        solvation_layout.addWidget(self.gas_phase_checkbox)
+        solvation_layout.addWidget(self.solvation_model_combo)
+        solvation_layout.addWidget(self.solvent_list)
+        lists_layout.addWidget(solvation_box)
+        layout.addLayout(lists_layout)
+
+        form = QFormLayout()
+        output_layout = QHBoxLayout()
+        self.output_dir_input = QLineEdit(output_dir)
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self._browse_output_dir)
+        output_layout.addWidget(self.output_dir_input)
+        output_layout.addWidget(browse_button)
+        form.addRow("Output directory:", output_layout)
+        self.base_name_input = QLineEdit(base_name)
+        form.addRow("Base name:", self.base_name_input)
+        layout.addLayout(form)
+
+        self.count_label = QLabel()
+        layout.addWidget(self.count_label)
+        self.buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        self.buttons.button(QDialogButtonBox.StandardButton.Ok).setText("Generate and Queue")
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+        layout.addWidget(self.buttons)
+
+        self.functional_list.itemSelectionChanged.connect(self._update_count)
+        self.basis_list.itemSelectionChanged.connect(self._update_count)
+        self.solvent_list.itemSelectionChanged.connect(self._update_count)
+        self.gas_phase_checkbox.toggled.connect(self._update_count)
+        self.solvation_model_combo.currentTextChanged.connect(self._update_solvents)
+        self.output_dir_input.textChanged.connect(self._update_count)
+        self._update_solvents(self.solvation_model_combo.currentText())
+        self.resize(900, 600)
+
+    def _make_list(self, items):
+        widget = QListWidget()
+        widget.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        widget.addItems(items)
+        return widget
+
+    def _group(self, title, widget):
+        box = QGroupBox(title)
+        QVBoxLayout(box).addWidget(widget)
+        return box
+
+    def _browse_output_dir(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select Output Directory", self.output_dir_input.text())
+        if directory:
+            self.output_dir_input.setText(directory)
+
+    def _update_solvents(self, model):
+        self.solvent_list.clear()
+        self.solvent_list.addItems(config.SOLVENTS_BY_MODEL.get(model, []))
+        self._update_count()
+
+    def _solvations(self):
+        solvations = [("None", None)] if self.gas_phase_checkbox.isChecked() else []
+        model = self.solvation_model_combo.currentText()
+        solvations.extend((model, item.text()) for item in self.solvent_list.selectedItems())
+        return solvations
+
+    def selected_points(self):
+        """The valid, distinct combinations of the current selection, cheapest first."""
+        return build_sweep(
+            [item.text() for item in self.functional_list.selectedItems()],
+            [item.text() for item in self.basis_list.selectedItems()],
+            self._solvations(),
+            self.other_keywords,
+        )
+
+    def output_dir(self):
+        return self.output_dir_input.text().strip()
+
+    def base_name(self):
+        return self.base_name_input.text().strip() or "sweep"
+
+    def _update_count(self, *_):
+        functionals = len(self.functional_list.selectedItems())
+        basis_sets = max(len(self.basis_list.selectedItems()), 1)
+        total = functionals * basis_sets * len(self._solvations())
+        points = len(self.selected_points())
+        self.count_label.setText(
+            f"{points} jobs ({total - points} invalid or duplicate combinations removed), cheapest first"
+        )
+        self.buttons.button(QDialogButtonBox.StandardButton.Ok).setEnabled(points > 0 and bool(self.output_dir()))
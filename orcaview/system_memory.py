@@ -0,0 +1,95 @@
+"""
+Memory admission control for concurrent ORCA jobs.
+
+ORCA lets each process allocate up to %maxcore MB, so a job's demand is
+maxcore x nprocs. Before the queue starts a job next to running ones, the
+demand is compared with the machine's memory read from /proc/meminfo:
+
+- the demands of all running jobs plus the new one must fit into MemTotal
+  minus a reserve kept free for the OS and the GUI, and
+- the new job's demand must fit into MemAvailable minus the reserve, which
+  accounts for memory used by other programs.
+
+Jobs that fail either check stay queued until memory is free. Where
+/proc/meminfo does not exist (Windows, macOS) only the configured memory
+budget of the queue applies.
+"""
+from .logger import logger
+
+MEMINFO_PATH = '/proc/meminfo'
+
+# Memory kept free for the OS, the GUI and file caches
+DEFAULT_RESERVE_MB = 2048
+
+# %maxcore ORCA uses when the input does not set it
+DEFAULT_MAXCORE_MB = 4000
+
+
+def read_meminfo(path=MEMINFO_PATH):
+    """Return (total_mb, available_mb) from /proc/meminfo, or None if it cannot be read."""
+    values = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                fields = rest.split()
+                if fields:
+                    values[name] = int(fields[0])  # kB
+    except (OSError, ValueError):
+        return None
+    if 'MemTotal' not in values:
+        return None
+    available = values.get('MemAvailable')
+    if available is None:
+        # Kernels before 3.14 lack MemAvailable
+        available = values.get('MemFree', 0) + values.get('Buffers', 0) + values.get('Cached', 0)
+    return values['MemTotal'] // 1024, available // 1024
+
+
+class MemorySnapshot:
+    """Memory figures read once per dispatch pass."""
+
+    def __init__(self, total_mb, available_mb):
+        self.total_mb = total_mb
+        self.available_mb = available_mb
+
+
+class MemoryAdmission:
+    """Decides whether a job's memory demand fits next to the running jobs."""
+
+    def __init__(self, reserve_mb=DEFAULT_RESERVE_MB, meminfo_path=MEMINFO_PATH):
+        self.reserve_mb = reserve_mb if reserve_mb is not None else DEFAULT_RESERVE_MB
+        self.meminfo_path = meminfo_path
+        self._warned = False
+
+    def snapshot(self):
+        """Read the current memory figures, or None where they are not available."""
+        meminfo = read_meminfo(self.meminfo_path)
+        if meminfo is None:
+            if not self._warned:
+                logger.info(f"{self.meminfo_path} not readable; memory admission uses the queue budget only")
+                self._warned = True
+            return None
+        return MemorySnapshot(*meminfo)
+
+    def check(self, demand_mb, committed_mb, snapshot, alone=False):
+        """
+        Return None if a job demanding demand_mb may start, otherwise the reason to hold it.
+
+        committed_mb is the demand of the jobs already running. With
+        alone=True no other job is running: a job larger than the machine
+        then starts anyway, since waiting could never make it fit, but a job
+        that would fit still waits while other programs hold the memory.
+        """
+        if snapshot is None:
+            return None
+        usable = snapshot.total_mb - self.reserve_mb
+        if committed_mb + demand_mb > usable:
+            if alone:
+                return None
+            return (f"Waiting for memory: needs {demand_mb} MB, {committed_mb} MB of "
+                    f"{usable} MB usable are claimed by running jobs")
+        if demand_mb > snapshot.available_mb - self.reserve_mb:
+            return (f"Waiting for memory: needs {demand_mb} MB plus a {self.reserve_mb} MB reserve, "
+                    f"more than the system has available")
+        return None
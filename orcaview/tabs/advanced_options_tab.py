@@ -1,4 +1,4 @@
-from PyQt6.QtWidgets import QWidget, QFormLayout, QSpinBox, QLineEdit
+from PyQt6.QtWidgets import QWidget, QFormLayout, QSpinBox, QLineEdit, QLabel
 
 class AdvancedOptionsTab(QWidget):
     def __init__(self, parent=None):
@@ -9,10 +9,25 @@ class AdvancedOptionsTab(QWidget):
         self.multiplicity_input.setMinimum(1)
         self.nprocs_input = QSpinBox()
         self.nprocs_input.setMinimum(1)
+        # Written to %maxcore: the limit of each process, not of the whole job
         self.memory_input = QLineEdit("4000")
+        self.memory_input.setToolTip("%maxcore: memory per process in MB. ORCA may use up to this times the number of processors.")
+        self.total_memory_label = QLabel()
         self.other_keywords_input = QLineEdit()
         advanced_layout.addRow("Charge:", self.charge_input)
         advanced_layout.addRow("Multiplicity:", self.multiplicity_input)
         advanced_layout.addRow("Processors:", self.nprocs_input)
-        advanced_layout.addRow("Memory (MB):", self.memory_input)
+        advanced_layout.addRow("Memory per process (MB):", self.memory_input)
+        advanced_layout.addRow("", self.total_memory_label)
         advanced_layout.addRow("Other Keywords:", self.other_keywords_input)
+        self.memory_input.textChanged.connect(self._update_total_memory)
+        self.nprocs_input.valueChanged.connect(self._update_total_memory)
+        self._update_total_memory()
+
+    def _update_total_memory(self, *_):
+        memory = self.memory_input.text().strip()
+        if memory.isdigit():
+            total = int(memory) * self.nprocs_input.value()
+            self.total_memory_label.setText(f"Job total: up to {total} MB ({memory} MB \u00d7 {self.nprocs_input.value()} processes)")
+        else:
+            self.total_memory_label.setText("")
@@ -0,0 +1,219 @@
+"""
+Memory-mapped reader for multi-frame XYZ trajectories (ORCA's <name>_trj.xyz).
+
+Geometry optimizations, NEB and IRC runs append one XYZ frame per step:
+
+    <atom count>
+    <comment, e.g. "Coordinates from ORCA-job x E -231.713009832345">
+    <element> <x> <y> <z>     (atom count lines, Angstrom)
+
+XYZTrajectory maps the file into memory and indexes it in one pass,
+recording where each frame's comment and coordinate lines start and end;
+nothing else is read. Frames are parsed when they are accessed, through
+the (n_frames, n_atoms, 3) FrameArray in XYZTrajectory.coordinates, which
+keeps the most recently used frames parsed. refresh() indexes frames that
+a running job appended since; a frame is indexed once its last line ends
+with a newline, unless the file is known to be complete.
+"""
+import mmap
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+TRAJECTORY_SUFFIX = '_trj.xyz'
+
+
+def trajectory_path(input_path):
+    """The trajectory ORCA writes for input_path."""
+    return os.path.splitext(os.path.abspath(input_path))[0] + TRAJECTORY_SUFFIX
+
+
+class FrameArray:
+    """
+    Lazy (n_frames, n_atoms, 3) array of a trajectory's coordinates.
+
+    Indexing with a frame number (or a frame number followed by atom and
+    axis indices) parses only that frame; slices and lists of frames parse
+    only the frames selected. np.asarray() loads all frames.
+    """
+
+    def __init__(self, trajectory):
+        self._trajectory = trajectory
+
+    @property
+    def shape(self):
+        return len(self._trajectory), self._trajectory.n_atoms, 3
+
+    def __len__(self):
+        return len(self._trajectory)
+
+    def __getitem__(self, key):
+        rest = ()
+        if isinstance(key, tuple):
+            key, rest = key[0], key[1:]
+        if isinstance(key, (int, np.integer)):
+            frame = self._trajectory.frame(int(key))
+            return frame[rest] if rest else frame
+        frames = np.arange(len(self._trajectory))[key]
+        stacked = np.stack([self._trajectory.frame(int(index)) for index in frames]) if len(frames) else \
+            np.empty((0, self._trajectory.n_atoms, 3))
+        return stacked[(slice(None),) + rest] if rest else stacked
+
+    def __array__(self, dtype=None):
+        array = self[:]
+        return array.astype(dtype) if dtype is not None else array
+
+
+class XYZTrajectory:
+    """Frame index over a memory-mapped multi-frame XYZ file."""
+
+    # Parsed frames kept for scrubbing back and forth
+    CACHED_FRAMES = 64
+
+    def __init__(self, path, final=False):
+        self.path = path
+        # The file is no longer written to, so a last line without a newline is complete
+        self.final = final
+        self.n_atoms = None
+        self.elements = []
+        # Byte offsets per frame: comment line start, first coordinate line, end of the frame
+        self._comment_starts = []
+        self._starts = []
+        self._ends = []
+        self._indexed_to = 0
+        self._file = open(path, 'rb')
+        self._map = None
+        self._cache = OrderedDict()
+        self.coordinates = FrameArray(self)
+        self.refresh()
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def refresh(self):
+        """Index the frames appended since the last call; returns the number of new frames."""
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self._indexed_to:
+            # Rewritten from the start (the job was restarted)
+            self.n_atoms, self.elements = None, []
+            self._comment_starts, self._starts, self._ends = [], [], []
+            self._indexed_to = 0
+            self._cache.clear()
+        if size == 0 or (self._map is not None and size == len(self._map)):
+            return 0
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        before = len(self)
+        self._index()
+        return len(self) - before
+
+    def _line_end(self, position):
+        """Offset just after the line starting at position, or None if the line is incomplete."""
+        end = self._map.find(b'\n', position)
+        return None if end < 0 else end + 1
+
+    @staticmethod
+    def _is_atom_line(line):
+        tokens = line.split()
+        if len(tokens) < 4:
+            return False
+        try:
+            float(tokens[3])
+        except ValueError:
+            return False
+        return True
+
+    def _index(self):
+        data = self._map
+        position = self._indexed_to
+        while position < len(data):
+            count_end = self._line_end(position)
+            if count_end is None:
+                break
+            count_line = data[position:count_end].strip()
+            if not count_line:
+                position = count_end  # Blank line between frames
+                continue
+            try:
+                count = int(count_line.split()[0])
+            except ValueError:
+                raise ValueError(f"{self.path}: expected an atom count at byte {position}, "
+                                 f"found {count_line[:40]!r}") from None
+            if self.n_atoms is None:
+                self.n_atoms = count
+            elif count != self.n_atoms:
+                raise ValueError(f"{self.path}: frame {len(self) + 1} has {count} atoms, "
+                                 f"the first frame has {self.n_atoms}")
+            comment_end = self._line_end(count_end)
+            end = comment_end
+            for atom in range(count):
+                if end is None:
+                    break
+                line_start, end = end, self._line_end(end)
+                if end is None and self.final and atom == count - 1 and self._is_atom_line(data[line_start:]):
+                    end = len(data)  # The file does not end with a newline
+            if end is None:
+                break  # The frame is still being written
+            self._comment_starts.append(count_end)
+            self._starts.append(comment_end)
+            self._ends.append(end)
+            position = self._indexed_to = end
+            if not self.elements:
+                self.elements = [line.split()[0].decode('ascii', 'replace')
+                                 for line in data[comment_end:end].splitlines() if line.strip()]
+
+    def comment(self, index):
+        """The comment line of a frame (ORCA writes the energy there)."""
+        return self._map[self._comment_starts[index]:self._starts[index]].decode('utf-8', 'replace').strip()
+
+    def energy(self, index):
+        """The energy ORCA wrote into a frame's comment ('... E -231.7130'), or None."""
+        tokens = self.comment(index).split()
+        for previous, token in zip(tokens, tokens[1:]):
+            if previous == 'E':
+                try:
+                    return float(token)
+                except ValueError:
+                    return None
+        return None
+
+    def frame(self, index):
+        """The (n_atoms, 3) coordinates of one frame in Angstrom."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"frame {index} out of range for {len(self)} frames")
+        frame = self._cache.get(index)
+        if frame is not None:
+            self._cache.move_to_end(index)
+            return frame
+        tokens = self._map[self._starts[index]:self._ends[index]].split()
+        frame = np.array(tokens).reshape(self.n_atoms, -1)[:, 1:4].astype(np.float64)
+        frame.setflags(write=False)  # Shared through the cache
+        self._cache[index] = frame
+        if len(self._cache) > self.CACHED_FRAMES:
+            self._cache.popitem(last=False)
+        return frame
+
+    def xyz_block(self, index):
+        """One frame as a stand-alone XYZ block."""
+        if index < 0:
+            index += len(self)
+        frame = self._map[self._starts[index]:self._ends[index]].decode('utf-8', 'replace')
+        # Some readers drop blank lines, so the comment line is never left empty
+        comment = self.comment(index) or f"Frame {index + 1}"
+        return f"{self.n_atoms}\n{comment}\n{frame}"
@@ -1,5 +1,6 @@
 import sys
-from PyQt6.QtWidgets import QWidget, QVBoxLayout
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSlider
 from rdkit import Chem
 import numpy as np
 from vispy import scene
@@ -9,6 +10,8 @@ from vispy.visuals.filters import ShadingFilter
 
 from vispy.visuals.transforms import MatrixTransform
 
+from .logger import logger
+
 # Atom styling dictionaries (can be expanded)
 atom_colors = {
     'H': (1.0, 1.0, 1.0, 1.0),   # White
@@ -32,7 +35,19 @@ atom_radii = {
 
 
 class MoleculeViewer3D(QWidget):
-    def __init__(self, molecule, parent=None):
+    """
+    Ball-and-stick view of an RDKit molecule.
+
+    With a trajectory (see trajectory.py) of the same atoms, a slider and
+    a play button move through its frames; switching frames only moves the
+    atom and bond meshes built for the molecule, and each frame is read
+    from the memory-mapped file when it is shown.
+    """
+
+    # Milliseconds between frames while the trajectory plays
+    PLAY_INTERVAL_MS = 100
+
+    def __init__(self, molecule, parent=None, trajectory=None):
         super().__init__(parent)
         self.setWindowTitle("3D Molecule Viewer (Vispy)")
         self.setLayout(QVBoxLayout())
@@ -43,6 +58,12 @@ class MoleculeViewer3D(QWidget):
 
         self.view = self.canvas.central_widget.add_view()
         self.molecule = molecule
+        if trajectory is not None and trajectory.n_atoms != molecule.GetNumAtoms():
+            raise ValueError(f"The trajectory has {trajectory.n_atoms} atoms, "
+                             f"the molecule {molecule.GetNumAtoms()}")
+        self.trajectory = trajectory
+        self._atom_spheres = []
+        self._bond_meshes = []  # (mesh, start atom index, end atom index)
         conformer = self.molecule.GetConformer()
         atom_positions = np.array([conformer.GetAtomPosition(i) for i in range(self.molecule.GetNumAtoms())])
         centroid = atom_positions.mean(axis=0)
@@ -53,6 +74,69 @@ class MoleculeViewer3D(QWidget):
         self.view.camera.distance = max_extent * 3 if max_extent > 0 else 10
 
         self._render_molecule()
+        if trajectory is not None:
+            self.layout().addLayout(self._create_trajectory_controls())
+            self.show_frame(len(trajectory) - 1)
+
+    def _create_trajectory_controls(self):
+        """Slider, play button and frame label for moving through the trajectory."""
+        controls = QHBoxLayout()
+        self.play_button = QPushButton("Play")
+        self.play_button.setCheckable(True)
+        self.play_button.toggled.connect(self._toggle_playing)
+        self.frame_slider = QSlider(Qt.Orientation.Horizontal)
+        self.frame_slider.setRange(0, max(len(self.trajectory) - 1, 0))
+        self.frame_slider.valueChanged.connect(self.show_frame)
+        self.frame_label = QLabel()
+        self.play_timer = QTimer(self)
+        self.play_timer.timeout.connect(self._next_frame)
+        controls.addWidget(self.play_button)
+        controls.addWidget(self.frame_slider)
+        controls.addWidget(self.frame_label)
+        return controls
+
+    def show_frame(self, index):
+        """Move the atoms and bonds to the coordinates of trajectory frame index."""
+        if self.trajectory is None or not len(self.trajectory):
+            return
+        if self.frame_slider.value() != index:
+            self.frame_slider.setValue(index)  # Calls back into show_frame
+            return
+        self._place(self.trajectory.coordinates[index])
+        energy = self.trajectory.energy(index)
+        label = f"Frame {index + 1}/{len(self.trajectory)}"
+        if energy is not None:
+            label += f", E = {energy:.8f} Eh"
+        self.frame_label.setText(label)
+        self.canvas.update()
+
+    def _toggle_playing(self, playing):
+        self.play_button.setText("Pause" if playing else "Play")
+        if playing:
+            # A running job may have appended frames since
+            try:
+                if self.trajectory.refresh():
+                    self.frame_slider.setRange(0, len(self.trajectory) - 1)
+            except ValueError as e:
+                # Rewritten with a different molecule; play the frames indexed so far
+                logger.warning(f"Could not read new frames of {self.trajectory.path}: {e}")
+            if self.frame_slider.value() == self.frame_slider.maximum():
+                self.frame_slider.setValue(0)
+            self.play_timer.start(self.PLAY_INTERVAL_MS)
+        else:
+            self.play_timer.stop()
+
+    def _next_frame(self):
+        if self.frame_slider.value() >= self.frame_slider.maximum():
+            self.play_button.setChecked(False)
+            return
+        self.frame_slider.setValue(self.frame_slider.value() + 1)
+
+    def closeEvent(self, event):
+        if self.trajectory is not None:
+            self.play_timer.stop()
+            self.trajectory.close()
+        super().closeEvent(event)
 
     def _render_molecule(self):
         conformer = self.molecule.GetConformer()
@@ -72,44 +156,33 @@ class MoleculeViewer3D(QWidget):
                                   parent=self.view.scene)
             shading_filter = ShadingFilter(shading='smooth', light_dir=(0.5, 0.5, -1))
             sphere.attach(shading_filter)
-            sphere.transform = MatrixTransform()
-            sphere.transform.translate(pos)
+            self._atom_spheres.append(sphere)
 
         # Render bonds as cylinders
         for bond in self.molecule.GetBonds():
             start_idx = bond.GetBeginAtomIdx()
             end_idx = bond.GetEndAtomIdx()
-            start_pos = atom_positions[start_idx]
-            end_pos = atom_positions[end_idx]
 
             start_atom = self.molecule.GetAtomWithIdx(start_idx)
             end_atom = self.molecule.GetAtomWithIdx(end_idx)
 
-            # Draw cylinder from atom center to atom center (no shortening)
-            bond_vector = end_pos - start_pos
-            bond_length = np.linalg.norm(bond_vector)
             start_color = atom_colors.get(start_atom.GetSymbol(), atom_colors['DEFAULT'])
             end_color = atom_colors.get(end_atom.GetSymbol(), atom_colors['DEFAULT'])
-            self._create_colored_bond_cylinder(start_pos, end_pos, start_color, end_color)
-
-    def _create_colored_bond_cylinder(self, start_pos, end_pos, start_color, end_color):
-        bond_vector = end_pos - start_pos
-        bond_length = np.linalg.norm(bond_vector)
+            bond_mesh = self._create_colored_bond_cylinder(start_color, end_color)
+            self._bond_meshes.append((bond_mesh, start_idx, end_idx))
+        self._place(atom_positions)
 
+    def _create_colored_bond_cylinder(self, start_color, end_color):
+        """A cylinder of unit length along z, half in each atom's color; _place() stretches it."""
         # Generate a high-res cylinder for seamless appearance
-        mesh_data = generation.create_cylinder(rows=40, radius=(0.12, 0.12), length=bond_length, cols=30)
+        mesh_data = generation.create_cylinder(rows=40, radius=(0.12, 0.12), length=1.0, cols=30)
 
         # Assign vertex colors based on z-position (seamless coloring)
         vertices = mesh_data.get_vertices()
         vertex_colors = np.ones((len(vertices), 4))
-        half_length = bond_length / 2
-        epsilon = 1e-6
-        for i, vertex in enumerate(vertices):
-            # z=0 is the base (start), z=bond_length is the tip (end)
-            if vertex[2] <= half_length:
-                vertex_colors[i] = start_color
-            else:
-                vertex_colors[i] = end_color
+        # z=0 is the base (start), z=1 is the tip (end)
+        vertex_colors[vertices[:, 2] <= 0.5] = start_color
+        vertex_colors[vertices[:, 2] > 0.5] = end_color
 
         bond_mesh = visuals.Mesh(
             vertices=vertices,
@@ -120,23 +193,46 @@ class MoleculeViewer3D(QWidget):
 
         shading_filter = ShadingFilter(shading='smooth', light_dir=(0.5, 0.5, -1))
         bond_mesh.attach(shading_filter)
+        return bond_mesh
+
+    def _place(self, atom_positions):
+        """Move the atom spheres and bond cylinders to the given (n_atoms, 3) positions."""
+        for sphere, pos in zip(self._atom_spheres, atom_positions):
+            transform = MatrixTransform()
+            transform.translate(pos)
+            sphere.transform = transform
+        for bond_mesh, start_idx, end_idx in self._bond_meshes:
+            start_pos = np.asarray(atom_positions[start_idx], dtype=float)
+            bond_vector = atom_positions[end_idx] - start_pos
+            bond_length = np.linalg.norm(bond_vector)
 
-        # --- Calculate and apply the transformation ---
-        default_axis = np.array([0, 0, 1])
-        bond_axis = bond_vector / bond_length
-        rotation_axis = np.cross(default_axis, bond_axis)
-        dot_product = np.clip(np.dot(default_axis, bond_axis), -1.0, 1.0)
-        rotation_angle_rad = np.arccos(dot_product)
-        rotation_angle_deg = np.rad2deg(rotation_angle_rad)
-
-        transform = MatrixTransform()
-        if np.linalg.norm(rotation_axis) > 1e-6:
-            rotation_axis = rotation_axis / np.linalg.norm(rotation_axis)
-            transform.rotate(rotation_angle_deg, rotation_axis)
-        elif np.allclose(default_axis, -bond_axis):
-            transform.rotate(180, [1, 0, 0])
-
-        transform.translate(start_pos)
-        bond_mesh.transform = transform
-
-
+            # --- Calculate and apply the transformation ---
+            transform = MatrixTransform()
+            transform.scale((1.0, 1.0, max(bond_length, 1e-6)))
+            if bond_length > 1e-6:
+                default_axis = np.array([0, 0, 1])
+                bond_axis = bond_vector / bond_length
+                rotation_axis = np.cross(default_axis, bond_axis)
+                dot_product = np.clip(np.dot(default_axis, bond_axis), -1.0, 1.0)
+                rotation_angle_deg = np.rad2deg(np.arccos(dot_product))
+                if np.linalg.norm(rotation_axis) > 1e-6:
+                    rotation_axis = rotation_axis / np.linalg.norm(rotation_axis)
+                    transform.rotate(rotation_angle_deg, rotation_axis)
+                elif np.allclose(default_axis, -bond_axis):
+                    transform.rotate(180, [1, 0, 0])
+            transform.translate(start_pos)
+            bond_mesh.transform = transform
+
+
+def molecule_from_xyz_block(xyz_block):
+    """An RDKit molecule with bonds inferred from distances; without bonds if that fails."""
+    mol = Chem.MolFromXYZBlock(xyz_block)
+    if mol is None:
+        raise ValueError("RDKit could not parse the XYZ data.")
+    try:
+        from rdkit.Chem import rdDetermineBonds
+        rdDetermineBonds.DetermineConnectivity(mol)
+        Chem.SanitizeMol(mol)
+    except Exception as bond_error:
+        logger.debug(f"Could not infer bonds: {bond_error}")
+    return mol
@@ -0,0 +1,122 @@
+"""
+Job dependencies: hand-off of geometries and orbitals from parent jobs.
+
+A job may depend on other jobs (OrcaJob.dependencies); the queue holds it
+until all of them have finished successfully and cancels it when one of
+them fails. Right before the child runs, its input is rewritten with the
+final geometry of its first parent (the .xyz ORCA writes, or the last frame
+of the optimization trajectory) and, if requested, that parent's .gbw is
+copied next to it and read with MORead. Unlike the automatic orbital reuse
+in orbital_reuse.py, the hand-off is kept in the child's input, so the input
+on disk is the one that was computed; only when ORCA cannot read the
+parent's GBW are the orbitals taken out again and the child run from a
+fresh guess.
+"""
+import os
+import re
+import shutil
+
+from .input_parser import requests_moread
+from .logger import logger
+from .orbital_reuse import OrbitalReuse, gbw_path_for, inject_moread
+
+# Name of the parent's GBW copied next to the child's input
+PARENT_GBW_SUFFIX = '_parent.gbw'
+
+_COORDINATE_SECTION_RE = re.compile(
+    r'^[ \t]*\*[ \t]*(?:xyz|int|internal|gzmt)[ \t]+(-?\d+)[ \t]+(\d+)[ \t]*$.*?^[ \t]*\*[ \t]*$',
+    re.IGNORECASE | re.MULTILINE | re.DOTALL
+)
+_COORDINATE_FILE_RE = re.compile(
+    r'^[ \t]*\*[ \t]*(?:xyzfile|gzmtfile)[ \t]+(-?\d+)[ \t]+(\d+)[ \t]+\S+[ \t]*$', re.IGNORECASE | re.MULTILINE
+)
+
+
+def _read_xyz_frames(path):
+    """Return the frames of a (multi-)XYZ file as lists of 'El x y z' lines."""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        lines = f.read().splitlines()
+    frames = []
+    index = 0
+    while index < len(lines):
+        if not lines[index].strip():
+            index += 1
+            continue
+        count = int(lines[index].split()[0])
+        atoms = [' '.join(line.split()[:4]) for line in lines[index + 2:index + 2 + count]]
+        if len(atoms) < count:
+            break  # Truncated last frame of a trajectory still being written
+        frames.append(atoms)
+        index += 2 + count
+    return frames
+
+
+def final_geometry(job):
+    """
+    Return the final geometry of a finished job as 'El x y z' lines.
+
+    Raises ValueError when the job left no geometry.
+    """
+    stem = os.path.splitext(os.path.abspath(job.input_path))[0]
+    for path in (stem + '.xyz', stem + '_trj.xyz'):
+        try:
+            frames = _read_xyz_frames(path)
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError, IndexError) as e:
+            logger.warning(f"Could not read geometry from {path}: {e}")
+            continue
+        if frames:
+            return frames[-1]
+    raise ValueError(f"{os.path.basename(job.input_path)} left no final geometry ({stem}.xyz)")
+
+
+def replace_geometry(text, atoms):
+    """
+    Return the input text with its coordinate section replaced by atoms.
+
+    The charge and multiplicity of the input are kept. Raises ValueError
+    for inputs without a coordinate section.
+    """
+    for pattern in (_COORDINATE_SECTION_RE, _COORDINATE_FILE_RE):
+        match = pattern.search(text)
+        if match:
+            block = '\n'.join([f"* xyz {match.group(1)} {match.group(2)}"] + list(atoms) + ['*'])
+            return text[:match.start()] + block + text[match.end():]
+    raise ValueError("The input has no coordinate section to replace")
+
+
+def hand_off(job):
+    """
+    Write the hand-off from the job's first dependency into the job's input.
+
+    Returns an OrbitalReuse that takes the handed-over orbitals out of the
+    input again, or None when no orbitals were handed over. Does nothing
+    for jobs without dependencies. Raises OSError or ValueError when the
+    parent's geometry cannot be handed over.
+    """
+    if not job.dependencies:
+        return None
+    parent = job.dependencies[0]
+    with open(job.input_path, 'r', encoding='utf-8', errors='ignore') as f:
+        text = f.read()
+    original = text
+    orbitals = None
+    if job.handoff_geometry:
+        atoms = final_geometry(parent)
+        text = replace_geometry(text, atoms)
+        logger.info(f"Geometry of {parent.input_path} ({len(atoms)} atoms) handed to {job.input_path}")
+    if job.handoff_orbitals and not requests_moread(text):
+        source = gbw_path_for(parent.input_path)
+        if os.path.isfile(source) and os.path.getsize(source) > 0:
+            target = os.path.splitext(os.path.abspath(job.input_path))[0] + PARENT_GBW_SUFFIX
+            shutil.copy2(source, target)
+            orbitals = OrbitalReuse(os.path.abspath(job.input_path), text, target, source)
+            text = inject_moread(text, os.path.basename(target))
+            logger.info(f"Orbitals of {source} handed to {job.input_path}")
+        else:
+            logger.warning(f"{parent.input_path} left no GBW; {job.input_path} starts from a fresh guess")
+    if text != original:
+        with open(job.input_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return orbitals
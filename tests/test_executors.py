@@ -0,0 +1,183 @@
+"""
+SlurmExecutor and the queue against a fake Slurm: shell scripts standing in
+for sbatch, squeue, scancel and sacct that run the batch script locally.
+"""
+import os
+import shutil
+import stat
+import sys
+import time
+
+import pytest
+
+from orcaview.executors import SLURM, SlurmExecutor
+from orcaview.job_queue import JobQueueManager, JobStatus, OrcaJob
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32' or not shutil.which('setsid'),
+                                reason='the fake Slurm needs bash and setsid')
+
+FAKE_COMMANDS = {
+    # Runs the batch script in the background in its own process group
+    'sbatch': r'''#!/bin/bash
+S="$FAKE_SLURM_STATE"
+script="${@: -1}"
+exec 9>"$S/lock"; flock 9
+id=$(( $(cat "$S/next" 2>/dev/null || echo 1000) + 1 )); echo $id > "$S/next"
+exec 9>&-
+out=$(sed -n 's/^#SBATCH --output=//p' "$script")
+dir=$(sed -n 's/^#SBATCH --chdir=//p' "$script")
+setsid bash -c "cd '$dir'; bash '$script' > '$out' 2>&1; echo \$? > '$S/$id.rc'" > /dev/null 2>&1 &
+echo $! > "$S/$id.pid"
+echo "$id;cluster"
+''',
+    'squeue': r'''#!/bin/bash
+S="$FAKE_SLURM_STATE"
+echo "squeue $*" >> "$S/calls"
+[ -f "$S/down" ] && { echo "slurm_load_jobs error: Unable to contact slurm controller" >&2; exit 1; }
+for f in "$S"/*.pid; do
+  [ -e "$f" ] || continue
+  id=$(basename "$f" .pid)
+  [ -f "$S/$id.rc" ] || [ -f "$S/$id.cancelled" ] || echo "$id|RUNNING"
+done
+echo "999|PENDING"
+''',
+    'scancel': r'''#!/bin/bash
+S="$FAKE_SLURM_STATE"
+touch "$S/$1.cancelled"
+kill -- -$(cat "$S/$1.pid") 2>/dev/null
+exit 0
+''',
+    'sacct': r'''#!/bin/bash
+S="$FAKE_SLURM_STATE"
+echo "sacct $*" >> "$S/calls"
+for id in $(echo "${@: -1}" | tr ',' ' '); do
+  if [ -f "$S/$id.cancelled" ]; then echo "$id|CANCELLED by 1000|0:15"
+  else echo "$id|COMPLETED|$(cat "$S/$id.rc" 2>/dev/null || echo 0):0"; fi
+done
+''',
+}
+
+FAKE_ORCA = '''#!/bin/bash
+sleep "${FAKE_ORCA_SECONDS:-0.5}"
+grep -q FAIL "$1" && { echo "ORCA finished by error termination in SCF"; exit 3; }
+echo "FINAL SINGLE POINT ENERGY      -1.000000000000"
+echo "                             ****ORCA TERMINATED NORMALLY****"
+'''
+
+
+def _write_script(path, text):
+    with open(path, 'w', newline='\n') as f:
+        f.write(text)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+
+@pytest.fixture
+def fake_slurm(tmp_path, monkeypatch):
+    commands_dir = tmp_path / 'slurm'
+    state_dir = tmp_path / 'state'
+    commands_dir.mkdir()
+    state_dir.mkdir()
+    for name, text in FAKE_COMMANDS.items():
+        _write_script(commands_dir / name, text)
+    monkeypatch.setenv('FAKE_SLURM_STATE', str(state_dir))
+    orca = tmp_path / 'orca'
+    _write_script(orca, FAKE_ORCA)
+    return commands_dir, state_dir, orca
+
+
+def _calls(state_dir, command):
+    try:
+        with open(state_dir / 'calls') as f:
+            return [line for line in f if line.startswith(command)]
+    except FileNotFoundError:
+        return []
+
+
+def _make_job(tmp_path, name, orca, body='! HF def2-SVP'):
+    input_path = tmp_path / f'{name}.inp'
+    input_path.write_text(f'{body}\n%pal nprocs 2 end\n%maxcore 1000\n* xyz 0 1\nH 0 0 0\nH 0 0 0.74\n*\n')
+    return OrcaJob(str(input_path), str(tmp_path / f'{name}.out'), str(orca))
+
+
+def _wait_until(condition, timeout=30):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'timed out'
+        time.sleep(0.05)
+
+
+def test_batch_script(tmp_path):
+    executor = SlurmExecutor(orca_path='/opt/orca/orca', partition='short', time_limit='01:00:00',
+                             account='chem', sbatch_options=['--exclusive'], setup_commands=['module load orca'])
+    job = _make_job(tmp_path, 'h2', '/local/orca')
+    job.read_resource_request()
+    script = executor.batch_script(job, ['/local/orca', job.input_path], str(tmp_path))
+    lines = script.splitlines()
+    assert lines[0] == '#!/bin/bash'
+    assert f'#SBATCH --output={job.output_path}' in lines
+    assert f'#SBATCH --chdir={tmp_path}' in lines
+    assert '#SBATCH --ntasks=2' in lines
+    assert '#SBATCH --mem=3024M' in lines  # 2 x 1000 MB plus the overhead
+    assert '#SBATCH --partition=short' in lines
+    assert '#SBATCH --time=01:00:00' in lines
+    assert '#SBATCH --account=chem' in lines
+    assert '#SBATCH --exclusive' in lines
+    assert lines[-2:] == ['module load orca', f'/opt/orca/orca {job.input_path}']
+
+
+def test_jobs_are_polled_in_batches(tmp_path, fake_slurm):
+    commands_dir, state_dir, orca = fake_slurm
+    executor = SlurmExecutor(commands_dir=str(commands_dir), poll_interval=0.2)
+    jobs = [_make_job(tmp_path, f'job{i}', orca) for i in range(6)]
+    handles = [executor.launch(job, [str(orca), job.input_path], None, str(tmp_path)) for job in jobs]
+    assert len({handle.slurm_id for handle in handles}) == len(jobs)
+    started = time.time()
+    for handle in handles:
+        assert handle.wait(timeout=30) == 0
+        assert handle.state == 'COMPLETED'
+    elapsed = time.time() - started
+    # One squeue call per poll interval for all jobs, not one per job
+    assert len(_calls(state_dir, 'squeue')) <= elapsed / 0.2 + 2
+    assert len(_calls(state_dir, 'sacct')) <= len(_calls(state_dir, 'squeue'))
+    for job in jobs:
+        with open(job.output_path) as f:
+            assert 'ORCA TERMINATED NORMALLY' in f.read()
+
+
+def test_unreachable_controller_keeps_jobs(tmp_path, fake_slurm):
+    commands_dir, state_dir, orca = fake_slurm
+    executor = SlurmExecutor(commands_dir=str(commands_dir), poll_interval=3600)
+    job = _make_job(tmp_path, 'h2', orca)
+    handle = executor.launch(job, [str(orca), job.input_path], None, str(tmp_path))
+    (state_dir / 'down').touch()
+    _wait_until(lambda: (state_dir / f'{handle.slurm_id}.rc').exists())
+    executor.poll_once()
+    assert handle.poll() is None
+    (state_dir / 'down').unlink()
+    executor.poll_once()
+    assert handle.poll() == 0
+
+
+def test_queue_runs_and_cancels_on_slurm(tmp_path, fake_slurm, monkeypatch):
+    commands_dir, state_dir, orca = fake_slurm
+    monkeypatch.setenv('FAKE_ORCA_SECONDS', '1')
+    executor = SlurmExecutor(commands_dir=str(commands_dir), poll_interval=0.2)
+    manager = JobQueueManager(max_cores=1, executors=[executor], default_executor=SLURM)
+    try:
+        done = _make_job(tmp_path, 'done', orca)
+        failed = _make_job(tmp_path, 'failed', orca, body='! HF def2-SVP FAIL')
+        cancelled = _make_job(tmp_path, 'cancelled', orca)
+        for job in (done, failed, cancelled):
+            manager.add_job(job)
+        # The local core budget does not hold back jobs sent to the cluster
+        _wait_until(lambda: all(job.remote_id for job in (done, failed, cancelled)))
+        assert manager.cancel_job(cancelled)
+        _wait_until(lambda: all(job.status not in (JobStatus.QUEUED, JobStatus.RUNNING)
+                                for job in (done, failed, cancelled)))
+    finally:
+        manager.stop()
+    assert done.status == JobStatus.DONE
+    assert failed.status == JobStatus.ERROR
+    assert 'return code 3' in failed.error_msg
+    assert cancelled.status == JobStatus.CANCELLED
+    assert (state_dir / f'{cancelled.remote_id}.cancelled').exists()
@@ -0,0 +1,139 @@
+"""
+JobPriorityQueue: dispatch order under fair share and shortest-first, and
+move()/remove() with lazily deleted heap entries.
+"""
+from orcaview.job_queue import OrcaJob
+from orcaview.priority_queue import JobPriorityQueue
+
+
+def _job(name, project='a', nprocs=1, priority=0, sjf_rank=None):
+    job = OrcaJob(f'/runs/{project}/{name}.inp', f'/runs/{project}/{name}.out')
+    job.project = project
+    job.nprocs = nprocs
+    job.priority = priority
+    job.sjf_rank = sjf_rank
+    job.name = name
+    return job
+
+
+def _drain(queue):
+    """Dispatch every job the way the manager does; returns their names in order."""
+    names = []
+    while queue:
+        job = next(iter(queue))
+        assert queue.take(job)
+        names.append(job.name)
+    return names
+
+
+def _order(queue):
+    return [job.name for job in queue]
+
+
+def test_fifo_within_a_project():
+    queue = JobPriorityQueue()
+    for name in ('a1', 'a2', 'a3'):
+        queue.push(_job(name))
+    assert _drain(queue) == ['a1', 'a2', 'a3']
+
+
+def test_fair_share_between_projects():
+    queue = JobPriorityQueue()
+    # Project a queues a sweep of 4-core jobs first, project b adds 1-core jobs later
+    for number in range(1, 4):
+        queue.push(_job(f'a{number}', 'a', nprocs=4))
+    for number in range(1, 4):
+        queue.push(_job(f'b{number}', 'b', nprocs=1))
+    # Turns in proportion to the cores asked for: b runs three jobs per job of a
+    assert _drain(queue) == ['a1', 'b1', 'b2', 'b3', 'a2', 'a3']
+
+
+def test_new_project_starts_at_the_dispatch_clock():
+    queue = JobPriorityQueue()
+    for number in range(1, 4):
+        queue.push(_job(f'a{number}', 'a'))
+    assert _drain(queue) == ['a1', 'a2', 'a3']
+    queue.push(_job('a4', 'a'))
+    # b does not get credit for the time before it queued anything
+    queue.push(_job('b1', 'b'))
+    queue.push(_job('b2', 'b'))
+    assert _drain(queue) == ['b1', 'a4', 'b2']
+
+
+def test_priority_comes_first():
+    queue = JobPriorityQueue()
+    queue.push(_job('low', 'a'))
+    queue.push(_job('high', 'b', priority=5))
+    queue.push(_job('middle', 'a', priority=1))
+    assert _drain(queue) == ['high', 'middle', 'low']
+
+
+def test_shortest_first():
+    queue = JobPriorityQueue(shortest_first=True)
+    queue.push(_job('long', sjf_rank=1000.0))
+    queue.push(_job('short', sjf_rank=10.0))
+    queue.push(_job('medium', sjf_rank=100.0))
+    queue.push(_job('urgent', sjf_rank=5000.0, priority=1))
+    assert _order(queue) == ['urgent', 'short', 'medium', 'long']
+    # Back to fair share: first in, first out
+    queue.set_shortest_first(False)
+    assert _order(queue) == ['urgent', 'long', 'short', 'medium']
+    queue.set_shortest_first(True)
+    assert _drain(queue) == ['urgent', 'short', 'medium', 'long']
+
+
+def test_move_swaps_neighbours():
+    queue = JobPriorityQueue()
+    jobs = [_job(name) for name in ('j1', 'j2', 'j3', 'j4')]
+    for job in jobs:
+        queue.push(job)
+    assert queue.move(jobs[2], -1)
+    assert _order(queue) == ['j1', 'j3', 'j2', 'j4']
+    assert queue.move(jobs[0], 1)
+    assert _order(queue) == ['j3', 'j1', 'j2', 'j4']
+    assert not queue.move(jobs[2], -1)  # Already first
+    assert not queue.move(jobs[3], 1)  # Already last
+    assert not queue.move(_job('unqueued'), -1)
+    # Moving past a job of higher priority takes its priority
+    queue.push(_job('urgent', priority=2))
+    assert queue.move(jobs[2], -1)
+    assert _order(queue) == ['j3', 'urgent', 'j1', 'j2', 'j4']
+    assert jobs[2].priority == 2
+
+
+def test_move_in_shortest_first_order():
+    queue = JobPriorityQueue(shortest_first=True)
+    jobs = [_job(f'j{rank}', sjf_rank=float(rank)) for rank in (1, 2, 3)]
+    for job in jobs:
+        queue.push(job)
+    assert queue.move(jobs[2], -1)
+    assert _order(queue) == ['j1', 'j3', 'j2']
+
+
+def test_remove_with_lazy_deletion():
+    queue = JobPriorityQueue()
+    jobs = [_job(f'j{number:03d}') for number in range(200)]
+    for job in jobs:
+        queue.push(job)
+    # Mostly from the back: dead entries at the top are popped without compacting
+    removed = jobs[:20:2] + jobs[60:]
+    for job in removed:
+        assert queue.remove(job)
+        assert not queue.remove(job)
+        assert job not in queue
+    kept = [job for job in jobs if job not in removed]
+    assert len(queue) == len(kept)
+    assert _order(queue) == [job.name for job in kept]
+    # The next push compacts the heap: dead entries outnumber live ones
+    assert len(queue._heap) == len(jobs)
+    queue.push(_job('late'))
+    assert len(queue._heap) == len(queue)
+    # Moving across positions freed by removed jobs still swaps neighbours
+    first, second = kept[0], kept[1]
+    assert queue.move(second, -1)
+    assert _order(queue)[:2] == [second.name, first.name]
+    # A removed job can be queued again and keeps its rank, which it now
+    # shares with the job moved to the front
+    queue.push(removed[0])
+    assert removed[0] in queue
+    assert _drain(queue)[:3] == [second.name, removed[0].name, first.name]
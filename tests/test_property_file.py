@@ -0,0 +1,127 @@
+"""
+Property file parsing: blocks, matrix-layout arrays and the reduction to
+one result row per geometry.
+"""
+import math
+import os
+
+import pytest
+
+from orcaview.property_file import parse_property_file, parse_property_text, results_from_blocks
+
+TEST1_PROPERTY_FILE = os.path.join(os.path.dirname(__file__), os.pardir, 'test1', 'test1.property.txt')
+
+# Geometry 2 comes first and geometry 1 has no dipole block; the
+# thermochemistry of geometry 2 uses the older property names
+MULTI_GEOMETRY = '''*************************************************
+******************* ORCA 6.1.0 ******************
+*************************************************
+$Calculation_Status
+   &GeometryIndex 2
+   &ListStatus       OUT
+   &VERSION [&Type "String"] "6.1.0"
+   &PROGNAME [&Type "String"] "LeanSCF"
+   &STATUS [&Type "String"] "NORMAL TERMINATION"
+$End
+$Geometry
+   &GeometryIndex 2
+   &ListStatus       OUT
+   &NATOMS [&Type "Integer"] 3
+   &NCORELESSECP [&Type "Integer"] 0
+   &NGHOSTATOMS [&Type "Integer"] 0
+   &CartesianCoordinates [&Type "Coordinates", &Dim(3,4), &Units "Bohr"]
+              O      0.000000000000    0.000000000000    0.221665000000
+              H      0.000000000000    1.430900000000   -0.886661000000
+              H      0.000000000000   -1.430900000000   -0.886661000000
+$End
+$SCF_Energy
+   &GeometryIndex 2
+   &ListStatus       OUT
+   &SCF_ENERGY [&Type "Double"]      -7.6020000000000000e+01
+$End
+$SCF_Dipole_Moment
+   &GeometryIndex 2
+   &ListStatus       OUT
+   &METHOD [&Type "String"] "SCF"
+   &LEVEL [&Type "String"] "Relaxed density"
+   &DIPOLEELECCONTRIB [&Type "ArrayOfDoubles", &Dim (3,1)] "Electronic contribution"
+                                                         0
+
+0       0.000000000000000e+00
+1       0.000000000000000e+00
+2      -0.600000000000000e+00
+   &DIPOLETOTAL [&Type "ArrayOfDoubles", &Dim (3,1)] "Total"
+                                                         0
+
+0       0.100000000000000e+00
+1      -0.200000000000000e+00
+2       0.300000000000000e+00
+$End
+$Thermochemistry_Energies
+   &GeometryIndex 2
+   &ListStatus       OUT
+   &TEMPERATURE [&Type "Double"]       2.9815000000000000e+02
+   &ZPE [&Type "Double"]       2.1000000000000000e-02
+   &INNERENERGY [&Type "Double"]      -7.5995000000000000e+01
+   &ENTHALPY [&Type "Double"]      -7.5994000000000000e+01
+   &ENTROPY [&Type "Double"]       2.1000000000000000e-02
+   &FREEENERGY [&Type "Double"]      -7.6015000000000000e+01
+$End
+$Geometry
+   &GeometryIndex 1
+   &ListStatus       FIRST
+   &NATOMS [&Type "Integer"] 3
+$End
+$SCF_Energy
+   &GeometryIndex 1
+   &ListStatus       FIRST
+   &SCF_ENERGY [&Type "Double"]      -7.6010000000000000e+01
+$End
+$Single_Point_Data
+   &GeometryIndex 1
+   &ListStatus       FIRST
+   &FINALENERGY [&Type "Double"]      -7.6012000000000000e+01
+$End
+'''
+
+
+def test_orca_property_file():
+    blocks = parse_property_file(TEST1_PROPERTY_FILE)
+    assert [block.name for block in blocks] == ['Calculation_Status']
+    assert blocks[0].properties['VERSION'] == '6.1.0'
+    status, version, rows = results_from_blocks(blocks)
+    assert (status, version, rows) == ('Running', '6.1.0', [])
+
+
+def test_arrays():
+    blocks = parse_property_text(MULTI_GEOMETRY)
+    geometry = blocks[1].properties['CARTESIANCOORDINATES']
+    assert [row[0] for row in geometry] == ['O', 'H', 'H']
+    assert geometry[1][1:] == [0.0, 1.4309, -0.886661]
+    assert blocks[1].units['CARTESIANCOORDINATES'] == 'Bohr'
+    dipole = blocks[3]
+    assert dipole.properties['DIPOLEELECCONTRIB'] == [[0.0], [0.0], [-0.6]]
+    assert dipole.properties['DIPOLETOTAL'] == [[0.1], [-0.2], [0.3]]
+    # The reader stops at the next property instead of swallowing it
+    assert dipole.properties['LEVEL'] == 'Relaxed density'
+
+
+def test_rows_per_geometry():
+    status, version, rows = results_from_blocks(parse_property_text(MULTI_GEOMETRY))
+    assert (status, version) == ('NORMAL TERMINATION', '6.1.0')
+    assert [row['geometry_index'] for row in rows] == [1, 2]
+    first, second = rows
+    assert first['atoms'] == 3
+    assert first['scf_energy'] == -76.01
+    assert first['final_energy'] == -76.012
+    assert math.isnan(first['dipole_x']) and math.isnan(first['free_energy'])
+    # Without a final energy the SCF energy is the final one
+    assert second['final_energy'] == second['scf_energy'] == -76.02
+    assert (second['dipole_x'], second['dipole_y'], second['dipole_z']) == (0.1, -0.2, 0.3)
+    assert second['dipole_magnitude'] == pytest.approx(math.sqrt(0.14))
+    assert second['temperature'] == 298.15
+    assert second['zpe'] == 0.021
+    assert second['inner_energy'] == -75.995
+    assert second['enthalpy'] == -75.994
+    assert second['entropy'] == 0.021
+    assert second['free_energy'] == -76.015
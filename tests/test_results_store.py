@@ -0,0 +1,82 @@
+"""
+ResultsStore segments, the latest-rows rule for rerun jobs, and the batch
+summary columns read from the store.
+"""
+import math
+
+import pytest
+
+from orcaview import results_store as results_store_module
+from orcaview.batch import add_stored_results
+from orcaview.job_queue import OrcaJob
+from orcaview.property_file import THERMOCHEMISTRY_NAMES
+from orcaview.results_store import ResultsStore
+
+
+def _row(geometry_index, energy, free_energy=math.nan, dipole=math.nan):
+    row = {
+        'geometry_index': geometry_index, 'atoms': 3,
+        'scf_energy': energy, 'final_energy': energy,
+        'dipole_x': math.nan, 'dipole_y': math.nan, 'dipole_z': math.nan, 'dipole_magnitude': dipole,
+    }
+    row.update({column: math.nan for column in THERMOCHEMISTRY_NAMES})
+    row['free_energy'] = free_energy
+    return row
+
+
+def _add(store, job_id, rows, job_status='Done'):
+    return store.add(job_id, f'/runs/{job_id}.inp', job_status, 'Normal', '6.1.0', 0.0, rows)
+
+
+def test_rerun_job_keeps_only_its_latest_rows(tmp_path):
+    store = ResultsStore(tmp_path)
+    assert _add(store, 'opt', [_row(1, -1.0), _row(2, -1.1), _row(3, -1.2)]) == 3
+    _add(store, 'sp', [_row(1, -5.0)])
+    assert len(store.table()) == 4
+    # The optimization was rerun and converged in two steps
+    _add(store, 'opt', [_row(1, -1.05), _row(2, -1.25)], job_status='Error')
+    table = store.table()
+    assert len(table) == 3
+    rerun = table.job('opt')
+    assert list(rerun['geometry_index']) == [1, 2]
+    assert list(rerun['final_energy']) == [-1.05, -1.25]
+    assert set(rerun['job_status']) == {'Error'}
+    assert list(table.job('sp')['final_energy']) == [-5.0]
+    # A second store on the same directory sees the same rows
+    assert len(ResultsStore(tmp_path).table()) == 3
+
+
+def test_final_geometries_and_where(tmp_path):
+    store = ResultsStore(tmp_path)
+    _add(store, 'opt', [_row(1, -1.0), _row(2, -1.2)])
+    _add(store, 'sp', [_row(1, -5.0)])
+    final = store.table().final_geometries()
+    energies = dict(zip(final['job_id'], final['final_energy']))
+    assert energies == {'opt': -1.2, 'sp': -5.0}
+    low = store.table().where(store.table()['final_energy'] < -2)
+    assert list(low['job_id']) == ['sp']
+
+
+def test_compaction_keeps_latest_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_store_module, 'MAX_SEGMENTS', 3)
+    store = ResultsStore(tmp_path)
+    for attempt in range(5):
+        _add(store, 'opt', [_row(1, -1.0 - attempt)])
+        _add(store, f'other{attempt}', [_row(1, -2.0)])
+    assert len(store._segments()) <= 3
+    table = store.table()
+    assert len(table) == 6
+    assert list(table.job('opt')['final_energy']) == [-5.0]
+
+
+def test_batch_summary_reads_final_geometry(tmp_path):
+    store = ResultsStore(tmp_path)
+    jobs = [OrcaJob(f'/runs/{name}.inp', f'/runs/{name}.out') for name in ('a', 'b', 'c')]
+    _add(store, jobs[0].id, [_row(1, -1.0, free_energy=-0.9), _row(2, -1.1, free_energy=-0.95, dipole=1.5)])
+    _add(store, jobs[1].id, [_row(1, -2.0)])
+    rows = [{'name': name} for name in ('a', 'b', 'c')]
+    add_stored_results(rows, jobs, store)
+    assert rows[0]['free_energy'] == pytest.approx(-0.95)
+    assert rows[0]['dipole_magnitude'] == pytest.approx(1.5)
+    assert rows[1]['free_energy'] == ''  # No thermochemistry for this job
+    assert 'free_energy' not in rows[2]  # Not in the store at all
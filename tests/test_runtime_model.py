@@ -0,0 +1,64 @@
+"""
+RuntimeModel: no prediction before MIN_OBSERVATIONS, recovery of a power
+law in system size and parallel speed-up, and the 30-day cap.
+"""
+import math
+
+import pytest
+
+from orcaview.runtime_model import RuntimeModel
+
+
+def _features(electrons, method='B3LYP', basis='DEF2-SVP', job_type='SP'):
+    return {'method': method, 'basis': basis, 'job_type': job_type, 'atoms': electrons // 4, 'electrons': electrons}
+
+
+def test_no_prediction_before_min_observations():
+    model = RuntimeModel()
+    for electrons in range(10, 10 + RuntimeModel.MIN_OBSERVATIONS - 1):
+        model.observe(_features(electrons), 1, 100.0)
+        assert model.predict(_features(electrons), 1) is None
+    model.observe(_features(50), 1, 100.0)
+    assert model.predict(_features(50), 1) is not None
+    assert model.predict(None, 1) is None
+
+
+def test_observations_without_features_or_time_are_ignored():
+    model = RuntimeModel()
+    model.observe(None, 1, 100.0)
+    model.observe(_features(10), 1, 0)
+    assert model.observations == 0
+
+
+def test_recovers_power_law():
+    # seconds = 0.01 * electrons^3 / nprocs^0.8, atoms in a fixed ratio to
+    # electrons; enough jobs that the ridge penalty hardly shrinks the fit
+    model = RuntimeModel()
+    for _ in range(10):
+        for electrons in (20, 40, 80, 160, 320):
+            for nprocs in (1, 2, 4, 8):
+                model.observe(_features(electrons), nprocs, 0.01 * electrons ** 3 / nprocs ** 0.8)
+    for electrons, nprocs in ((60, 1), (200, 4), (640, 16)):
+        expected = 0.01 * electrons ** 3 / nprocs ** 0.8
+        assert model.predict(_features(electrons), nprocs) == pytest.approx(expected, rel=0.1)
+    # Doubling the system at fixed cores costs about 2^3
+    ratio = model.predict(_features(400), 2) / model.predict(_features(200), 2)
+    assert ratio == pytest.approx(8, rel=0.05)
+
+
+def test_unseen_categories_contribute_nothing():
+    model = RuntimeModel()
+    for electrons in (20, 40, 80, 160):
+        model.observe(_features(electrons), 1, float(electrons))
+    seen = model.predict(_features(100), 1)
+    unseen = model.predict(_features(100, method='PBE0', basis='DEF2-TZVP'), 1)
+    assert unseen is not None and unseen != seen
+
+
+def test_prediction_capped_at_30_days():
+    model = RuntimeModel()
+    for electrons in (10, 20, 40, 80):
+        model.observe(_features(electrons), 1, float(electrons) ** 4)
+    assert model.predict(_features(10 ** 6), 1) == pytest.approx(30 * 86400)
+    assert model.predict(_features(20), 1) < 30 * 86400
+    assert math.isfinite(model.predict(_features(10 ** 9), 1))